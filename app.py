@@ -6,12 +6,43 @@ Author: Your Name
 """
 
 import streamlit as st
-from groq import Groq
+from streamlit.errors import StreamlitAPIException
+import plotly.graph_objects as go
+import pandas as pd
 from dotenv import load_dotenv
 import os
+import functools
+import html
 import json
 from datetime import datetime, timedelta
 import random
+import re
+import time
+import uuid
+
+from core.analytics import AnalyticsEngine, achievements, extract_score, readiness_score
+from core.backends import backend_name, config_error, create_backend
+from core.cache import ResponseCache, SharedResponseCache
+from core.concurrency import fan_out, get_executor
+from core.exports import (BUNDLE_FORMATS, MAX_BUNDLE_BYTES, ReportStore, bundle_bytes, pdf_available,
+                          record_filename, record_markdown, resolve_report)
+from core.history_store import MIN_HISTORY_KEY_CHARS, HistoryStore, user_key
+from core import jobs
+from core.knowledge_packs import KnowledgePacks, generate_pack, pack_markdown
+from core.conversation import build_transcript, compact, interviewer_system_prompt
+from core.llm import LLMClient
+from core.question_pool import QuestionPool, question_text
+from core.routing import ModelRouter
+from core.linter import HIGHLIGHT_COLORS, highlight_html, lint, report_markdown
+from core.prompts import FEEDBACK_SECTIONS, TEMPLATES, feedback_section_calls, mistakes_call, mock_turn_call
+from core.semantic_index import SemanticIndex
+from core.resume import ResumeAnalyzer, ResumeParseError, gap_summary
+from core.star_coach import MIN_COMPONENT_CHARS, StarCoach, local_checks, ready, word_shares
+from core.structured import STAR_COMPONENTS, score_markdown, star_markdown, star_scores
+from core.speculation import SpeculativeTurn
+from core.state import SessionStore, create_state
+from core.scheduler import BACKGROUND, INTERACTIVE, NORMAL, RequestScheduler
+from core.telemetry import Tracer
 
 # ============================================================================
 # CONFIGURATION & SETUP
@@ -19,12 +50,6 @@ import random
 
 load_dotenv()
 
-try:
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-except Exception as e:
-    st.error(f"Failed to initialize Groq client: {str(e)}")
-    st.stop()
-
 st.set_page_config(
     page_title="AI Interview Prep Pro",
     page_icon="🎯",
@@ -32,11 +57,72 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+ADMIN_MODE = os.getenv("ADMIN_MODE", "").lower() in ("1", "true", "yes")
+
+@st.cache_resource
+def get_tracer():
+    """Process-wide tracer for LLM call and rerun spans
+
+    Finished LLM spans also feed the prompt templates' output budgets,
+    seeded from the spans file (if any) so a restart keeps what was learned.
+    """
+    tracer = Tracer.from_env()
+    if tracer.spans_path and os.path.exists(tracer.spans_path):
+        TEMPLATES.budget.load_spans(tracer.spans_path)
+    tracer.add_listener(TEMPLATES.budget.observe)
+    return tracer
+
+@st.cache_resource
+def get_state():
+    """Shared state backend (STATE_BACKEND), or None for per-process state"""
+    return create_state()
+
+@st.cache_resource
+def get_session_store():
+    return SessionStore(get_state())
+
+def browser_session_id():
+    """This browser session's opaque id, kept in the page URL (?sid=...)
+
+    It only keys reruns and the shared session snapshot, so a reload or a
+    reconnect to another replica keeps the session. Anyone with the link
+    gets the snapshot, so history is never keyed by it (see current_user_id).
+    """
+    session_id = st.query_params.get("sid", "")
+    if not re.fullmatch(r"[0-9a-f]{32}", session_id):
+        session_id = uuid.uuid4().hex
+        st.query_params["sid"] = session_id
+    return session_id
+
+def restore_session():
+    """Adopt this session's shared snapshot the first time this process sees it
+
+    A reconnect that lands on another replica picks up where the previous
+    one left off.
+    """
+    session_id = st.session_state.session_id
+    snapshot = get_session_store().load(session_id)
+    if snapshot:
+        st.session_state.update(snapshot)
+    st.session_state.state_digest = get_session_store().save(session_id, st.session_state)
+
+def save_session():
+    """Write the shared session snapshot if anything changed"""
+    if get_state() is not None and 'session_id' in st.session_state:
+        st.session_state.state_digest = get_session_store().save(
+            st.session_state.session_id, st.session_state, st.session_state.get('state_digest'))
+
+# Finished (and exported) at the bottom of the script
+rerun_span = get_tracer().start("rerun", kind="rerun", site="rerun")
+
 # ============================================================================
 # ENHANCED CSS STYLING
 # ============================================================================
 
-st.markdown("""
+@st.cache_resource
+def page_css():
+    """Global stylesheet, built once per process"""
+    return """
 <style>
     .main {
         padding: 0rem 1rem;
@@ -209,7 +295,36 @@ st.markdown("""
         box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def header_html():
+    """Title, subtitle and feature badges as one static block"""
+    return """
+<h1 class="header-text">🎯 AI Interview Prep Pro</h1>
+<p class="subtitle-text">Your AI-Powered Career Success Platform | Powered by Groq AI (Llama 3.3)</p>
+<div style='text-align: center; margin: 1rem 0;'>
+    <span class='feature-badge'>⚡ Lightning Fast</span>
+    <span class='feature-badge'>🆓 100% Free</span>
+    <span class='feature-badge'>🤖 AI-Powered</span>
+    <span class='feature-badge'>💬 Live Mock Interviews</span>
+    <span class='feature-badge'>📊 Analytics Dashboard</span>
+</div>
+"""
+
+@st.cache_resource
+def footer_html():
+    return """
+<div style='text-align: center; padding: 2.5rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+            color: white; border-radius: 20px; box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);'>
+    <h2 style='margin: 0; color: white;'>🚀 AI Interview Prep Pro</h2>
+    <p style='margin: 1rem 0;'>Powered by Groq AI • Llama 3.3 70B</p>
+    <p style='opacity: 0.9;'>⚡ Lightning Fast • 🆓 Free Forever • 🤖 Advanced AI • 💬 Live Mock Interviews</p>
+    <p style='margin-top: 1rem; opacity: 0.8;'>Built with ❤️ for your career success • © 2025</p>
+</div>
+"""
+
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # ============================================================================
 # SESSION STATE INITIALIZATION
@@ -217,9 +332,14 @@ st.markdown("""
 
 session_vars = {
     'history': [],
+    'history_count': 0,
+    'history_user': None,
     'total_questions': 0,
     'mock_messages': [],
     'mock_started': False,
+    'mock_system_prompt': '',
+    'mock_summary': '',
+    'mock_summarized_upto': 0,
     'interview_count': 0,
     'user_profile': {},
     'achievements': [],
@@ -238,30 +358,327 @@ for var, default_value in session_vars.items():
     if var not in st.session_state:
         st.session_state[var] = default_value
 
+if 'mock_speculation' not in st.session_state:
+    st.session_state.mock_speculation = SpeculativeTurn()
+
+if 'job_owner' not in st.session_state:
+    st.session_state.job_owner = uuid.uuid4().hex
+
+if 'guest_id' not in st.session_state:
+    st.session_state.guest_id = f"guest:{uuid.uuid4().hex}"
+
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = browser_session_id()
+    if get_state() is not None:
+        restore_session()
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def call_groq_api(messages, temperature=0.7, max_tokens=500):
-    """Centralized Groq API call with error handling"""
+@st.cache_resource
+def get_response_cache():
+    """Process-wide response cache: the shared state backend when configured,
+    otherwise a shared on-disk SQLite file"""
+    state = get_state()
+    return SharedResponseCache.from_env(state) if state is not None else ResponseCache.from_env()
+
+@st.cache_resource
+def get_history_store():
+    """Process-wide persistent history store (append-only SQLite)"""
+    return HistoryStore.from_env()
+
+@st.cache_resource
+def get_report_store():
+    """Process-wide content-addressed store of finished reports, read on download"""
+    return ReportStore.from_env()
+
+# Only the most recent summary rows live in session memory; everything else
+# is paged from the history store on demand.
+HISTORY_RECENT_LIMIT = 20
+HISTORY_PAGE_SIZE = 10
+
+def current_user_id():
+    """History owner: the hashed history key once one is set, else this tab's guest id
+
+    The guest id lives only in this session's memory, so guest history ends
+    with the tab.
+    """
+    history_key = st.session_state.get('history_key', '')
+    if len(history_key) >= MIN_HISTORY_KEY_CHARS:
+        return user_key(history_key)
+    return st.session_state.guest_id
+
+def load_history_summary():
+    """Load the lightweight history view when the session or user changes
+
+    Setting a history key claims this tab's guest history, and history saved
+    under this link's session id before history keys existed.
+    """
+    user_id = current_user_id()
+    if st.session_state.history_user != user_id:
+        store = get_history_store()
+        if user_id != st.session_state.guest_id:
+            claimed = (store.reassign(st.session_state.guest_id, user_id)
+                       + store.reassign(st.session_state.session_id, user_id))
+            if claimed:
+                get_semantic_index().forget(user_id)
+                st.toast(f"🔑 Moved {claimed} earlier sessions to your history key")
+        st.session_state.history = store.page(user_id, 0, HISTORY_RECENT_LIMIT)
+        st.session_state.history_count = store.count(user_id)
+        st.session_state.history_user = user_id
+        st.session_state.analytics = None
+        sync_analytics_state(get_analytics())
+
+def sync_analytics_state(analytics):
+    """Mirror analytics-derived counters into the sidebar session fields"""
+    st.session_state.streak_days = analytics.streak()
+    st.session_state.interview_count = analytics.type_count("Mock Interview")
+    st.session_state.achievements = [title for _, title, _, earned in achievements(analytics) if earned]
+
+def get_analytics():
+    """This user's analytics engine, bootstrapped once from the history store"""
+    if st.session_state.get('analytics') is None:
+        st.session_state.analytics = AnalyticsEngine.from_rows(get_history_store().iter_summaries(current_user_id()))
+    return st.session_state.analytics
+
+def record_history(entry, transient=None):
+    """Persist a full history entry; keep only its summary row in session
+
+    transient fields (report parts already in the report store) are used for
+    scoring and indexing but not stored again.
+    """
+    full = {**entry, **(transient or {})}
+    if entry.get('score') is None:
+        entry['score'] = extract_score(full.get('feedback'))
+    row = get_history_store().append(current_user_id(), entry)
+    get_semantic_index().add_record(current_user_id(), {**full, 'id': row['id']})
+    st.session_state.history = ([row] + st.session_state.history)[:HISTORY_RECENT_LIMIT]
+    st.session_state.history_count += 1
+    analytics = get_analytics()
+    analytics.update(row)
+    sync_analytics_state(analytics)
+    return row
+
+@st.cache_resource
+def get_llm():
+    """Process-wide LLM client for the configured backend (LLM_BACKEND)"""
+    return LLMClient(create_backend(), cache=get_response_cache(), model=os.getenv("LLM_MODEL"),
+                     scheduler=RequestScheduler.from_env(get_state()), router=ModelRouter.from_env(backend_name()),
+                     tracer=get_tracer())
+
+@st.cache_resource
+def get_semantic_index():
+    """Process-wide semantic index over every user's questions and answers"""
+    return SemanticIndex()
+
+def user_semantic_index():
+    """Semantic index with this user's history loaded (built once per process)"""
+    index = get_semantic_index()
+    if not index.is_loaded(current_user_id()):
+        records = get_history_store().iter_records(current_user_id())
+        index.bootstrap(current_user_id(), (resolve_report(record, get_report_store()) for record in records))
+    return index
+
+QUESTION_DEDUPE_ATTEMPTS = 3
+
+def next_question(pool_key):
+    """A question the user hasn't practiced before (pool first, then a fresh call)"""
+    pool = get_question_pool()
+    index = user_semantic_index()
+    for _ in range(QUESTION_DEDUPE_ATTEMPTS):
+        question = pool.take(pool_key)
+        if not question:
+            break
+        if not index.is_duplicate(current_user_id(), question_text(question)):
+            return question
+    
+    # Steer a fresh question away from the closest things already practiced
+    avoid = [item['text'] for _, item in index.similar_questions(current_user_id(), " ".join(pool_key), k=5)]
+    question = call_groq_api(**TEMPLATES.call("quick_practice.generate", *pool_key, avoid=avoid or None),
+                             use_cache=False)
+    if question:
+        pool.mark_served(pool_key, question)
+    return question
+
+@st.cache_resource
+def get_resume_analyzer():
+    """Process-wide resume parse/analysis cache keyed by content hash"""
+    return ResumeAnalyzer()
+
+@st.cache_resource
+def get_star_coach():
+    """Process-wide STAR component evaluations keyed by content hash"""
+    return StarCoach(get_llm())
+
+@st.cache_resource
+def get_knowledge_packs():
+    """Process-wide company/role knowledge packs, kept fresh by a background thread"""
+    llm = get_llm()
+    packs = KnowledgePacks.from_env(lambda kind, name, priority: generate_pack(llm, kind, name, priority))
+    interval = float(os.getenv("KNOWLEDGE_PACK_REFRESH_SECONDS", str(6 * 60 * 60)))
+    if interval > 0:
+        packs.start_refresher(interval)
+    return packs
+
+@st.cache_resource
+def get_question_pool():
+    """Process-wide pool of pregenerated questions, refilled in the background"""
+    llm = get_llm()
+    
+    def generate(key, avoid):
+        return llm.complete(**TEMPLATES.call("question_pool.refill", *key, avoid=avoid), use_cache=False,
+                            priority=BACKGROUND)
+    
+    return QuestionPool(generate, target_size=int(os.getenv("QUESTION_POOL_SIZE", "3")))
+
+def call_groq_api(messages, temperature=0.7, max_tokens=500, use_cache=None, priority=NORMAL, task=None, site=None):
+    """Centralized LLM API call with error handling and response caching
+
+    use_cache=None caches only low-temperature calls; pass False to force a
+    fresh completion or True to cache a creative call anyway. Rate limits,
+    retries and priority lanes are handled by the process-wide scheduler;
+    task (a core.routing task class) selects the model and site names the
+    tab/button in traces.
+    """
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        return response.choices[0].message.content
+        return get_llm().complete(messages, temperature, max_tokens, use_cache, priority, task, site)
     except Exception as e:
         st.error(f"API Error: {str(e)}")
         return None
 
+def call_groq_batch(calls, site=None):
+    """Dispatch independent calls at once, yielding (name, text) as each finishes
+
+    calls maps a name to call_groq_api keyword arguments; calls with a
+    "schema" use JSON mode and yield a validated dict. Wall-clock time is
+    roughly that of the slowest call; failures are reported and yield None.
+    """
+    llm = get_llm()
+    tasks = {
+        name: (lambda kwargs=dict(kwargs, site=kwargs.get("site", site)):
+               llm.complete_json(**kwargs) if "schema" in kwargs else llm.complete(**kwargs))
+        for name, kwargs in calls.items()
+    }
+    for name, result, error in fan_out(tasks):
+        if error is not None:
+            st.error(f"API Error ({name}): {str(error)}")
+        yield name, result
+
+def stream_groq_api(messages, temperature=0.7, max_tokens=500, use_cache=None, priority=NORMAL, task=None, site=None):
+    """Streaming variant of call_groq_api: yields text chunks as they arrive"""
+    try:
+        yield from get_llm().stream(messages, temperature, max_tokens, use_cache, priority, task, site)
+    except Exception as e:
+        st.error(f"API Error: {str(e)}")
+
+def render_stream(messages, placeholder, temperature=0.7, max_tokens=500, use_cache=None,
+                  priority=NORMAL, task=None, render=None, refresh_interval=0.05, site=None):
+    """Render a streamed completion into a placeholder and return the full text
+
+    render(text, done) draws the text into the placeholder; by default the
+    partial text is shown as markdown with a cursor and the final text in a
+    success box.
+    """
+    if render is None:
+        def render(text, done):
+            if done:
+                placeholder.success(text)
+            else:
+                placeholder.markdown(text + "▌")
+
+    text = ""
+    last_draw = 0.0
+    for chunk in stream_groq_api(messages, temperature, max_tokens, use_cache, priority, task, site):
+        text += chunk
+        now = time.monotonic()
+        if now - last_draw >= refresh_interval:
+            render(text, False)
+            last_draw = now
+
+    if not text:
+        placeholder.empty()
+        return None
+
+    render(text, True)
+    return text
+
+def bubble_html(role, content):
+    """Escaped HTML for one mock interview chat message"""
+    css_class, label = ("interviewer-msg", "🤖 AI Interviewer") if role == "interviewer" else ("candidate-msg", "👤 You")
+    text = html.escape(content).replace("\n", "<br>")
+    return f'<div class="chat-message {css_class}"><strong>{label}</strong><div>{text}</div></div>'
+
+# Finished messages never change, so their markup is shared across reruns and
+# sessions; partial streamed text goes through bubble_html directly
+chat_bubble_html = functools.lru_cache(maxsize=4096)(bubble_html)
+
+def render_chat_bubble(role, content, target=None):
+    """Draw one (possibly still streaming) chat bubble, optionally into a placeholder"""
+    (target or st).markdown(bubble_html(role, content), unsafe_allow_html=True)
+
+def render_chat_log(messages):
+    """Past turns, one keyed element per turn from memoised bubbles
+
+    Each turn keeps its element identity across reruns, so a new turn is
+    appended to the log instead of the whole transcript being redrawn.
+    """
+    for i, m in enumerate(messages):
+        st.container(key=f"mock_turn_{i}").markdown(chat_bubble_html(m["role"], m["content"]),
+                                                    unsafe_allow_html=True)
+
+def rerun_tab():
+    """Rerun just the enclosing fragment; a full-app run can't scope its rerun"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def traced_fragment(fn):
+    """st.fragment that records a rerun span per execution; widget
+    interactions inside a fragment rerun only that function"""
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        tracer = get_tracer()
+        span, error = tracer.start(fn.__name__, kind="rerun", site=f"fragment.{fn.__name__}"), None
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Also reached via st.rerun()/st.stop(), which raise BaseException
+            tracer.finish(span, error)
+            tracer.write_prometheus()
+            save_session()
+    return st.fragment(run)
+
+def render_lint_report(report):
+    """Instant local Check Mistakes results with the flagged spans highlighted"""
+    stats = report.stats
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Words", stats['words'])
+    with col2:
+        st.metric("Filler/Hedges", stats['filler'] + stats['hedges'])
+    with col3:
+        st.metric("Metrics", len(stats['metrics']))
+    with col4:
+        st.metric('"I" vs "We"', f"{stats['i_count']} / {stats['we_count']}")
+    
+    for issue in report.summary_issues:
+        (st.error if issue.severity == "high" else st.warning if issue.severity == "medium" else st.info)(issue.message)
+    
+    legend = " ".join(f'<mark style="background:{color};border-radius:3px">{kind}</mark>'
+                      for kind, color in HIGHLIGHT_COLORS.items())
+    st.markdown(f"<div style='line-height:1.8'>{highlight_html(report)}</div>"
+                f"<div style='font-size:0.8rem;margin-top:0.5rem'>{legend}</div>", unsafe_allow_html=True)
+    st.caption("STAR balance: " + " / ".join(f"{part.title()} {share:.0%}" for part, share in report.star_shares.items())
+               + " (guide 20/20/40/20)")
+
 def calculate_progress_score():
-    """Calculate user's overall progress score"""
-    total_sessions = len(st.session_state.history)
-    mock_interviews = st.session_state.interview_count
-    score = min(100, (total_sessions * 5) + (mock_interviews * 15))
-    return score
+    """Calculate user's overall progress score (volume plus recent scores)"""
+    return readiness_score(get_analytics())
 
 def get_motivational_message():
     """Get random motivational message"""
@@ -274,28 +691,300 @@ def get_motivational_message():
     ]
     return random.choice(messages)
 
+def reset_mock_interview():
+    """Clear all mock interview progress"""
+    st.session_state.mock_messages = []
+    st.session_state.mock_started = False
+    st.session_state.mock_system_prompt = ''
+    st.session_state.mock_summary = ''
+    st.session_state.mock_summarized_upto = 0
+    st.session_state.mock_speculation.reset()
+
+def mock_turn_key():
+    """Identifies the conversation state a speculative draft was built on"""
+    return (len(st.session_state.mock_messages), st.session_state.mock_summarized_upto)
+
+def next_mock_turn_call():
+    """call_groq_api arguments for the interviewer's next turn"""
+    return mock_turn_call(st.session_state.mock_system_prompt, st.session_state.mock_messages,
+                          st.session_state.mock_summary, st.session_state.mock_summarized_upto)
+
+def speculate_mock_turn():
+    """on_change hook for the mock answer box: draft the next turn early
+
+    The draft runs the same rolling-summary compaction the real turn does
+    once the answer is appended, so it is built from the same messages; the
+    summary it produced is kept if the draft is used.
+    """
+    partial = st.session_state.get("mock_response_input", "")
+    if not st.session_state.mock_started or os.getenv("MOCK_SPECULATION", "1") == "0":
+        return
+    llm = get_llm()
+    system_prompt = st.session_state.mock_system_prompt
+    mock_messages = st.session_state.mock_messages + [{"role": "candidate", "content": partial}]
+    summary, summarized_upto = st.session_state.mock_summary, st.session_state.mock_summarized_upto
+    
+    def draft(_):
+        context = compact(mock_messages, summary, summarized_upto,
+                          lambda previous, turns: llm.complete(**TEMPLATES.call("mock.summarize", previous, turns)))
+        text = llm.complete(**mock_turn_call(system_prompt, mock_messages, *context))
+        return {'text': text, 'context': context} if text else None
+    
+    st.session_state.mock_speculation.maybe_start(partial, mock_turn_key(), draft)
+
+def validate_speculative_turn(answer, draft):
+    """Cheap small-model check that a drafted turn still fits the final answer"""
+    verdict = call_groq_api(**TEMPLATES.call("mock.speculation_check", answer, draft['text']), priority=INTERACTIVE)
+    return bool(verdict) and verdict.strip().upper().startswith("YES")
+
+def compact_mock_context():
+    """Fold older mock turns into the rolling summary once over budget"""
+    st.session_state.mock_summary, st.session_state.mock_summarized_upto = compact(
+        st.session_state.mock_messages,
+        st.session_state.mock_summary,
+        st.session_state.mock_summarized_upto,
+        lambda summary, turns: call_groq_api(**TEMPLATES.call("mock.summarize", summary, turns),
+                                             priority=INTERACTIVE)
+    )
+
+def question_pool_key(difficulty, interview_type, role, company):
+    """Question pool key for the current sidebar selections"""
+    return (difficulty, interview_type, (role or '').strip(), (company or '').strip())
+
+def render_pack(slot, pack, source):
+    """Show a knowledge pack with where it came from"""
+    with slot.container():
+        st.success(pack_markdown(pack))
+        age_days = (time.time() - pack['generated_at']) / 86400
+        if source == "generated":
+            st.caption("⚡ Generated just now and saved for next time")
+        else:
+            st.caption(f"📦 Knowledge pack r{pack['revision']} • updated {age_days:.0f} days ago"
+                       + (" • refreshing in the background" if source == "stale" else ""))
+
+def lookup_packs(targets):
+    """Fetch (kind, name) packs concurrently, drawing each as it arrives"""
+    packs = get_knowledge_packs()
+    slots = {target: st.empty() for target in targets}
+    for target, result, error in fan_out({target: (lambda target=target: packs.lookup(*target)) for target in targets}):
+        if error is not None:
+            slots[target].error(f"API Error: {str(error)}")
+        else:
+            render_pack(slots[target], *result)
+
+def feedback_section_markdown(name, value):
+    """Markdown for one feedback section (typed sections are formatted locally)"""
+    if name == 'score':
+        return score_markdown(value)
+    if name == 'star':
+        return star_markdown(value['star'])
+    return value
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "0.5"))
+
+@st.cache_resource
+def get_jobs():
+    """Process-wide engine running long generations off the script thread"""
+    return jobs.JobEngine.from_env()
+
+def job_state(slot):
+    return st.session_state.get(f"job_{slot}")
+
+def job_running(slot):
+    state = job_state(slot)
+    return bool(state) and state['status'] not in jobs.FINISHED
+
+def start_job(slot, fn):
+    """Run fn(job) in the background for this session, replacing the slot's previous job"""
+    stop_job(slot)
+    job = get_jobs().submit(st.session_state.job_owner, fn, name=slot)
+    st.session_state[f"job_{slot}"] = {'id': job.id, 'status': job.status, 'text': '', 'result': None, 'error': None}
+
+def stop_job(slot):
+    """Cancel the slot's job (if still running) and forget it"""
+    state = st.session_state.pop(f"job_{slot}", None)
+    if state and state['status'] not in jobs.FINISHED:
+        get_jobs().cancel(state['id'])
+
+def stream_job(llm, call):
+    """Job function streaming one templated completion into the job"""
+    return lambda job: job.stream(llm.stream(**call))
+
+def render_job_text(text, result):
+    if result is None:
+        st.markdown(text + "▌" if text else "⏳ Waiting for the model...")
+    else:
+        st.success(result)
+
+def job_panel(slot, render=render_job_text, on_done=None):
+    """Show a slot's job: live text while it runs, its outcome once finished
+
+    While the job runs, the panel is a fragment that polls the engine every
+    JOB_POLL_SECONDS (each poll is also the job's heartbeat). on_done(result)
+    runs once, on the script thread, when the job completes.
+    """
+    state = job_state(slot)
+    if not state:
+        return
+    run_every = JOB_POLL_SECONDS if state['status'] not in jobs.FINISHED else None
+    st.fragment(_job_panel, run_every=run_every)(slot, render, on_done)
+
+def _job_panel(slot, render, on_done):
+    state = job_state(slot)
+    if not state:
+        return
+    if state['status'] not in jobs.FINISHED:
+        job = get_jobs().poll(state['id'])
+        if job is not None and not job.finished:
+            if st.button("⏹️ Stop", key=f"stop_job_{slot}"):
+                get_jobs().cancel(job.id)
+                state.update(status=jobs.CANCELLED)
+            else:
+                render(job.text, None)
+                return
+        else:
+            state.update(status=job.status if job else jobs.CANCELLED, text=job.text if job else state['text'],
+                         result=job.result if job else None, error=job.as_dict()['error'] if job else None)
+            if state['status'] == jobs.DONE and on_done:
+                on_done(state['result'])
+        # Full rerun: stops the polling and refreshes what the result changed
+        st.rerun()
+    
+    if state['status'] == jobs.DONE:
+        render(state['text'], state['result'])
+    elif state['status'] == jobs.FAILED:
+        st.error(f"API Error: {state['error']}")
+    else:
+        st.info("⏹️ Generation stopped.")
+
+def mock_review_job(llm, transcript):
+    """Job function: the streamed narrative review with the typed scorecard in parallel"""
+    def run(job):
+        scorecard_future = get_executor().submit(llm.complete_json,
+                                                 **TEMPLATES.call("mock.scorecard", transcript=transcript))
+        feedback = job.stream(llm.stream(**TEMPLATES.call("mock.review", transcript=transcript)))
+        try:
+            scorecard, scorecard_error = scorecard_future.result(), None
+        except Exception as e:
+            scorecard, scorecard_error = {}, str(e)
+        return {'transcript': transcript, 'feedback': feedback, 'scorecard': scorecard,
+                'scorecard_error': scorecard_error}
+    return run
+
+def mock_feedback_markdown(result):
+    """Narrative review prefixed with the scorecard, as saved and downloaded"""
+    scorecard = result['scorecard']
+    if not scorecard:
+        return result['feedback']
+    return f"{score_markdown(scorecard)}\n\n{star_markdown(scorecard['star'])}\n\n{result['feedback']}"
+
+def render_mock_review(text, result):
+    st.markdown("## 📊 Interview Performance Review")
+    if result is None:
+        st.markdown(text + "▌" if text else "⏳ Reviewing your interview...")
+        return
+    
+    scorecard = result['scorecard']
+    if result['feedback']:
+        st.success(result['feedback'])
+    if result['scorecard_error']:
+        st.warning(f"⚠️ Structured scorecard unavailable: {result['scorecard_error']}")
+    
+    if scorecard:
+        st.markdown("### 🧾 Scorecard")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Overall Score", f"{scorecard['score']:.0f}/100")
+        with col2:
+            st.metric("Hiring Decision", scorecard['hiring_decision'])
+        st.markdown(star_markdown(scorecard['star']))
+    
+    report = result.get('report')
+    if report:
+        # Downloads read the stored parts by reference, only when clicked
+        store, stamp = get_report_store(), datetime.now().strftime('%Y%m%d_%H%M')
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("📥 Full Report", store.loader(report['transcript'], report['feedback']),
+                             f"interview_{stamp}.md", "text/markdown", on_click="ignore", use_container_width=True)
+        with col2:
+            st.download_button("📥 Transcript", store.loader(report['transcript']),
+                             f"transcript_{stamp}.md", "text/markdown", on_click="ignore", use_container_width=True)
+        with col3:
+            st.download_button("📥 Feedback", store.loader(report['feedback']),
+                             f"feedback_{stamp}.txt", "text/plain", on_click="ignore", use_container_width=True)
+
+def save_enhanced_answer(result, role):
+    """Save a finished STAR Coach enhanced answer to history"""
+    if not result['text']:
+        return
+    question, parts, evaluations = result['question'], result['parts'], result['evaluations']
+    star = {part: {'score': evaluations[part]['score'], 'feedback': evaluations[part]['feedback']}
+            for part in STAR_COMPONENTS}
+    record_history({
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'type': 'STAR Coach',
+        'question': f"**Question:** {question}" if question else None,
+        'title': question or "STAR Coach answer",
+        'answer': "\n\n".join(parts[part] for part in STAR_COMPONENTS),
+        'feedback': f"{star_markdown(star)}\n\n## ✨ Enhanced Version\n\n{result['text']}",
+        'role': role,
+        'score': sum(item['score'] for item in star.values()) / len(star),
+        'star': star,
+        'metrics': {'star': star_scores(star)}
+    })
+
+def finish_mock_review(result, difficulty, role, interview_type):
+    """Save a finished review to history and close the interview"""
+    if not result['feedback']:
+        return
+    scorecard, feedback = result['scorecard'], mock_feedback_markdown(result)
+    # Written once; history and the review panel keep only the references
+    store = get_report_store()
+    transcript = result.pop('transcript')
+    result['report'] = {'transcript': store.put(transcript), 'feedback': store.put(feedback)}
+    record_history({
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'type': 'Mock Interview',
+        'difficulty': difficulty,
+        'role': role,
+        'interview_type': interview_type,
+        'report': result['report'],
+        'num_questions': len([m for m in st.session_state.mock_messages if m["role"] == "interviewer"]),
+        'score': scorecard.get('score'),
+        'strengths': scorecard.get('strengths', []),
+        'improvements': scorecard.get('improvements', []),
+        'star': scorecard.get('star'),
+        'hiring_decision': scorecard.get('hiring_decision'),
+        'metrics': {'star': star_scores(scorecard['star'])} if scorecard else {}
+    }, transient={'transcript': transcript, 'feedback': feedback})
+    reset_mock_interview()
+
 # ============================================================================
 # HEADER SECTION
 # ============================================================================
 
-if not os.getenv("GROQ_API_KEY"):
-    st.error("❌ No Groq API key found!")
-    st.info("🔑 Get FREE key from: https://console.groq.com/keys")
-    st.code("Add to .env file:\nGROQ_API_KEY=your_key_here")
+backend_error = config_error()
+if backend_error:
+    st.error(f"❌ {backend_error}")
+    if backend_name() == "groq":
+        st.info("🔑 Get FREE key from: https://console.groq.com/keys")
+        st.code("Add to .env file:\nGROQ_API_KEY=your_key_here")
     st.stop()
 
-st.markdown('<h1 class="header-text">🎯 AI Interview Prep Pro</h1>', unsafe_allow_html=True)
-st.markdown('<p class="subtitle-text">Your AI-Powered Career Success Platform | Powered by Groq AI (Llama 3.3)</p>', unsafe_allow_html=True)
+try:
+    get_llm()
+except Exception as e:
+    st.error(f"Failed to initialize LLM client: {str(e)}")
+    st.stop()
 
-st.markdown("""
-<div style='text-align: center; margin: 1rem 0;'>
-    <span class='feature-badge'>⚡ Lightning Fast</span>
-    <span class='feature-badge'>🆓 100% Free</span>
-    <span class='feature-badge'>🤖 AI-Powered</span>
-    <span class='feature-badge'>💬 Live Mock Interviews</span>
-    <span class='feature-badge'>📊 Analytics Dashboard</span>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(header_html(), unsafe_allow_html=True)
+
+load_history_summary()
 
 progress_score = calculate_progress_score()
 st.markdown(f"""
@@ -312,6 +1001,30 @@ st.markdown("---")
 # SIDEBAR CONFIGURATION
 # ============================================================================
 
+@traced_fragment
+def sidebar_tools(role, company):
+    """Salary and company lookups; clicks here rerun only this block"""
+    if st.button("💰 Salary Insights", use_container_width=True):
+        if role:
+            with st.spinner("Fetching salary data..."):
+                lookup_packs([("role", role)])
+        else:
+            st.warning("⚠️ Please enter a target role first!")
+    
+    if st.button("🏢 Company Intel", use_container_width=True):
+        if company:
+            with st.spinner(f"Researching {company}..."):
+                lookup_packs([("company", company)])
+        else:
+            st.warning("⚠️ Please enter a company name first!")
+    
+    if st.button("⚡ Salary + Company Intel", use_container_width=True):
+        if role and company:
+            with st.spinner(f"Researching {role} at {company}..."):
+                lookup_packs([("role", role), ("company", company)])
+        else:
+            st.warning("⚠️ Please enter both a target role and a company first!")
+
 with st.sidebar:
     st.markdown("## ⚙️ Interview Configuration")
     
@@ -322,6 +1035,16 @@ with st.sidebar:
         if st.button("💾 Save Profile"):
             st.session_state.user_profile = {'name': name, 'experience': years_exp}
             st.success("✅ Profile saved!")
+        
+        history_key = st.text_input(
+            "🔑 History Key", type="password", key="history_key",
+            help=f"A private passphrase ({MIN_HISTORY_KEY_CHARS}+ characters) that keeps your history across "
+                 "visits and devices. Enter the same key next time; it is never stored or put in the URL."
+        )
+        if not history_key:
+            st.caption("Without a history key, your history lasts only as long as this tab.")
+        elif len(history_key) < MIN_HISTORY_KEY_CHARS:
+            st.warning(f"⚠️ Use at least {MIN_HISTORY_KEY_CHARS} characters")
     
     st.markdown("---")
     
@@ -348,7 +1071,7 @@ with st.sidebar:
     with col1:
         st.metric("Questions", st.session_state.total_questions)
     with col2:
-        st.metric("Sessions", len(st.session_state.history))
+        st.metric("Sessions", st.session_state.history_count)
     
     col3, col4 = st.columns(2)
     with col3:
@@ -359,38 +1082,51 @@ with st.sidebar:
     if st.session_state.total_questions > 0:
         st.info(get_motivational_message())
     
-    st.markdown("---")
-    st.markdown("### 🛠️ AI-Powered Tools")
-    
-    if st.button("💰 Salary Insights", use_container_width=True):
-        if role:
-            with st.spinner("Fetching salary data..."):
-                prompt = f"""Provide salary insights for {role}:
-1. Salary Range (USD): Entry/Mid/Senior levels
-2. Top 5 Negotiation Strategies
-3. Key Value Points
-4. Market Trends
-Keep concise and actionable."""
-                response = call_groq_api([{"role": "user", "content": prompt}], max_tokens=600)
-                if response:
-                    st.success(response)
+    with st.expander("🗄️ Response Cache", expanded=False):
+        cache_stats = get_response_cache().stats()
+        col5, col6 = st.columns(2)
+        with col5:
+            st.metric("Hits", cache_stats['hits'])
+        with col6:
+            st.metric("Misses", cache_stats['misses'])
+        if cache_stats['max_entries'] is None:
+            st.caption(f"Hit rate {cache_stats['hit_rate']:.0%} • {cache_stats['entries']} entries • "
+                       f"shared via {get_state().name}")
         else:
-            st.warning("⚠️ Please enter a target role first!")
+            st.caption(f"Hit rate {cache_stats['hit_rate']:.0%} • {cache_stats['entries']}/{cache_stats['max_entries']} entries • "
+                       f"{cache_stats['size_bytes'] / 1024:.1f} KB • {cache_stats['evictions']} evicted")
     
-    if st.button("🏢 Company Intel", use_container_width=True):
-        if company:
-            with st.spinner(f"Researching {company}..."):
-                prompt = f"""Provide interview prep insights for {company}:
-1. Company Culture & Values
-2. Interview Process
-3. Common Questions
-4. What They Value
-5. Tips to Stand Out"""
-                response = call_groq_api([{"role": "user", "content": prompt}], max_tokens=800)
-                if response:
-                    st.success(response)
-        else:
-            st.warning("⚠️ Please enter a company name first!")
+    if ADMIN_MODE:
+        with st.expander("🛠️ Ops Panel", expanded=False):
+            tracer = get_tracer()
+            totals = tracer.totals()
+            col7, col8 = st.columns(2)
+            with col7:
+                st.metric("LLM Calls", f"{totals.get('requests', 0):.0f}")
+                st.metric("Retries", f"{totals.get('retries', 0):.0f}")
+            with col8:
+                st.metric("Tokens", f"{totals.get('prompt_tokens', 0) + totals.get('completion_tokens', 0):,.0f}")
+                st.metric("Errors", f"{totals.get('errors', 0):.0f}")
+            latency = tracer.percentiles()
+            if latency:
+                st.dataframe(pd.DataFrame(latency).drop(columns="kind"), use_container_width=True, hide_index=True)
+            st.download_button("📥 Prometheus Metrics", tracer.prometheus(), "metrics.prom", "text/plain",
+                               use_container_width=True)
+            pack_stats = get_knowledge_packs().stats()
+            st.caption(f"Knowledge packs: {pack_stats['loaded']} loaded • {pack_stats['hits']} fresh / "
+                       f"{pack_stats['stale_hits']} stale hits • {pack_stats['generated']} generated on demand • "
+                       f"{pack_stats['refreshing']} refreshing")
+            job_stats = get_jobs().stats()
+            st.caption(f"Background jobs: {job_stats['running']} running • {job_stats['done']} done • "
+                       f"{job_stats['failed']} failed • {job_stats['cancelled']} cancelled "
+                       f"({job_stats['reaped']} abandoned)")
+            if tracer.recent:
+                st.caption("Recent spans")
+                st.dataframe(pd.DataFrame(list(tracer.recent)[-20:][::-1]), use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    st.markdown("### 🛠️ AI-Powered Tools")
+    sidebar_tools(role, company)
 
 # ============================================================================
 # MAIN CONTENT TABS
@@ -409,7 +1145,8 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
 # TAB 1: QUICK PRACTICE
 # ============================================================================
 
-with tab1:
+@traced_fragment
+def quick_practice_tab(difficulty, interview_type, role, company):
     st.markdown("## 🎤 Instant Interview Practice")
     st.markdown("*Generate single questions and receive detailed AI feedback in seconds*")
     
@@ -418,28 +1155,37 @@ with tab1:
     with col1:
         if st.button("🎲 Generate Interview Question", type="primary", use_container_width=True):
             with st.spinner("🤖 AI is crafting your personalized question..."):
-                prompt = f"""Generate a realistic {difficulty} {interview_type} interview question for {role or 'Software Engineer'}{f' at {company}' if company else ''}.
-
-Format:
-**Question:** [The question]
-**What they're looking for:** [Brief explanation]"""
-
-                response = call_groq_api([
-                    {"role": "system", "content": "You are a senior technical interviewer."},
-                    {"role": "user", "content": prompt}
-                ], temperature=0.8, max_tokens=400)
-                
-                if response:
-                    st.session_state.current_question = response
-                    st.session_state.total_questions += 1
-                    st.success("✅ Question generated!")
-                    st.balloons()
+                response = next_question(question_pool_key(difficulty, interview_type, role, company))
+            
+            if response:
+                st.session_state.current_question = response
+                st.session_state.total_questions += 1
+                st.success("✅ Question generated!")
+                st.balloons()
+        else:
+            # Warm the pool for the current selections before the first click
+            get_question_pool().prefetch(question_pool_key(difficulty, interview_type, role, company))
         
         if 'current_question' in st.session_state:
             st.markdown("---")
             st.markdown("### ❓ Your Interview Question")
             st.info(st.session_state.current_question)
             
+            similar = user_semantic_index().similar_questions(current_user_id(),
+                                                              question_text(st.session_state.current_question), k=4)
+            similar = [(score, item) for score, item in similar
+                       if score < 0.98][:3]
+            if similar:
+                with st.expander("🔁 Practice similar questions from your history"):
+                    for score, item in similar:
+                        col_q, col_go = st.columns([5, 1])
+                        with col_q:
+                            st.markdown(f"{item['text']}  \n*{score:.0%} similar • {item['timestamp']}*")
+                        with col_go:
+                            if st.button("Practice", key=f"similar_{item['record_id']}", use_container_width=True):
+                                st.session_state.current_question = f"**Question:** {item['text']}"
+                                rerun_tab()
+            
             st.markdown("### ✍️ Your Answer")
             user_answer = st.text_area(
                 "Type your detailed response:",
@@ -469,37 +1215,47 @@ Example: "Increased user engagement by 35% by implementing..."
             with col_c:
                 if st.button("🔄", use_container_width=True):
                     del st.session_state.current_question
-                    st.rerun()
+                    rerun_tab()
             
             if analyze_btn:
                 if user_answer and len(user_answer) > 30:
                     with st.spinner("🤖 Analyzing..."):
-                        analysis_prompt = f"""Analyze this interview answer:
-
-Question: {st.session_state.current_question}
-Answer: {user_answer}
-
-Provide:
-1. Score (0-100)
-2. Strengths (4-5 points)
-3. Improvements (4-5 points)
-4. STAR Analysis
-5. Enhanced Version
-6. Key Takeaways
-
-Be specific and actionable."""
-
-                        feedback = call_groq_api([
-                            {"role": "system", "content": "You are an expert interview coach."},
-                            {"role": "user", "content": analysis_prompt}
-                        ], temperature=0.3, max_tokens=1500)
+                        st.markdown("---")
+                        st.markdown("## 📊 Comprehensive AI Feedback")
+                        
+                        # Every section gets a slot up front so results can land in any order
+                        section_slots = {name: st.empty() for name in FEEDBACK_SECTIONS}
+                        section_slots['mistakes'] = st.empty()
+                        # Common mistakes come from the local linter, no LLM call needed
+                        sections = {'mistakes': report_markdown(lint(user_answer))}
+                        with section_slots['mistakes'].container():
+                            st.warning("### ⚠️ Common Mistakes")
+                            st.markdown(sections['mistakes'])
+                        
+                        for name, value in call_groq_batch(feedback_section_calls(st.session_state.current_question, user_answer)):
+                            if not value:
+                                continue
+                            sections[name] = value
+                            with section_slots[name].container():
+                                if name == 'score':
+                                    st.markdown(f"### {FEEDBACK_SECTIONS[name][0]}")
+                                    st.metric("Score", f"{value['score']:.0f}/100")
+                                    st.progress(int(value['score']) / 100)
+                                    st.success(feedback_section_markdown(name, value).split("\n", 2)[2])
+                                else:
+                                    st.markdown(f"### {FEEDBACK_SECTIONS[name][0]}")
+                                    st.success(feedback_section_markdown(name, value))
+                        
+                        feedback = "\n\n".join(
+                            f"## {FEEDBACK_SECTIONS[name][0] if name in FEEDBACK_SECTIONS else '⚠️ Common Mistakes'}\n\n"
+                            f"{feedback_section_markdown(name, sections[name])}"
+                            for name in list(FEEDBACK_SECTIONS) + ['mistakes'] if name in sections
+                        )
+                        scored = sections.get('score', {})
+                        star = sections.get('star', {}).get('star')
                         
                         if feedback:
-                            st.markdown("---")
-                            st.markdown("## 📊 Comprehensive AI Feedback")
-                            st.success(feedback)
-                            
-                            st.session_state.history.append({
+                            record_history({
                                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                                 'type': 'Quick Practice',
                                 'question': st.session_state.current_question,
@@ -507,7 +1263,12 @@ Be specific and actionable."""
                                 'feedback': feedback,
                                 'difficulty': difficulty,
                                 'interview_type': interview_type,
-                                'role': role
+                                'role': role,
+                                'score': scored.get('score'),
+                                'strengths': scored.get('strengths', []),
+                                'improvements': scored.get('improvements', []),
+                                'star': star,
+                                'metrics': {'star': star_scores(star)} if star else {}
                             })
                             
                             st.balloons()
@@ -515,17 +1276,15 @@ Be specific and actionable."""
                     st.warning("⚠️ Please provide a detailed answer (at least 30 characters)")
             
             if quick_check:
-                with st.spinner("Checking mistakes..."):
-                    mistakes_prompt = f"""Check for common mistakes:
-Question: {st.session_state.current_question}
-Answer: {user_answer}
-
-Check: Filler words, vague statements, no metrics, weak structure, negative language, using "we" instead of "I"."""
-
-                    mistakes = call_groq_api([{"role": "user", "content": mistakes_prompt}], max_tokens=600)
-                    if mistakes:
-                        st.warning("### ⚠️ Common Mistakes")
-                        st.markdown(mistakes)
+                st.session_state.lint_answer = user_answer
+            
+            if user_answer and st.session_state.get('lint_answer') == user_answer:
+                st.warning("### ⚠️ Common Mistakes")
+                render_lint_report(lint(user_answer))
+                
+                if st.button("🔬 Deeper AI Check", key="deep_mistakes_check", disabled=job_running("deep_check")):
+                    start_job("deep_check", stream_job(get_llm(), mistakes_call(st.session_state.current_question, user_answer)))
+                job_panel("deep_check", lambda text, result: st.markdown(text if result is not None else text + "▌"))
     
     with col2:
         st.markdown("### 💡 Interview Guide")
@@ -561,7 +1320,8 @@ Check: Filler words, vague statements, no metrics, weak structure, negative lang
 # TAB 2: AI MOCK INTERVIEW
 # ============================================================================
 
-with tab2:
+@traced_fragment
+def mock_interview_tab(difficulty, interview_type, role, company):
     st.markdown("## 💬 Live AI Mock Interview")
     st.markdown("*Experience a realistic interview with adaptive follow-up questions*")
     
@@ -583,41 +1343,25 @@ with tab2:
             """, unsafe_allow_html=True)
             
             if st.button("🎬 Start Mock Interview Now", type="primary", use_container_width=True):
+                stop_job("mock_review")
                 with st.spinner("🤖 AI Interviewer is preparing..."):
-                    opening_prompt = f"""You are a professional interviewer for {role or 'Software Engineer'} at {difficulty.split()[0]} level{f' at {company}' if company else ''}.
-
-Start interview:
-1. Greet warmly
-2. Introduce yourself (fictional name/title)
-3. Ask first question
-
-Be conversational and professional."""
-
-                    response = call_groq_api([{"role": "user", "content": opening_prompt}], temperature=0.7, max_tokens=350)
+                    st.session_state.mock_system_prompt = interviewer_system_prompt(role, difficulty, company)
+                    response = call_groq_api(**TEMPLATES.call("mock.start", st.session_state.mock_system_prompt, []),
+                                             priority=INTERACTIVE)
                     
                     if response:
                         st.session_state.mock_messages = [{"role": "interviewer", "content": response}]
                         st.session_state.mock_started = True
-                        st.rerun()
+                        rerun_tab()
         
         else:
             st.markdown("### 💬 Interview in Progress")
             
-            for idx, msg in enumerate(st.session_state.mock_messages):
-                if msg["role"] == "interviewer":
-                    st.markdown(f"""
-                    <div class="chat-message interviewer-msg">
-                        <strong>🤖 AI Interviewer</strong>
-                        <div>{msg["content"]}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="chat-message candidate-msg">
-                        <strong>👤 You</strong>
-                        <div>{msg["content"]}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            render_chat_log(st.session_state.mock_messages)
+            
+            # The submitted answer and the next interviewer turn (while it
+            # streams in) are drawn here, right below the log
+            next_turn = st.container()
             
             st.markdown("---")
             
@@ -625,118 +1369,61 @@ Be conversational and professional."""
                 "✍️ Your Response:",
                 height=220,
                 placeholder="Take your time... Use STAR method and be specific!",
-                key="mock_response_input"
+                key="mock_response_input",
+                on_change=speculate_mock_turn
             )
+            st.caption("💡 Press Ctrl+Enter to save a draft — the interviewer starts preparing the next question while you polish it.")
             
             col_a, col_b, col_c = st.columns([2, 2, 1])
             
+            reviewing = job_running("mock_review")
+            
             with col_a:
-                submit = st.button("📤 Submit Answer", use_container_width=True, type="primary")
+                submit = st.button("📤 Submit Answer", use_container_width=True, type="primary", disabled=reviewing)
             
             with col_b:
-                end = st.button("🔚 End & Get Feedback", use_container_width=True)
+                end = st.button("🔚 End & Get Feedback", use_container_width=True, disabled=reviewing)
             
             with col_c:
                 if st.button("🔄 Restart", use_container_width=True):
-                    st.session_state.mock_messages = []
-                    st.session_state.mock_started = False
-                    st.rerun()
+                    stop_job("mock_review")
+                    reset_mock_interview()
+                    rerun_tab()
             
             if submit and user_response:
                 if len(user_response.strip()) >= 50:
                     with st.spinner("🤖 AI is processing..."):
+                        draft = st.session_state.mock_speculation.take(user_response, mock_turn_key(),
+                                                                       validate=validate_speculative_turn)
                         st.session_state.mock_messages.append({"role": "candidate", "content": user_response})
+                        render_chat_bubble("candidate", user_response, next_turn)
                         
-                        interviewer_count = len([m for m in st.session_state.mock_messages if m["role"] == "interviewer"])
-                        
-                        if interviewer_count < 4:
-                            conversation = "\n\n".join([
-                                f"{'INTERVIEWER' if m['role'] == 'interviewer' else 'CANDIDATE'}: {m['content']}"
-                                for m in st.session_state.mock_messages
-                            ])
-                            
-                            next_prompt = f"""Continue interview:
-
-{conversation}
-
-Based on last answer:
-1. If strong: Ask follow-up or new question
-2. If weak: Ask clarifying question
-
-Question #{interviewer_count + 1} of 4-5. Ask ONE question only."""
-
-                            response = call_groq_api([{"role": "user", "content": next_prompt}], temperature=0.7, max_tokens=300)
+                        if draft:
+                            # A finished draft; its compaction matches this answer's
+                            st.session_state.mock_summary, st.session_state.mock_summarized_upto = draft['context']
+                            response = draft['text']
                         else:
-                            response = call_groq_api([{
-                                "role": "user",
-                                "content": "Conclude interview warmly. Thank candidate. Ask if they have questions. Mention next steps. 2-3 sentences."
-                            }], max_tokens=150)
+                            compact_mock_context()
+                            turn_call = next_mock_turn_call()
+                            turn_slot = next_turn.empty()
+                            response = render_stream(
+                                **turn_call, placeholder=turn_slot, priority=INTERACTIVE,
+                                render=lambda text, done: render_chat_bubble("interviewer", text if done else text + "▌", turn_slot)
+                            )
                         
                         if response:
                             st.session_state.mock_messages.append({"role": "interviewer", "content": response})
-                            st.rerun()
+                            rerun_tab()
                 else:
                     st.warning("⚠️ Answer too short (minimum 50 characters)")
             
             if end:
-                with st.spinner("📊 Generating feedback..."):
-                    transcript = "# Mock Interview Transcript\n\n"
-                    for m in st.session_state.mock_messages:
-                        role_label = "**🤖 INTERVIEWER**" if m["role"] == "interviewer" else "**👤 YOU**"
-                        transcript += f"{role_label}\n{m['content']}\n\n---\n\n"
-                    
-                    feedback_prompt = f"""Analyze this mock interview:
-
-{transcript}
-
-Provide:
-1. Score (0-100) with justification
-2. Strengths (3-5)
-3. Improvements (3-5)
-4. Communication Breakdown
-5. STAR Analysis
-6. Best/Weakest Answers
-7. Hiring Decision
-8. Action Items (7-10)
-9. Questions to Ask Interviewer
-
-Be honest, specific, constructive."""
-
-                    feedback = call_groq_api([
-                        {"role": "system", "content": "You are a senior hiring manager."},
-                        {"role": "user", "content": feedback_prompt}
-                    ], temperature=0.3, max_tokens=2500)
-                    
-                    if feedback:
-                        st.markdown("## 📊 Interview Performance Review")
-                        st.success(feedback)
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.download_button("📥 Full Report", f"{transcript}\n\n{feedback}", 
-                                             f"interview_{datetime.now().strftime('%Y%m%d_%H%M')}.md", "text/markdown", use_container_width=True)
-                        with col2:
-                            st.download_button("📥 Transcript", transcript, 
-                                             f"transcript_{datetime.now().strftime('%Y%m%d_%H%M')}.md", "text/markdown", use_container_width=True)
-                        with col3:
-                            st.download_button("📥 Feedback", feedback, 
-                                             f"feedback_{datetime.now().strftime('%Y%m%d_%H%M')}.txt", "text/plain", use_container_width=True)
-                        
-                        st.session_state.history.append({
-                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            'type': 'Mock Interview',
-                            'difficulty': difficulty,
-                            'role': role,
-                            'interview_type': interview_type,
-                            'transcript': transcript,
-                            'feedback': feedback,
-                            'num_questions': len([m for m in st.session_state.mock_messages if m["role"] == "interviewer"])
-                        })
-                        
-                        st.session_state.interview_count += 1
-                        st.session_state.mock_messages = []
-                        st.session_state.mock_started = False
-                        st.balloons()
+                # The review runs as a background job; the panel below polls it
+                start_job("mock_review", mock_review_job(get_llm(), build_transcript(st.session_state.mock_messages)))
+                rerun_tab()
+        
+        job_panel("mock_review", render_mock_review,
+                  on_done=lambda result: finish_mock_review(result, difficulty, role, interview_type))
     
     with col2:
         st.markdown("### 💡 Mock Interview Guide")
@@ -769,33 +1456,332 @@ Be honest, specific, constructive."""
             - Professionalism
             """)
 
-# Continuing with remaining tabs...
-# (Due to length, showing structure - the pattern continues similarly for tabs 3-6)
-
-with tab3:
+@traced_fragment
+def resume_analyzer_tab(role):
     st.markdown("## 📝 AI-Powered Resume Analyzer")
-    # Resume analyzer implementation (simplified for brevity)
+    st.markdown("*ATS score, keyword coverage and job description match computed instantly on your device*")
     
-with tab4:
+    col1, col2 = st.columns(2)
+    with col1:
+        resume_file = st.file_uploader("📄 Upload Resume", type=["pdf", "docx", "txt"])
+        resume_text = st.text_area("...or paste your resume", height=200, key="resume_text",
+                                   disabled=resume_file is not None)
+    with col2:
+        jd_text = st.text_area("📋 Job Description (optional)", height=300, key="resume_jd",
+                               placeholder="Paste the job posting to get keyword coverage and match scores")
+    
+    if st.button("🔍 Analyze Resume", type="primary", use_container_width=True):
+        if resume_file is None and not resume_text.strip():
+            st.warning("⚠️ Upload or paste a resume first")
+        else:
+            try:
+                with st.spinner("📄 Parsing resume..."):
+                    if resume_file is not None:
+                        st.session_state.resume_result = get_resume_analyzer().analyze(
+                            resume_file.getvalue(), resume_file.name, jd_text)
+                    else:
+                        st.session_state.resume_result = get_resume_analyzer().analyze(resume_text, "resume.txt", jd_text)
+            except ResumeParseError as e:
+                st.error(f"❌ {e}")
+            except Exception as e:
+                st.error(f"❌ Couldn't read this file: {e}")
+    
+    if st.session_state.get('resume_result'):
+        result_key, result = st.session_state.resume_result
+        st.markdown("---")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("ATS Score", f"{result['ats_score']}/100")
+        with col2:
+            st.metric("Keyword Coverage", f"{result['keyword_coverage']}%" if 'keyword_coverage' in result else "—")
+        with col3:
+            st.metric("Structure", f"{result['structure_score']}/100")
+        with col4:
+            st.metric("Formatting", f"{result['formatting_score']}/100")
+        st.progress(result['ats_score'] / 100)
+        st.caption(f"{result['pages']} page(s) • {result['words']} words • {result['bullets']} bullets • "
+                   f"{result['metrics']} quantified results")
+        
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.markdown("### 🗂️ Sections")
+            st.markdown(" ".join(f"✅ {name.title()}" for name in result['sections']) or "No sections detected")
+            for name in result['missing_sections']:
+                st.warning(f"Missing a **{name.title()}** section")
+            if result['contact'] < 2:
+                st.warning("Add both an email address and a phone number")
+        with col_b:
+            if 'keyword_coverage' in result:
+                st.markdown("### 🔑 Keywords")
+                if result['matched_keywords']:
+                    st.success("**Matched:** " + ", ".join(result['matched_keywords']))
+                if result['missing_keywords']:
+                    st.error("**Missing:** " + ", ".join(result['missing_keywords']))
+            else:
+                st.markdown("### 🧰 Skills Found")
+                st.info(", ".join(result['skills']) or "No recognised skills")
+        
+        if result.get('section_relevance'):
+            relevance = {name: score for name, score in result['section_relevance'].items() if name != "header"}
+            fig = go.Figure(go.Bar(x=list(relevance.values()), y=[name.title() for name in relevance],
+                                   orientation="h", marker_color="#667eea"))
+            fig.update_layout(title="📊 Section Relevance to the Job (BM25)", xaxis=dict(range=[0, 100]),
+                              height=280, margin=dict(l=10, r=10, t=50, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        advice = st.session_state.setdefault('resume_advice', {})
+        advice_slot = f"resume_advice_{result_key}"
+        if result_key in advice:
+            st.markdown("### 🤖 AI Recommendations")
+            st.success(advice[result_key])
+        else:
+            if st.button("🤖 Get AI Recommendations", use_container_width=True, disabled=job_running(advice_slot)):
+                # Only the compact gap summary is sent, never the resume itself
+                start_job(advice_slot, stream_job(get_llm(), TEMPLATES.call(
+                    "resume.advice", gap_summary=gap_summary(result), role=role)))
+            if job_state(advice_slot):
+                st.markdown("### 🤖 AI Recommendations")
+            
+            def save_advice(text):
+                if text:
+                    advice[result_key] = text
+                stop_job(advice_slot)
+            
+            job_panel(advice_slot, on_done=save_advice)
+    
+@traced_fragment
+def star_coach_tab(role):
     st.markdown("## 🎯 STAR Method Interactive Coach")
-    # STAR coach implementation
+    st.markdown("Build your answer one part at a time. Each part is scored on its own, so editing one part only re-scores that part.")
     
-with tab5:
+    coach = get_star_coach()
+    question = st.text_input("❓ Interview question (optional)", key="star_question",
+                             placeholder="e.g., Tell me about a time you handled a production outage")
+    
+    placeholders = {
+        'situation': "Where and when? What was at stake?",
+        'task': "What were YOU responsible for? What made it hard?",
+        'action': "What did YOU do, step by step, and why?",
+        'result': "What changed? Numbers, time, money, users... and what you learned.",
+    }
+    parts = {}
+    columns = st.columns(2)
+    for i, part in enumerate(STAR_COMPONENTS):
+        with columns[i % 2]:
+            parts[part] = st.text_area(f"{'STAR'[i]} — {part.title()}", height=140, key=f"star_{part}",
+                                       placeholder=placeholders[part])
+    
+    shares = word_shares(parts)
+    hints = local_checks(parts)
+    
+    col_a, col_b = st.columns([2, 2])
+    with col_a:
+        evaluate = st.button("🔍 Evaluate", use_container_width=True, type="primary")
+    with col_b:
+        pending = coach.pending(parts, question)
+        st.caption(f"{len(pending)} part(s) changed since last scored" if pending else "All parts scored")
+    
+    if evaluate:
+        if not ready(parts):
+            st.warning(f"⚠️ Write at least {MIN_COMPONENT_CHARS} characters in a part to score it")
+        else:
+            with st.spinner(f"Scoring {len(pending)} part(s)..."):
+                _, rescored, errors = coach.evaluate(parts, question)
+            for part, error in errors.items():
+                st.error(f"API Error ({part}): {str(error)}")
+            if rescored:
+                reused = len(ready(parts)) - len(rescored) - len(errors)
+                st.success(f"✅ Re-scored {', '.join(p.title() for p in rescored)}"
+                           + (f" • {reused} unchanged part(s) reused from cache" if reused else ""))
+    
+    evaluations = {}
+    columns = st.columns(4)
+    for i, part in enumerate(STAR_COMPONENTS):
+        words, share = shares[part]
+        with columns[i]:
+            st.markdown(f"#### {part.title()}")
+            evaluation = coach.cached(part, parts[part], question) if parts[part] else None
+            if evaluation:
+                evaluations[part] = evaluation
+                st.metric("Score", f"{evaluation['score']:.0f}/100")
+                st.markdown(evaluation['feedback'])
+                st.info(f"💡 {evaluation['suggestion']}")
+            elif parts[part]:
+                st.caption("✏️ Not scored yet")
+            st.caption(f"{words} words • {share:.0%} of answer")
+            for hint in hints[part]:
+                st.caption(f"⚠️ {hint}")
+    
+    st.markdown("---")
+    all_scored = len(evaluations) == len(STAR_COMPONENTS)
+    if st.button("✨ Build Enhanced Answer", use_container_width=True,
+                 disabled=not all_scored or job_running("star_enhance")):
+        llm = get_llm()
+        call = TEMPLATES.call("star_coach.enhance", question=question, parts=parts, evaluations=evaluations)
+        answer = {'question': question, 'parts': dict(parts), 'evaluations': dict(evaluations)}
+        start_job("star_enhance", lambda job: dict(answer, text=job.stream(llm.stream(**call))))
+    elif not all_scored:
+        st.caption("Score all four parts to build the enhanced answer from their feedback.")
+    
+    job_panel("star_enhance", lambda text, result: render_job_text(text, result and result['text']),
+              on_done=lambda result: save_enhanced_answer(result, role))
+    
+@traced_fragment
+def analytics_tab():
     st.markdown("## 📊 Analytics Dashboard")
-    # Analytics implementation
     
-with tab6:
+    analytics = get_analytics()
+    overall = analytics.overall
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Sessions", overall.count)
+    with col2:
+        st.metric("Average Score", f"{overall.mean:.0f}" if overall.mean is not None else "—",
+                  delta=f"{overall.rolling - overall.mean:+.1f} recent" if overall.scored > 1 else None)
+    with col3:
+        st.metric("Best Score", f"{overall.best:.0f}" if overall.best is not None else "—")
+    with col4:
+        st.metric("Streak", f"{analytics.streak()} days", delta=f"best {analytics.best_streak}", delta_color="off")
+    
+    if overall.scored:
+        series = analytics.score_series(max_points=200)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=series["timestamp"], y=series["score"], mode="markers+lines", name="Score",
+                                 line=dict(color="#667eea", width=1), marker=dict(size=5)))
+        fig.add_trace(go.Scatter(x=series["timestamp"], y=series["rolling"], mode="lines",
+                                 name=f"Rolling avg ({analytics.window})", line=dict(color="#764ba2", width=3)))
+        fig.update_layout(title="📈 Score Trend", yaxis=dict(range=[0, 100], title="Score"), height=360,
+                          margin=dict(l=10, r=10, t=50, b=10), legend=dict(orientation="h"))
+        st.plotly_chart(fig, use_container_width=True)
+        
+        col_a, col_b = st.columns(2)
+        for column, dim, title in ((col_a, "interview_type", "🎯 By Interview Type"), (col_b, "difficulty", "🎚️ By Difficulty")):
+            breakdown = analytics.breakdown(dim).dropna(subset=["average"]).sort_values("average")
+            with column:
+                fig = go.Figure(go.Bar(x=breakdown["average"], y=breakdown[dim], orientation="h",
+                                       text=breakdown["sessions"].map(lambda n: f"{n} sessions"),
+                                       marker_color="#667eea"))
+                fig.update_layout(title=title, xaxis=dict(range=[0, 100], title="Average score"), height=320,
+                                  margin=dict(l=10, r=10, t=50, b=10))
+                st.plotly_chart(fig, use_container_width=True)
+        
+        star_averages = analytics.star_averages()
+        if any(value is not None for value in star_averages.values()):
+            fig = go.Figure(go.Bar(x=[part.title() for part in star_averages],
+                                   y=[value or 0 for value in star_averages.values()], marker_color="#764ba2"))
+            fig.update_layout(title="⭐ STAR Component Averages", yaxis=dict(range=[0, 100], title="Average score"),
+                              height=300, margin=dict(l=10, r=10, t=50, b=10))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        role_breakdown = analytics.breakdown("role")
+        if len(role_breakdown) > 1:
+            with st.expander("💼 By Target Role"):
+                st.dataframe(role_breakdown.round(1), use_container_width=True, hide_index=True)
+    elif overall.count:
+        st.info("Scores will appear here once feedback includes a score.")
+    
+    st.markdown("### 🏅 Achievements")
+    badge_cols = st.columns(4)
+    for i, (icon, title, description, earned) in enumerate(achievements(analytics)):
+        with badge_cols[i % 4]:
+            st.markdown(f"{icon if earned else '🔒'} **{title}**  \n{description}")
+    
+    st.markdown("### 📜 Practice History")
+    
+    if st.session_state.history_count == 0:
+        st.info("No practice sessions yet. Answer a question or finish a mock interview to start your history.")
+    else:
+        with st.expander("📦 Export All Sessions"):
+            formats = [fmt for fmt in BUNDLE_FORMATS if fmt != "pdf" or pdf_available()]
+            export_format = st.selectbox("Format", formats, key="export_format",
+                                         help="zip: history.jsonl plus one markdown file per session")
+            extension, mime = BUNDLE_FORMATS[export_format]
+            history_store, report_store, user_id = get_history_store(), get_report_store(), current_user_id()
+            
+            def export_bundle():
+                # Built only on click, streaming the records from the store in batches
+                return bundle_bytes(history_store, user_id, export_format, report_store)
+            
+            st.download_button(f"📥 Download {st.session_state.history_count} sessions", export_bundle,
+                               f"interview_history_{datetime.now().strftime('%Y%m%d')}.{extension}", mime,
+                               on_click="ignore", use_container_width=True)
+            st.caption(f"Downloads are capped at {MAX_BUNDLE_BYTES // (1024 * 1024)} MB; "
+                       "larger histories export with `python -m core.exports bundle`.")
+        
+        history_query = st.text_input("🔎 Search your history", placeholder="e.g. conflict with a teammate",
+                                      key="history_query")
+        if history_query.strip():
+            for score, item in user_semantic_index().search(current_user_id(), history_query, k=5):
+                col_a, col_b = st.columns([6, 1])
+                with col_a:
+                    snippet = item['text'] if len(item['text']) <= 160 else item['text'][:159] + "…"
+                    st.markdown(f"**{item['type']}** • {item['timestamp']} • {score:.0%} match  \n{snippet}")
+                with col_b:
+                    if st.button("Open", key=f"history_search_{item['record_id']}", use_container_width=True):
+                        st.session_state.history_open_id = item['record_id']
+            st.markdown("---")
+        
+        total_pages = (st.session_state.history_count - 1) // HISTORY_PAGE_SIZE + 1
+        history_page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1,
+                                       key="history_page") - 1
+        
+        for row in get_history_store().page(current_user_id(), history_page, HISTORY_PAGE_SIZE):
+            col_a, col_b = st.columns([6, 1])
+            with col_a:
+                score_label = f" • Score {row['score']:.0f}" if row['score'] is not None else ""
+                st.markdown(f"**{row['type']}** • {row['timestamp']} • {row['interview_type']}{score_label}  \n{row['title']}")
+            with col_b:
+                if st.button("Open", key=f"history_open_{row['id']}", use_container_width=True):
+                    st.session_state.history_open_id = row['id']
+        
+        if st.session_state.get('history_open_id'):
+            record = get_history_store().get(current_user_id(), st.session_state.history_open_id)
+            if record:
+                record = resolve_report(record, get_report_store())
+                st.markdown("---")
+                st.markdown(f"#### {record['type']} • {record['timestamp']}")
+                if record.get('question'):
+                    st.info(record['question'])
+                if record.get('answer'):
+                    with st.expander("✍️ Your Answer"):
+                        st.markdown(record['answer'])
+                if record.get('transcript'):
+                    with st.expander("💬 Transcript"):
+                        st.markdown(record['transcript'])
+                if record.get('feedback'):
+                    with st.expander("📊 Feedback", expanded=True):
+                        st.markdown(record['feedback'])
+                st.download_button("📥 Download Session", lambda: record_markdown(record), record_filename(record),
+                                   "text/markdown", key=f"history_download_{record['id']}", on_click="ignore")
+    
+@traced_fragment
+def toolkit_tab():
     st.markdown("## 🚀 Interview Toolkit")
     # Toolkit implementation
 
+# ============================================================================
+# PAGE ASSEMBLY
+# ============================================================================
+
+with tab1:
+    quick_practice_tab(difficulty, interview_type, role, company)
+with tab2:
+    mock_interview_tab(difficulty, interview_type, role, company)
+with tab3:
+    resume_analyzer_tab(role)
+with tab4:
+    star_coach_tab(role)
+with tab5:
+    analytics_tab()
+with tab6:
+    toolkit_tab()
+
 # Footer
 st.markdown("---")
-st.markdown("""
-<div style='text-align: center; padding: 2.5rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-            color: white; border-radius: 20px; box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);'>
-    <h2 style='margin: 0; color: white;'>🚀 AI Interview Prep Pro</h2>
-    <p style='margin: 1rem 0;'>Powered by Groq AI • Llama 3.3 70B</p>
-    <p style='opacity: 0.9;'>⚡ Lightning Fast • 🆓 Free Forever • 🤖 Advanced AI • 💬 Live Mock Interviews</p>
-    <p style='margin-top: 1rem; opacity: 0.8;'>Built with ❤️ for your career success • © 2025</p>
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(footer_html(), unsafe_allow_html=True)
+
+save_session()
+get_tracer().finish(rerun_span)
+get_tracer().write_prometheus()
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""
+Core services for AI Interview Prep Pro
+Headless building blocks (LLM access, caching, storage) used by app.py
+"""
@@ -0,0 +1,279 @@
+"""
+Incremental analytics over practice history
+Rollups are bootstrapped once with vectorized pandas over the summary rows,
+then kept current with O(1) updates per new session. Everything kept per
+session is bounded: running aggregates plus the last SERIES_POINTS scores
+for the trend chart
+"""
+
+import re
+from collections import deque
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ("interview_type", "difficulty", "role")
+STAR_COMPONENTS = ("situation", "task", "action", "result")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Scored sessions kept for the score trend (the engine lives in session_state)
+SERIES_POINTS = 1000
+
+_SCORE_RE = re.compile(r"score(?:\s*\(\s*0\s*-\s*100\s*\))?[^0-9\n]{0,25}(\d{1,3}(?:\.\d+)?)\s*(?:/\s*100|%|out of 100)?", re.I)
+
+
+def extract_score(feedback):
+    """First 0-100 score mentioned in free-text feedback, or None"""
+    if not feedback:
+        return None
+    match = _SCORE_RE.search(feedback)
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value if 0 <= value <= 100 else None
+
+
+class RunningStat:
+    """Count, mean, best, last and a rolling window of scores"""
+
+    __slots__ = ("count", "scored", "total", "best", "last", "window")
+
+    def __init__(self, window=5):
+        self.count = 0
+        self.scored = 0
+        self.total = 0.0
+        self.best = None
+        self.last = None
+        self.window = deque(maxlen=window)
+
+    def add(self, score):
+        self.count += 1
+        if score is None:
+            return
+        self.scored += 1
+        self.total += score
+        self.best = score if self.best is None else max(self.best, score)
+        self.last = score
+        self.window.append(score)
+
+    @property
+    def mean(self):
+        return self.total / self.scored if self.scored else None
+
+    @property
+    def rolling(self):
+        return sum(self.window) / len(self.window) if self.window else None
+
+    def as_dict(self):
+        return {
+            "sessions": self.count,
+            "scored": self.scored,
+            "average": self.mean,
+            "rolling": self.rolling,
+            "best": self.best,
+            "last": self.last,
+        }
+
+
+class AnalyticsEngine:
+    """Running per-dimension score series, rolling averages and streaks"""
+
+    def __init__(self, window=5, series_points=SERIES_POINTS):
+        self.window = window
+        self.overall = RunningStat(window)
+        self.by_type = {}
+        self.by_dimension = {dim: {} for dim in DIMENSIONS}
+        self.star = {part: RunningStat(window) for part in STAR_COMPONENTS}
+        self.star_complete = 0
+        # (timestamp, score, rolling average) of the latest scored sessions
+        self.series = deque(maxlen=series_points)
+        self.last_day = None
+        self.current_streak = 0
+        self.best_streak = 0
+
+    # ------------------------------------------------------------------
+    # Incremental path
+    # ------------------------------------------------------------------
+
+    def _stat(self, table, key):
+        stat = table.get(key)
+        if stat is None:
+            stat = table[key] = RunningStat(self.window)
+        return stat
+
+    def _update_streak(self, day):
+        # Same-day and out-of-order sessions can't extend the current streak
+        if self.last_day is not None and day <= self.last_day:
+            return
+        if self.last_day is not None and day == self.last_day + timedelta(days=1):
+            self.current_streak += 1
+        else:
+            self.current_streak = 1
+        self.last_day = day
+        self.best_streak = max(self.best_streak, self.current_streak)
+
+    def update(self, row):
+        """Fold one history summary row into every rollup in O(1)"""
+        score = row.get("score")
+        timestamp = _parse_timestamp(row.get("timestamp"))
+
+        self.overall.add(score)
+        self._stat(self.by_type, row.get("type") or "Unknown").add(score)
+        for dim in DIMENSIONS:
+            self._stat(self.by_dimension[dim], row.get(dim) or "Unspecified").add(score)
+
+        star = (row.get("metrics") or {}).get("star") or {}
+        for part in STAR_COMPONENTS:
+            if star.get(part) is not None:
+                self.star[part].add(star[part])
+        if star and all((star.get(part) or 0) >= 75 for part in STAR_COMPONENTS):
+            self.star_complete += 1
+
+        if score is not None and timestamp is not None:
+            self.series.append((timestamp, score, self.overall.rolling))
+        if timestamp is not None:
+            self._update_streak(timestamp.date())
+
+    # ------------------------------------------------------------------
+    # Bulk bootstrap
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_rows(cls, rows, window=5, series_points=SERIES_POINTS):
+        """Build the engine from summary rows with vectorized rollups"""
+        engine = cls(window, series_points)
+        frame = pd.DataFrame(list(rows), columns=["timestamp", "type", "score", "metrics", *DIMENSIONS])
+        if frame.empty:
+            return engine
+
+        star = pd.DataFrame(
+            [((m or {}).get("star") or {}) for m in frame["metrics"]], columns=list(STAR_COMPONENTS)
+        ).apply(pd.to_numeric, errors="coerce")
+        for part in STAR_COMPONENTS:
+            engine.star[part] = _stat_from_frame(pd.DataFrame({"score": star[part].dropna()}), window)
+        engine.star_complete = int((star.fillna(0) >= 75).all(axis=1).sum())
+
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], format=TIMESTAMP_FORMAT, errors="coerce")
+        frame["score"] = pd.to_numeric(frame["score"], errors="coerce")
+        frame["type"] = frame["type"].fillna("Unknown")
+        for dim in DIMENSIONS:
+            frame[dim] = frame[dim].fillna("").replace("", "Unspecified")
+
+        engine.overall = _stat_from_frame(frame, window)
+        engine.by_type = {key: _stat_from_frame(group, window) for key, group in frame.groupby("type", sort=False)}
+        for dim in DIMENSIONS:
+            engine.by_dimension[dim] = {
+                key: _stat_from_frame(group, window) for key, group in frame.groupby(dim, sort=False)
+            }
+
+        scored = frame.dropna(subset=["score", "timestamp"])
+        rolling = scored["score"].rolling(window, min_periods=1).mean()
+        tail = slice(-series_points, None)
+        engine.series.extend(zip(scored["timestamp"].iloc[tail].dt.to_pydatetime().tolist(),
+                                 scored["score"].iloc[tail].tolist(), rolling.iloc[tail].tolist()))
+
+        days = np.array(sorted(frame["timestamp"].dropna().dt.date.unique()), dtype="datetime64[D]")
+        if len(days):
+            breaks = np.flatnonzero(np.diff(days).astype(int) != 1)
+            run_starts = np.concatenate(([0], breaks + 1))
+            run_ends = np.concatenate((breaks, [len(days) - 1]))
+            run_lengths = run_ends - run_starts + 1
+            engine.best_streak = int(run_lengths.max())
+            engine.current_streak = int(run_lengths[-1])
+            engine.last_day = days[-1].astype(object)
+        return engine
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+
+    def streak(self, today=None):
+        """Consecutive practice days ending today (or yesterday)"""
+        today = today or date.today()
+        if self.last_day is None or (today - self.last_day).days > 1:
+            return 0
+        return self.current_streak
+
+    def type_count(self, session_type):
+        stat = self.by_type.get(session_type)
+        return stat.count if stat else 0
+
+    def star_averages(self):
+        """Average score per STAR component (None where unscored)"""
+        return {part: self.star[part].mean for part in STAR_COMPONENTS}
+
+    def breakdown(self, dim):
+        """Per-value stats for interview_type / difficulty / role (or 'type')"""
+        table = self.by_type if dim == "type" else self.by_dimension[dim]
+        return pd.DataFrame(
+            [{dim: key, **stat.as_dict()} for key, stat in table.items()],
+            columns=[dim, "sessions", "scored", "average", "rolling", "best", "last"],
+        )
+
+    def score_series(self, max_points=200):
+        """Recent scores and rolling average over time, downsampled for plotting"""
+        frame = pd.DataFrame(list(self.series), columns=["timestamp", "score", "rolling"])
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+        return downsample(frame, max_points)
+
+
+def readiness_score(engine):
+    """Interview readiness (0-100) blending practice volume with recent scores"""
+    activity = min(100, engine.overall.count * 5 + engine.type_count("Mock Interview") * 15)
+    if engine.overall.rolling is None:
+        return activity
+    return round(0.4 * activity + 0.6 * engine.overall.rolling)
+
+
+ACHIEVEMENTS = (
+    ("🎯", "First Steps", "Complete your first practice session",
+     lambda e: e.overall.count >= 1),
+    ("📚", "Dedicated Learner", "Complete 10 practice sessions",
+     lambda e: e.overall.count >= 10),
+    ("💬", "Mock Interview Pro", "Finish 5 mock interviews",
+     lambda e: e.type_count("Mock Interview") >= 5),
+    ("🏆", "High Scorer", "Score 80 or more on a session",
+     lambda e: (e.overall.best or 0) >= 80),
+    ("⭐", "STAR Master", "Score 75+ on every STAR component in one answer",
+     lambda e: e.star_complete >= 1),
+    ("🔥", "On Fire", "Practice 3 days in a row",
+     lambda e: e.best_streak >= 3),
+    ("📈", "Rising Star", "Recent average beats your overall average by 5+",
+     lambda e: e.overall.scored >= 5 and e.overall.rolling - e.overall.mean >= 5),
+)
+
+
+def achievements(engine):
+    """(icon, title, description, earned) for every achievement"""
+    return [(icon, title, description, bool(rule(engine))) for icon, title, description, rule in ACHIEVEMENTS]
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def _stat_from_frame(frame, window):
+    """RunningStat equivalent to adding every row of frame in order"""
+    stat = RunningStat(window)
+    scores = frame["score"].dropna()
+    stat.count = len(frame)
+    stat.scored = len(scores)
+    if stat.scored:
+        stat.total = float(scores.sum())
+        stat.best = float(scores.max())
+        stat.last = float(scores.iloc[-1])
+        stat.window.extend(scores.iloc[-window:].astype(float).tolist())
+    return stat
+
+
+def downsample(frame, max_points=200):
+    """Bucket-average a time series down to at most max_points rows"""
+    if len(frame) <= max_points:
+        return frame
+    buckets = np.arange(len(frame)) * max_points // len(frame)
+    return frame.groupby(buckets).agg({"timestamp": "last", "score": "mean", "rolling": "last"}).reset_index(drop=True)
@@ -0,0 +1,287 @@
+"""
+Pluggable LLM backends
+Groq, any OpenAI-compatible endpoint, and a deterministic local stub for
+offline load and latency testing. Select with LLM_BACKEND=groq|openai|stub.
+"""
+
+import hashlib
+import json
+import os
+import random
+import time
+
+GROQ_DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+
+class Completion:
+    """Result of a non-streaming chat completion"""
+
+    def __init__(self, text, model, prompt_tokens=0, completion_tokens=0):
+        self.text = text
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class StubBackendError(Exception):
+    """Injected stub failure, shaped like a transient HTTP 503"""
+
+    status_code = 503
+
+
+class _ChatCompletionsBackend:
+    """Shared logic for SDKs exposing client.chat.completions.create"""
+
+    name = "base"
+    default_model = None
+
+    def __init__(self, client):
+        self.client = client
+
+    def complete(self, model, messages, temperature=0.7, max_tokens=500, **kwargs):
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        usage = getattr(response, "usage", None)
+        return Completion(
+            response.choices[0].message.content,
+            model,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+    def stream(self, model, messages, temperature=0.7, max_tokens=500, **kwargs):
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **kwargs
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+class GroqBackend(_ChatCompletionsBackend):
+    """Groq cloud (default)"""
+
+    name = "groq"
+    default_model = GROQ_DEFAULT_MODEL
+
+    def __init__(self, api_key=None, max_retries=0):
+        from groq import Groq
+
+        # Retries are owned by core.scheduler, so the SDK's own are off by default
+        super().__init__(Groq(api_key=api_key or os.getenv("GROQ_API_KEY"), max_retries=max_retries))
+
+
+class OpenAICompatibleBackend(_ChatCompletionsBackend):
+    """Any endpoint speaking the OpenAI chat completions API (vLLM, Ollama, the stub server...)"""
+
+    name = "openai"
+
+    def __init__(self, base_url=None, api_key=None, default_model=None, max_retries=0):
+        from openai import OpenAI
+
+        super().__init__(OpenAI(
+            base_url=base_url or os.getenv("OPENAI_BASE_URL"),
+            api_key=api_key or os.getenv("OPENAI_API_KEY") or "not-needed",
+            max_retries=max_retries,
+        ))
+        self.default_model = default_model or os.getenv("OPENAI_MODEL", GROQ_DEFAULT_MODEL)
+
+
+# ============================================================================
+# DETERMINISTIC STUB
+# ============================================================================
+
+CANNED_COMPLETIONS = {
+    "question": [
+        "**Question:** Tell me about a time you had to deliver a critical project under a tight deadline. "
+        "How did you prioritize and what was the outcome?\n\n"
+        "**What they're looking for:** Prioritization, ownership, clear communication and a measurable result.",
+        "**Question:** Design a rate limiter for a public API serving 10,000 requests per second. "
+        "Walk me through the data structures and trade-offs.\n\n"
+        "**What they're looking for:** Structured thinking, knowledge of token buckets and distributed state.",
+        "**Question:** Describe a disagreement with a teammate about a technical decision. "
+        "How did you resolve it?\n\n"
+        "**What they're looking for:** Empathy, data-driven reasoning and a constructive outcome.",
+    ],
+    "interviewer": [
+        "Thanks for sharing that. Could you walk me through the specific actions you personally took, "
+        "and how you measured the impact?",
+        "That's helpful context. What would you do differently if you faced the same situation again?",
+        "Great. Let's switch gears: tell me about a time you had to learn a new technology quickly. How did you approach it?",
+    ],
+    "summary": [
+        "The candidate described leading a migration project, cited a 30% cost reduction, "
+        "and was asked about prioritization and conflict resolution. Probe for personal ownership.",
+    ],
+    "feedback": [
+        "**Score:** 72/100\n\n**Strengths:**\n- Clear context\n- Relevant example\n- Shows ownership\n\n"
+        "**Improvements:**\n- Quantify the result\n- Say \"I\" instead of \"we\"\n- Tighten the situation\n\n"
+        "**STAR Analysis:** Situation and Task are clear; Action needs more detail; Result lacks metrics.",
+    ],
+}
+
+# Superset of every structured schema in core.structured
+CANNED_JSON = {
+    "score": 72,
+    "strengths": ["Clear context", "Relevant example", "Shows ownership"],
+    "improvements": ["Quantify the result", "Say \"I\" instead of \"we\"", "Tighten the situation"],
+    "star": {
+        "situation": {"score": 80, "feedback": "Context is clear and concise."},
+        "task": {"score": 75, "feedback": "Your responsibility is stated."},
+        "action": {"score": 65, "feedback": "Describe the specific steps you personally took."},
+        "result": {"score": 55, "feedback": "Add a measurable outcome."},
+    },
+    "hiring_decision": "Lean hire",
+    "feedback": "Clear, but name the specific steps you took and the measurable outcome.",
+    "suggestion": "Lead with your own action and close with a number, e.g. \"cut latency by 40%\".",
+    "culture": ["Customer obsession", "High ownership", "Data-driven decisions"],
+    "interview_process": ["Recruiter screen", "Technical phone screen", "4-5 round onsite loop"],
+    "common_questions": ["Tell me about a time you disagreed with your manager.", "Design a URL shortener."],
+    "values": ["Bias for action", "Clear written communication"],
+    "tips": ["Prepare 6-8 STAR stories with metrics", "Ask about team-level success metrics"],
+    "salary_ranges": {"entry": "$110k-$140k", "mid": "$140k-$190k", "senior": "$190k-$260k"},
+    "negotiation": ["Anchor on total compensation", "Get competing offers in writing"],
+    "value_points": ["Shipped features end to end", "Measurable impact on latency or cost"],
+    "market_trends": ["Strong demand for AI/ML experience", "Hybrid work is the norm"],
+}
+
+FILLER_SENTENCE = (
+    "Focus on specific actions you took, quantify the outcome, and connect it to what the role needs. "
+)
+
+
+def _classify(messages):
+    """Pick a canned completion family from the prompt"""
+    text = " ".join(m.get("content", "") for m in messages).lower()
+    if "running summary" in text:
+        return "summary"
+    if "generate a realistic" in text:
+        return "question"
+    if "analyze this" in text or "check for common mistakes" in text:
+        return "feedback"
+    return "interviewer"
+
+
+class StubBackend:
+    """Replays canned completions with configurable latency and token rate
+
+    Output is a pure function of the request, so runs are reproducible.
+    first_token_ms is the time to first token, tokens_per_second the decode
+    rate, jitter_ms a uniform +/- jitter seeded by the request, and
+    fill_ratio the share of max_tokens to emit (padded with filler text).
+    latency_sampler(rng) may override first_token_ms with any distribution;
+    failure_rate injects random errors for resilience testing.
+    """
+
+    name = "stub"
+    default_model = GROQ_DEFAULT_MODEL
+
+    def __init__(self, first_token_ms=200.0, tokens_per_second=250.0, jitter_ms=0.0,
+                 fill_ratio=0.5, latency_sampler=None, failure_rate=0.0):
+        self.first_token_ms = first_token_ms
+        self.tokens_per_second = tokens_per_second
+        self.jitter_ms = jitter_ms
+        self.fill_ratio = fill_ratio
+        self.latency_sampler = latency_sampler
+        self.failure_rate = failure_rate
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            first_token_ms=float(os.getenv("STUB_FIRST_TOKEN_MS", "200")),
+            tokens_per_second=float(os.getenv("STUB_TOKENS_PER_SECOND", "250")),
+            jitter_ms=float(os.getenv("STUB_JITTER_MS", "0")),
+            fill_ratio=float(os.getenv("STUB_FILL_RATIO", "0.5")),
+            failure_rate=float(os.getenv("STUB_FAILURE_RATE", "0")),
+        )
+
+    def _seed(self, model, messages, temperature, max_tokens):
+        payload = json.dumps([model, messages, temperature, max_tokens], sort_keys=True)
+        return int(hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16], 16)
+
+    def _plan(self, model, messages, temperature, max_tokens):
+        """Deterministic (tokens, first_token_delay) for a request"""
+        # Injected faults are independent of the request so retries can succeed
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise StubBackendError("Stub backend injected failure")
+
+        rng = random.Random(self._seed(model, messages, temperature, max_tokens))
+
+        variants = CANNED_COMPLETIONS[_classify(messages)]
+        text = variants[rng.randrange(len(variants))]
+        words = text.split(" ")
+        target = max(len(words), int(max_tokens * self.fill_ratio))
+        while len(words) < target:
+            words.extend(FILLER_SENTENCE.split(" "))
+        words = words[:max(1, min(target, max_tokens))]
+
+        if self.latency_sampler:
+            delay_ms = self.latency_sampler(rng)
+        else:
+            delay_ms = self.first_token_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return words, max(0.0, delay_ms) / 1000.0
+
+    def _prompt_tokens(self, messages):
+        return sum(len(m.get("content", "")) // 4 + 1 for m in messages)
+
+    def complete(self, model, messages, temperature=0.7, max_tokens=500, **kwargs):
+        words, delay = self._plan(model, messages, temperature, max_tokens)
+        if (kwargs.get("response_format") or {}).get("type") in ("json_object", "json_schema"):
+            text = json.dumps(CANNED_JSON)
+            words = text.split(" ")
+        time.sleep(delay + len(words) / self.tokens_per_second)
+        return Completion(" ".join(words), model, self._prompt_tokens(messages), len(words))
+
+    def stream(self, model, messages, temperature=0.7, max_tokens=500, **kwargs):
+        words, delay = self._plan(model, messages, temperature, max_tokens)
+        time.sleep(delay)
+        per_token = 1.0 / self.tokens_per_second
+        for i, word in enumerate(words):
+            time.sleep(per_token)
+            yield word if i == 0 else " " + word
+
+
+# ============================================================================
+# FACTORY
+# ============================================================================
+
+BACKENDS = {
+    "groq": GroqBackend,
+    "openai": OpenAICompatibleBackend,
+    "stub": StubBackend.from_env,
+}
+
+
+def backend_name():
+    """Configured backend name"""
+    return os.getenv("LLM_BACKEND", "groq").lower()
+
+
+def config_error(name=None):
+    """Human-readable reason the configured backend can't start, or None"""
+    name = name or backend_name()
+    if name not in BACKENDS:
+        return f"Unknown LLM_BACKEND '{name}' (expected one of: {', '.join(BACKENDS)})"
+    if name == "groq" and not os.getenv("GROQ_API_KEY"):
+        return "No Groq API key found!"
+    if name == "openai" and not os.getenv("OPENAI_BASE_URL") and not os.getenv("OPENAI_API_KEY"):
+        return "Set OPENAI_BASE_URL (and OPENAI_API_KEY if the endpoint needs one)"
+    return None
+
+
+def create_backend(name=None):
+    """Instantiate the configured backend"""
+    return BACKENDS[name or backend_name()]()
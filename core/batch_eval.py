@@ -0,0 +1,186 @@
+"""
+Batch answer evaluation
+Scores a corpus of (question, answer) pairs offline with the same prompts as
+Quick Practice. Input is streamed from JSONL or CSV through a bounded pool of
+workers; each result is appended to the output JSONL as soon as it finishes,
+so an interrupted run resumes where it left off:
+
+    python -m core.batch_eval answers.jsonl -o scores.jsonl --workers 8
+    LLM_BACKEND=stub python -m core.batch_eval cohort.csv -o scores.jsonl --sections score,star
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from core.backends import backend_name, config_error, create_backend
+from core.cache import ResponseCache
+from core.linter import lint
+from core.llm import LLMClient
+from core.prompts import FEEDBACK_SECTIONS, feedback_section_calls
+from core.routing import ModelRouter
+from core.scheduler import BACKGROUND, RequestScheduler
+
+DEFAULT_SECTIONS = ("score", "star")
+
+
+def record_id(row):
+    """Stable id for an input row: its "id" field, else a content hash"""
+    if row.get("id") not in (None, ""):
+        return str(row["id"])
+    digest = hashlib.sha256(f"{row.get('question', '')}\x00{row.get('answer', '')}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def read_rows(path):
+    """Yield input rows (dicts with question/answer) from .jsonl or .csv"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def completed_ids(path):
+    """Ids already present in an output JSONL (for resume); skips a torn last line"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not result.get("error"):
+                done.add(result["id"])
+    return done
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100) of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def evaluate(llm, row, sections):
+    """Score one answer; returns the result record"""
+    question, answer = row.get("question", ""), row.get("answer", "")
+    result = {"id": record_id(row), "question": question, "answer": answer}
+    started = time.perf_counter()
+    try:
+        for name, kwargs in feedback_section_calls(question, answer, sections).items():
+            kwargs["priority"] = BACKGROUND
+            if "schema" in kwargs:
+                result.update(llm.complete_json(**kwargs))
+            else:
+                result[name] = llm.complete(**kwargs)
+        report = lint(answer)
+        result["lint"] = {**report.stats, "star_shares": report.star_shares,
+                          "issues": [issue.message for issue in report.summary_issues]}
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def run(llm, rows, output, workers=8, sections=DEFAULT_SECTIONS, resume=True, limit=None, progress=None):
+    """Evaluate rows with at most `workers` in flight; returns summary stats
+
+    Results are appended to `output` (one JSON line each, flushed). With
+    resume, ids already scored successfully in `output` are skipped.
+    """
+    done = completed_ids(output) if resume else set()
+    if not resume and os.path.exists(output):
+        os.remove(output)
+
+    latencies = []
+    counts = {"submitted": 0, "skipped": 0, "succeeded": 0, "failed": 0}
+    started = time.perf_counter()
+
+    with open(output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        def drain(pending):
+            """Write out whatever finished first; results are written only from this thread"""
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                counts["failed" if result.get("error") else "succeeded"] += 1
+                latencies.append(result["latency_ms"])
+                if progress:
+                    progress(counts)
+            return pending
+
+        pending = set()
+        for row in rows:
+            if limit is not None and counts["submitted"] >= limit:
+                break
+            if record_id(row) in done:
+                counts["skipped"] += 1
+                continue
+            # Bounded in-flight work keeps memory flat for any corpus size
+            while len(pending) >= workers:
+                pending = drain(pending)
+            pending.add(pool.submit(evaluate, llm, row, sections))
+            counts["submitted"] += 1
+        while pending:
+            pending = drain(pending)
+
+    elapsed = time.perf_counter() - started
+    processed = counts["succeeded"] + counts["failed"]
+    return {
+        **counts,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(processed / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a JSONL/CSV corpus of interview answers")
+    parser.add_argument("input", help="JSONL or CSV with question and answer fields (optional id)")
+    parser.add_argument("-o", "--output", default="scores.jsonl")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--sections", default=",".join(DEFAULT_SECTIONS),
+                        help=f"comma-separated feedback sections ({', '.join(FEEDBACK_SECTIONS)})")
+    parser.add_argument("--limit", type=int, default=None, help="score at most N new rows")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of resuming")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    args = parser.parse_args()
+
+    sections = [name.strip() for name in args.sections.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in FEEDBACK_SECTIONS]
+    if unknown:
+        parser.error(f"unknown sections: {', '.join(unknown)}")
+    error = config_error()
+    if error:
+        parser.error(error)
+
+    llm = LLMClient(create_backend(), cache=None if args.no_cache else ResponseCache.from_env(),
+                    model=os.getenv("LLM_MODEL"), scheduler=RequestScheduler.from_env(),
+                    router=ModelRouter.from_env(backend_name()))
+
+    def progress(counts):
+        print(f"\r{counts['succeeded']} scored, {counts['failed']} failed", end="", file=sys.stderr, flush=True)
+
+    stats = run(llm, read_rows(args.input), args.output, args.workers, sections,
+                resume=not args.no_resume, limit=args.limit, progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
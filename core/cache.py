@@ -0,0 +1,224 @@
+"""
+Persistent LLM response cache
+Content-addressed SQLite store shared by every session and process on the host
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "responses.sqlite3")
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+
+# Calls at this temperature or hotter are sampled on purpose (interviewer
+# turns, question generation) and are never served from cache unless the
+# caller forces it.
+CACHE_MIN_SAMPLED_TEMPERATURE = 0.7
+
+
+def make_cache_key(model, messages, temperature, max_tokens):
+    """Stable hash of everything that determines a completion"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": round(float(temperature), 3),
+            "max_tokens": int(max_tokens),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(temperature, use_cache=None):
+    """Decide whether a call may use the cache (explicit flag wins)"""
+    if use_cache is not None:
+        return bool(use_cache)
+    return temperature < CACHE_MIN_SAMPLED_TEMPERATURE
+
+
+class ResponseCache:
+    """SQLite-backed cache with TTL expiry, LRU eviction and hit/miss counters"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO counters(name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0)"
+            )
+
+        # Counters for this process only; the table holds the shared totals
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from RESPONSE_CACHE_* environment variables"""
+        return cls(
+            path=os.getenv("RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH),
+            ttl_seconds=int(os.getenv("RESPONSE_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        )
+
+    def _bump(self, name, amount=1):
+        self._conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    def get(self, key):
+        """Return the cached value or None, refreshing its LRU position"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._bump("hits")
+                self.hits += 1
+                return row[0]
+
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bump("misses")
+            self.misses += 1
+            return None
+
+    def set(self, key, value, model=None):
+        """Store a value and evict expired / least recently used entries"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses(key, model, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, value, now, now),
+            )
+            expired = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+
+            overflow = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+            evicted = expired + max(overflow, 0)
+            if evicted:
+                self._bump("evictions", evicted)
+
+    def clear(self):
+        """Drop all entries and reset the shared counters"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("UPDATE counters SET value = 0")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and occupancy, for sizing the cache"""
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM responses"
+            ).fetchone()
+
+        lookups = counters.get("hits", 0) + counters.get("misses", 0)
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": counters.get("hits", 0) / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "max_entries": self.max_entries,
+            "process_hits": self.hits,
+            "process_misses": self.misses,
+        }
+
+
+class SharedResponseCache:
+    """ResponseCache interface on a shared state backend (see core.state)
+
+    Entries expire after ttl_seconds; there is no LRU bound here, so size
+    a Redis deployment with a maxmemory eviction policy instead.
+    """
+
+    def __init__(self, state, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.state = state
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, state):
+        return cls(state, ttl_seconds=int(os.getenv("RESPONSE_CACHE_TTL", DEFAULT_TTL_SECONDS)))
+
+    def get(self, key):
+        value = self.state.get(f"response:{key}")
+        if value is None:
+            self.state.incr("response_stats:misses")
+            self.misses += 1
+            return None
+        self.state.incr("response_stats:hits")
+        self.hits += 1
+        return value["value"]
+
+    def set(self, key, value, model=None):
+        self.state.set(f"response:{key}", {"value": value, "model": model}, ttl=self.ttl_seconds)
+
+    def clear(self):
+        for key in self.state.keys("response:") + self.state.keys("response_stats:"):
+            self.state.delete(key)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        hits = self.state.get("response_stats:hits") or 0
+        misses = self.state.get("response_stats:misses") or 0
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": 0,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(self.state.keys("response:")),
+            "size_bytes": None,
+            "max_entries": None,
+            "process_hits": self.hits,
+            "process_misses": self.misses,
+        }
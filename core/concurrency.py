@@ -0,0 +1,45 @@
+"""
+Concurrent execution layer for independent LLM calls
+Dispatches a batch of blocking calls on a shared thread pool and gathers results
+"""
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_MAX_WORKERS = int(os.getenv("LLM_MAX_WORKERS", "16"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide thread pool shared by every session"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="llm")
+        return _executor
+
+
+def fan_out(tasks, executor=None):
+    """Run independent callables concurrently, yielding results as they finish
+
+    tasks maps a name to a zero-argument callable. Yields (name, result, error)
+    tuples in completion order; exactly one of result/error is set. Each task
+    runs in a copy of the caller's context (e.g. its tracing call site).
+    """
+    executor = executor or get_executor()
+    futures = {executor.submit(contextvars.copy_context().run, fn): name for name, fn in tasks.items()}
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            yield name, future.result(), None
+        except Exception as e:
+            yield name, None, e
+
+
+def gather(tasks, executor=None):
+    """Run independent callables concurrently and return {name: (result, error)}"""
+    return {name: (result, error) for name, result, error in fan_out(tasks, executor)}
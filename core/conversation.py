@@ -0,0 +1,125 @@
+"""
+Mock interview conversation context
+Builds multi-turn chat messages with a stable prefix and compacts old turns
+into a rolling summary once they exceed a token budget
+"""
+
+import os
+
+from core.tokens import count_tokens
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("MOCK_CONTEXT_TOKEN_BUDGET", "3000"))
+DEFAULT_KEEP_RECENT = 4
+
+KICKOFF_MESSAGE = "Hello, I'm ready to start the interview."
+
+ROLE_MAP = {"interviewer": "assistant", "candidate": "user"}
+
+
+def interviewer_system_prompt(role, difficulty, company):
+    """Persona prompt that stays identical for the whole interview"""
+    return f"""You are a professional interviewer for {role or 'Software Engineer'} at {difficulty.split()[0]} level{f' at {company}' if company else ''}.
+
+Run a realistic 4-5 question interview:
+- Start by greeting warmly, introducing yourself (fictional name/title) and asking the first question
+- After each answer: if strong, ask a follow-up or new question; if weak, ask a clarifying question
+- Ask ONE question at a time
+- Be conversational and professional"""
+
+
+def summary_message(summary):
+    """System message carrying the compacted earlier part of the interview"""
+    return {"role": "system", "content": f"Summary of the earlier part of this interview:\n{summary}"}
+
+
+def build_turn_messages(system_prompt, mock_messages, summary="", summarized_upto=0, instruction=None):
+    """Chat messages for the next interviewer turn
+
+    Layout: persona, kickoff, optional summary, live turns, optional trailing
+    instruction. Everything before the instruction only ever grows by
+    appending, so consecutive turns share their prefix.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": KICKOFF_MESSAGE},
+    ]
+    if summary:
+        messages.append(summary_message(summary))
+    messages.extend(
+        {"role": ROLE_MAP[m["role"]], "content": m["content"]}
+        for m in mock_messages[summarized_upto:]
+    )
+    if instruction:
+        messages.append({"role": "system", "content": instruction})
+    return messages
+
+
+def next_turn_instruction(interviewer_count):
+    """Trailing instruction for the next interviewer turn"""
+    if interviewer_count < 4:
+        return f"Question #{interviewer_count + 1} of 4-5. Ask ONE question only."
+    return "Conclude interview warmly. Thank candidate. Ask if they have questions. Mention next steps. 2-3 sentences."
+
+
+def live_tokens(mock_messages, summarized_upto=0):
+    """Estimated tokens of the turns that are still sent verbatim"""
+    return sum(count_tokens(m["content"]) for m in mock_messages[summarized_upto:])
+
+
+def compaction_cutoff(mock_messages, summarized_upto=0, budget=DEFAULT_TOKEN_BUDGET,
+                      keep_recent=DEFAULT_KEEP_RECENT):
+    """Index up to which turns should be folded into the summary, or None
+
+    Only triggers once live turns exceed the budget, and always keeps the
+    most recent turns verbatim so the interviewer can follow up on them.
+    """
+    if live_tokens(mock_messages, summarized_upto) <= budget:
+        return None
+    cutoff = len(mock_messages) - keep_recent
+    return cutoff if cutoff > summarized_upto else None
+
+
+def summarization_messages(previous_summary, turns):
+    """Prompt that folds a block of turns into the running summary"""
+    lines = [
+        f"{'INTERVIEWER' if m['role'] == 'interviewer' else 'CANDIDATE'}: {m['content']}"
+        for m in turns
+    ]
+    prompt = f"""Update the running summary of a mock interview.
+
+Previous summary:
+{previous_summary or '(none)'}
+
+New turns:
+{chr(10).join(lines)}
+
+Write a compact summary (max 150 words) keeping: questions already asked, key claims,
+metrics and examples the candidate gave, and any weak spots worth probing."""
+    return [{"role": "user", "content": prompt}]
+
+
+def compact(mock_messages, summary, summarized_upto, summarize, budget=DEFAULT_TOKEN_BUDGET,
+            keep_recent=DEFAULT_KEEP_RECENT):
+    """Fold old turns into the summary when over budget
+
+    summarize(previous_summary, turns) returns the new summary text (or None
+    on failure), e.g. from the "mock.summarize" template.
+    Returns the (summary, summarized_upto) pair to store.
+    """
+    cutoff = compaction_cutoff(mock_messages, summarized_upto, budget, keep_recent)
+    if cutoff is None:
+        return summary, summarized_upto
+
+    new_summary = summarize(summary, mock_messages[summarized_upto:cutoff])
+    if not new_summary:
+        return summary, summarized_upto
+    return new_summary, cutoff
+
+
+def build_transcript(mock_messages):
+    """Markdown transcript of the full interview"""
+    parts = ["# Mock Interview Transcript\n\n"]
+    for m in mock_messages:
+        role_label = "**🤖 INTERVIEWER**" if m["role"] == "interviewer" else "**👤 YOU**"
+        parts.append(f"{role_label}\n{m['content']}\n\n---\n\n")
+    return "".join(parts)
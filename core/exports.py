@@ -0,0 +1,270 @@
+"""
+Report exports
+Finished reports are written once to a content-addressed store (one file per
+SHA-256 digest under .data/exports), and downloads read them by reference
+only when the button is clicked; a report made of several parts (transcript
++ feedback) is joined at download time instead of being stored again. History
+records keep only the references ("report") and are resolved on read.
+
+A user's whole history can be bundled as JSONL, a zip (history.jsonl plus
+one markdown file per session) or a PDF. Records stream from the history
+store in batches. The CLI writes them straight to a file, so its memory stays
+bounded by the batch size rather than the history size (PDF pages are the
+exception: the optional fpdf2 renderer keeps the document in memory until it
+is written). The download button gets the bundle as bytes, which Streamlit
+keeps in memory anyway, so it is capped at MAX_BUNDLE_BYTES.
+
+    python -m core.exports bundle --key "<history key>" --format zip -o history.zip
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import zipfile
+
+DEFAULT_EXPORT_DIR = os.path.join(".data", "exports")
+# Largest bundle built in memory for a download; the CLI has no cap
+MAX_BUNDLE_BYTES = 50 * 1024 * 1024
+
+# format -> (file extension, MIME type)
+BUNDLE_FORMATS = {
+    "zip": ("zip", "application/zip"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "pdf": ("pdf", "application/pdf"),
+}
+
+
+class ExportError(ValueError):
+    """An export that can't be produced (unknown reference, missing optional dependency)"""
+
+
+class ReportStore:
+    """Write-once blobs addressed by the SHA-256 of their bytes"""
+
+    def __init__(self, root=DEFAULT_EXPORT_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("EXPORT_DIR", DEFAULT_EXPORT_DIR))
+
+    def path(self, ref):
+        if not re.fullmatch(r"[0-9a-f]{64}", ref or ""):
+            raise ExportError(f"Bad export reference: {ref!r}")
+        return os.path.join(self.root, ref[:2], ref)
+
+    def put(self, data):
+        """Store text or bytes; returns its reference (writing nothing if already stored)"""
+        return self.put_stream([data.encode("utf-8") if isinstance(data, str) else data])
+
+    def put_stream(self, chunks):
+        """Store an iterable of byte chunks without holding them all; returns the reference"""
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+            ref = digest.hexdigest()
+            path = self.path(ref)
+            if os.path.exists(path):
+                os.remove(tmp)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return ref
+
+    def exists(self, ref):
+        return os.path.exists(self.path(ref))
+
+    def open(self, ref):
+        try:
+            return open(self.path(ref), "rb")
+        except FileNotFoundError:
+            raise ExportError(f"Export {ref[:12]} is no longer stored")
+
+    def read(self, *refs, separator=b"\n\n"):
+        """The referenced blobs joined with separator"""
+        parts = []
+        for ref in refs:
+            with self.open(ref) as f:
+                parts.append(f.read())
+        return separator.join(parts)
+
+    def loader(self, *refs, separator=b"\n\n"):
+        """Zero-argument callable reading the blobs on demand (e.g. for st.download_button)"""
+        return lambda: self.read(*refs, separator=separator)
+
+    def stats(self):
+        files = size = 0
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if not name.startswith(".tmp-"):
+                    files += 1
+                    size += os.path.getsize(os.path.join(directory, name))
+        return {"files": files, "size_bytes": size}
+
+
+def resolve_report(record, store):
+    """record with the report parts it only references (transcript, feedback) read back in"""
+    missing = {key: ref for key, ref in (record.get("report") or {}).items() if not record.get(key)}
+    if not missing:
+        return record
+    record = dict(record)
+    for key, ref in missing.items():
+        try:
+            record[key] = store.read(ref).decode("utf-8")
+        except ExportError:
+            record[key] = None
+    return record
+
+
+def record_markdown(record):
+    """One history record as a standalone markdown document"""
+    lines = [f"# {record.get('type', 'Session')} • {record.get('timestamp', '')}"]
+    details = [f"**{label}:** {record[key]}" for key, label in
+               (("role", "Role"), ("interview_type", "Type"), ("difficulty", "Difficulty"),
+                ("score", "Score"), ("hiring_decision", "Hiring decision")) if record.get(key) is not None]
+    if details:
+        lines.append("  \n".join(details))
+    if record.get("question"):
+        lines.append(record["question"])
+    for key, title in (("answer", "Answer"), ("transcript", "Transcript"), ("feedback", "Feedback")):
+        if record.get(key):
+            lines.append(f"## {title}\n\n{record[key]}")
+    return "\n\n".join(lines) + "\n"
+
+
+def record_filename(record):
+    slug = re.sub(r"[^a-z0-9]+", "-", (record.get("type") or "session").lower()).strip("-")
+    return f"{record.get('id', 0):05d}-{slug}.md"
+
+
+def iter_jsonl(records):
+    """Records as JSON lines, one encoded chunk at a time"""
+    for record in records:
+        yield (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def write_jsonl(records, out):
+    for chunk in iter_jsonl(records):
+        out.write(chunk)
+
+
+def write_zip(open_records, out):
+    """history.jsonl plus one markdown file per session
+
+    open_records() returns a fresh record iterator; it is called twice so no
+    pass keeps more than one batch of records around.
+    """
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        info = zipfile.ZipInfo("history.jsonl", time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(info, "w", force_zip64=True) as entry:
+            write_jsonl(open_records(), entry)
+        for record in open_records():
+            archive.writestr(f"sessions/{record_filename(record)}", record_markdown(record))
+
+
+def write_pdf(records, out):
+    """Every record as text pages in one PDF (needs fpdf2)"""
+    try:
+        from fpdf import FPDF
+    except ImportError:
+        raise ExportError("PDF export needs fpdf2 (pip install fpdf2)")
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    for record in records:
+        pdf.add_page()
+        pdf.set_font("Helvetica", size=10)
+        # The core PDF fonts are Latin-1 only
+        text = record_markdown(record).encode("latin-1", "replace").decode("latin-1")
+        pdf.multi_cell(0, 5, text)
+    out.write(bytes(pdf.output()))
+
+
+def pdf_available():
+    return importlib.util.find_spec("fpdf") is not None
+
+
+def write_bundle(history, user_id, fmt, out, store=None):
+    """Stream a user's whole history to a binary file object in the given format
+
+    With a store, report parts that records only reference are read back in.
+    """
+    if store is None:
+        open_records = lambda: history.iter_records(user_id)
+    else:
+        open_records = lambda: (resolve_report(record, store) for record in history.iter_records(user_id))
+    if fmt == "jsonl":
+        write_jsonl(open_records(), out)
+    elif fmt == "zip":
+        write_zip(open_records, out)
+    elif fmt == "pdf":
+        write_pdf(open_records(), out)
+    else:
+        raise ExportError(f"Unknown export format: {fmt} (expected {', '.join(BUNDLE_FORMATS)})")
+
+
+class _CappedBuffer(io.BytesIO):
+    """BytesIO that raises ExportError as soon as it outgrows max_bytes"""
+
+    def __init__(self, max_bytes):
+        super().__init__()
+        self.max_bytes = max_bytes
+
+    def write(self, data):
+        if self.tell() + len(data) > self.max_bytes:
+            raise ExportError(f"History bundle is over {self.max_bytes // (1024 * 1024)} MB; "
+                              "export it with python -m core.exports bundle instead")
+        return super().write(data)
+
+
+def bundle_bytes(history, user_id, fmt, store=None, max_bytes=MAX_BUNDLE_BYTES):
+    """A user's history bundle as bytes, built in memory up to max_bytes"""
+    with _CappedBuffer(max_bytes) as buffer:
+        write_bundle(history, user_id, fmt, buffer, store)
+        return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a user's practice history")
+    parser.add_argument("command", choices=("bundle",))
+    owner = parser.add_mutually_exclusive_group(required=True)
+    owner.add_argument("--key", help="the history key entered in the app's profile")
+    owner.add_argument("--user", help="a raw history owner id, e.g. a session id from before history keys")
+    parser.add_argument("--format", choices=tuple(BUNDLE_FORMATS), default="zip")
+    parser.add_argument("-o", "--output", default=None, help="output file (default: history.<ext>)")
+    args = parser.parse_args()
+
+    from core.history_store import HistoryStore, user_key
+
+    try:
+        user_id = user_key(args.key) if args.key is not None else args.user
+    except ValueError as e:
+        parser.error(str(e))
+    output = args.output or f"history.{BUNDLE_FORMATS[args.format][0]}"
+    try:
+        with open(output, "wb") as out:
+            write_bundle(HistoryStore.from_env(), user_id, args.format, out, ReportStore.from_env())
+    except ExportError as e:
+        os.remove(output)
+        parser.error(str(e))
+    print(f"Wrote {output} ({os.path.getsize(output) / 1024:.1f} KB)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Persistent practice history
+Append-only SQLite store keyed by user. Summary columns (plus a small JSON
+"metrics" column of typed numeric fields) are queryable and paged into the
+UI; the full record (question, answer, transcript, feedback) is stored as
+zlib-compressed JSON and only loaded on demand.
+
+Users are identified by a history key they choose; only a salted PBKDF2
+hash of it (user_key) is stored.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+DEFAULT_HISTORY_PATH = os.path.join(".data", "history.sqlite3")
+
+MIN_HISTORY_KEY_CHARS = 8
+HISTORY_KEY_SALT = b"interview-prep-history-key"
+HISTORY_KEY_ITERATIONS = 200_000
+
+SUMMARY_COLUMNS = ("id", "timestamp", "type", "interview_type", "difficulty", "role", "score", "title", "metrics")
+
+
+def summary_title(entry, limit=120):
+    """Short one-line label for a history entry"""
+    text = entry.get("question") or entry.get("title") or entry.get("type", "Session")
+    text = " ".join(text.replace("**Question:**", "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+@functools.lru_cache(maxsize=256)
+def user_key(history_key):
+    """History owner id for a user-chosen history key (slow to brute-force)"""
+    if len(history_key) < MIN_HISTORY_KEY_CHARS:
+        raise ValueError(f"History keys need at least {MIN_HISTORY_KEY_CHARS} characters")
+    digest = hashlib.pbkdf2_hmac("sha256", history_key.encode("utf-8"), HISTORY_KEY_SALT, HISTORY_KEY_ITERATIONS)
+    return "key:" + digest.hex()
+
+
+def compress(entry):
+    return zlib.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def decompress(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _summary(row):
+    summary = dict(zip(SUMMARY_COLUMNS, row))
+    summary["metrics"] = json.loads(summary["metrics"]) if summary["metrics"] else {}
+    return summary
+
+
+class HistoryStore:
+    """Append-only per-user session history"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    type TEXT,
+                    interview_type TEXT,
+                    difficulty TEXT,
+                    role TEXT,
+                    score REAL,
+                    title TEXT,
+                    payload BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id, id)")
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+            if "metrics" not in columns:
+                self._conn.execute("ALTER TABLE sessions ADD COLUMN metrics TEXT")
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("HISTORY_DB_PATH", DEFAULT_HISTORY_PATH))
+
+    def append(self, user_id, entry):
+        """Store a full history entry and return its summary row"""
+        row = {
+            "timestamp": entry.get("timestamp", ""),
+            "type": entry.get("type"),
+            "interview_type": entry.get("interview_type"),
+            "difficulty": entry.get("difficulty"),
+            "role": entry.get("role"),
+            "score": entry.get("score"),
+            "title": summary_title(entry),
+            "metrics": entry.get("metrics") or {},
+        }
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO sessions(user_id, timestamp, type, interview_type, difficulty, role, score, title, "
+                "metrics, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, row["timestamp"], row["type"], row["interview_type"], row["difficulty"],
+                 row["role"], row["score"], row["title"], json.dumps(row["metrics"]), compress(entry)),
+            )
+        row["id"] = cursor.lastrowid
+        return row
+
+    def reassign(self, from_user, to_user):
+        """Move every session of one owner to another; returns how many moved"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE sessions SET user_id = ? WHERE user_id = ?", (to_user, from_user)
+            ).rowcount
+
+    def count(self, user_id):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def page(self, user_id, page=0, page_size=10):
+        """Summary rows, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM sessions WHERE user_id = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+                (user_id, page_size, page * page_size),
+            ).fetchall()
+        return [_summary(row) for row in rows]
+
+    def get(self, user_id, record_id):
+        """Full record (decompressed), or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM sessions WHERE user_id = ? AND id = ?", (user_id, record_id)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = decompress(row[0])
+        entry["id"] = record_id
+        return entry
+
+    def iter_summaries(self, user_id, batch_size=500, after_id=0):
+        """All summary rows in insertion order, fetched in batches"""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM sessions WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (user_id, after_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _summary(row)
+            after_id = rows[-1][0]
+
+    def iter_records(self, user_id, batch_size=100, after_id=0):
+        """All full records in insertion order, decompressed one batch at a time"""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, payload FROM sessions WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (user_id, after_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for record_id, blob in rows:
+                entry = decompress(blob)
+                entry["id"] = record_id
+                yield entry
+            after_id = rows[-1][0]
@@ -0,0 +1,232 @@
+"""
+Background job engine
+Long LLM generations run here instead of in the Streamlit script thread: an
+asyncio event loop in a worker thread schedules each job onto a dedicated
+thread pool, enforces timeouts, and reaps jobs whose owner stopped polling
+(the browser tab was closed or the session moved on). The UI submits a job,
+keeps its id, and polls it from an auto-refreshing fragment; partial text
+streams into the job as it arrives, so a 2500-token review never pins the
+session's script thread.
+
+A job function receives the Job and may call job.stream(chunks) to publish
+partial text; it must not touch Streamlit. Cancelling a streaming job closes
+its stream at the next chunk; a blocking call in flight finishes on its own
+thread and its result is dropped.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function once its job has been cancelled"""
+
+
+class Job:
+    """One background generation: status, partial text and result"""
+
+    def __init__(self, owner, name):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.name = name
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished_at = None
+        self.last_poll = time.monotonic()
+        self._chunks = []
+        self._cancel = threading.Event()
+        self._task = None
+
+    @property
+    def text(self):
+        return "".join(self._chunks)
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def stream(self, chunks):
+        """Publish an iterator of text chunks as partial output; returns the full text"""
+        try:
+            for chunk in chunks:
+                self.check()
+                self._chunks.append(chunk)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+        return self.text
+
+    def as_dict(self):
+        return {
+            "id": self.id, "owner": self.owner, "name": self.name, "status": self.status,
+            "chars": sum(len(chunk) for chunk in self._chunks),
+            "age_s": round(time.time() - self.created, 1),
+            "runtime_s": round((self.finished_at or time.time()) - self.started, 1) if self.started else None,
+            "error": f"{type(self.error).__name__}: {self.error}" if self.error else None,
+        }
+
+
+class JobEngine:
+    """Runs jobs off the script thread; one event loop and thread pool per process
+
+    Jobs not polled for heartbeat_timeout seconds are cancelled, and finished
+    jobs are forgotten keep_finished seconds after their last poll.
+    """
+
+    def __init__(self, max_workers=8, timeout=300, heartbeat_timeout=60, keep_finished=600, reap_interval=5):
+        self.timeout = timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.keep_finished = keep_finished
+        self.reap_interval = reap_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.counts = {DONE: 0, FAILED: 0, CANCELLED: 0, "reaped": 0}
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="job-loop", daemon=True)
+        self._thread.start()
+        self._reaper_task = asyncio.run_coroutine_threadsafe(self._reaper(), self.loop)
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_workers=int(os.getenv("JOB_MAX_WORKERS", "8")),
+                   timeout=float(os.getenv("JOB_TIMEOUT_SECONDS", "300")),
+                   heartbeat_timeout=float(os.getenv("JOB_HEARTBEAT_SECONDS", "60")))
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, owner, fn, name=None):
+        """Start fn(job) in the background and return the Job right away
+
+        fn runs in a copy of the caller's context (e.g. its tracing call site).
+        """
+        job = Job(owner, name)
+        with self._lock:
+            self._jobs[job.id] = job
+        context = contextvars.copy_context()
+        job._task = asyncio.run_coroutine_threadsafe(self._run(job, context, fn), self.loop)
+        return job
+
+    @staticmethod
+    def _start(fn, job):
+        job.check()
+        job.status = RUNNING
+        job.started = time.time()
+        return fn(job)
+
+    async def _run(self, job, context, fn):
+        try:
+            work = self.loop.run_in_executor(self.executor, context.run, self._start, fn, job)
+            job.result = await asyncio.wait_for(work, self.timeout) if self.timeout else await work
+            status = DONE
+        except (asyncio.CancelledError, JobCancelled):
+            status = CANCELLED
+        except asyncio.TimeoutError:
+            job._cancel.set()
+            job.error = TimeoutError(f"Job took longer than {self.timeout:.0f}s")
+            status = FAILED
+        except Exception as e:
+            job.error = e
+            status = FAILED
+        if job.cancelled and status == DONE:
+            status = CANCELLED
+        job.finished_at = time.time()
+        job.status = status
+        with self._lock:
+            self.counts[status] += 1
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def poll(self, job_id):
+        """The job (or None once it is gone), recording a heartbeat from its owner"""
+        job = self.get(job_id)
+        if job is not None:
+            job.last_poll = time.monotonic()
+        return job
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel.set()
+        if job._task is not None:
+            job._task.cancel()
+        return True
+
+    def cancel_owner(self, owner, name=None):
+        """Cancel an owner's running jobs (only those called name, if given)"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.owner == owner and (name is None or job.name == name)]
+        return sum(self.cancel(job.id) for job in jobs)
+
+    def jobs(self, owner=None):
+        with self._lock:
+            return [job for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def reap(self):
+        """Cancel running jobs nobody polls any more and drop old finished ones"""
+        now = time.monotonic()
+        for job in self.jobs():
+            idle = now - job.last_poll
+            if not job.finished and idle > self.heartbeat_timeout:
+                if self.cancel(job.id):
+                    with self._lock:
+                        self.counts["reaped"] += 1
+            elif job.finished and idle > self.keep_finished:
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            self.reap()
+
+    def stats(self):
+        jobs = self.jobs()
+        with self._lock:
+            counts = dict(self.counts)
+        return {"running": sum(job.status == RUNNING for job in jobs),
+                "queued": sum(job.status == QUEUED for job in jobs),
+                "tracked": len(jobs), **counts}
+
+    def shutdown(self, wait=1.0):
+        """Cancel every job, stop the event loop and let pending tasks unwind"""
+        for job in self.jobs():
+            self.cancel(job.id)
+        self._reaper_task.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(wait)
+        if not self._thread.is_alive():
+            pending = asyncio.all_tasks(self.loop)
+            if pending:
+                self.loop.run_until_complete(asyncio.wait(pending, timeout=wait))
+            self.loop.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,335 @@
+"""
+Company and role knowledge packs
+Structured Company Intel and Salary Insights, pregenerated for the most
+requested targets and stored as compact versioned JSON (one file per pack
+under .data/knowledge_packs). Lookups are served from disk instantly; stale
+packs are still served while a background thread refreshes them, and only
+long-tail targets are generated on demand (then kept like any other pack):
+
+    python -m core.knowledge_packs warm                 # popular companies and roles
+    python -m core.knowledge_packs warm --kind company --names "Stripe,Datadog"
+    python -m core.knowledge_packs status
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from core.concurrency import get_executor
+from core.prompts import TEMPLATES
+from core.scheduler import BACKGROUND, NORMAL
+
+DEFAULT_PACK_DIR = os.path.join(".data", "knowledge_packs")
+
+# Bump when a schema or prompt changes; older packs are then stale. Packs
+# written by a newer release are served as they are and never downgraded, so
+# replicas mid-rollout don't keep regenerating each other's packs.
+PACK_VERSION = 1
+
+DAY = 24 * 60 * 60
+
+# kind -> max age in seconds; the prompt, schema and output budget are the
+# "knowledge_pack.<kind>" template in core.prompts
+PACK_KINDS = {
+    "company": 30 * DAY,
+    "role": 14 * DAY,
+}
+
+POPULAR = {
+    "company": ("Google", "Amazon", "Meta", "Microsoft", "Apple", "Netflix", "Nvidia", "OpenAI", "Salesforce",
+                "Uber", "Airbnb", "Stripe", "LinkedIn", "Adobe", "Oracle", "IBM", "Tesla", "Goldman Sachs",
+                "JPMorgan Chase", "Deloitte"),
+    "role": ("Software Engineer", "Senior Software Engineer", "Staff Software Engineer", "Frontend Engineer",
+             "Backend Engineer", "Full Stack Engineer", "Data Scientist", "Data Engineer", "Data Analyst",
+             "Machine Learning Engineer", "DevOps Engineer", "Site Reliability Engineer", "Product Manager",
+             "Engineering Manager", "Mobile Engineer", "Security Engineer", "Cloud Architect", "QA Engineer"),
+}
+
+ALIASES = {
+    "company": {"alphabet": "google", "facebook": "meta", "meta platforms": "meta", "aws": "amazon",
+                "amazon web services": "amazon", "msft": "microsoft", "jp morgan": "jpmorgan chase",
+                "jpmorgan": "jpmorgan chase", "goldman": "goldman sachs"},
+    "role": {"swe": "software engineer", "sde": "software engineer", "senior swe": "senior software engineer",
+             "sr software engineer": "senior software engineer", "ml engineer": "machine learning engineer",
+             "sre": "site reliability engineer", "pm": "product manager", "em": "engineering manager"},
+}
+
+_SUFFIX_RE = re.compile(r"\b(?:inc|llc|ltd|corp|corporation|co|plc)\.?$", re.I)
+
+
+def slug(kind, name):
+    """Canonical file-safe key for a company or role ("Google LLC" -> "google")"""
+    text = _SUFFIX_RE.sub("", " ".join(name.lower().replace(".", " ").split())).strip(" ,")
+    text = ALIASES[kind].get(text, text)
+    return re.sub(r"[^a-z0-9]+", "-", text).strip("-")
+
+
+def company_pack_markdown(data):
+    sections = (("🏛️ Culture & Values", "culture"), ("🧭 Interview Process", "interview_process"),
+                ("❓ Common Questions", "common_questions"), ("💎 What They Value", "values"),
+                ("🚀 Tips to Stand Out", "tips"))
+    return "\n\n".join(f"**{title}**\n" + "\n".join(f"- {item}" for item in data[key]) for title, key in sections)
+
+
+def role_pack_markdown(data):
+    ranges = data["salary_ranges"]
+    lines = [f"**💰 Salary Range (USD)**\n- Entry: {ranges['entry']}\n- Mid: {ranges['mid']}\n- Senior: {ranges['senior']}"]
+    for title, key in (("🤝 Negotiation Strategies", "negotiation"), ("💎 Key Value Points", "value_points"),
+                       ("📈 Market Trends", "market_trends")):
+        lines.append(f"**{title}**\n" + "\n".join(f"- {item}" for item in data[key]))
+    return "\n\n".join(lines)
+
+
+PACK_MARKDOWN = {"company": company_pack_markdown, "role": role_pack_markdown}
+
+
+def pack_markdown(pack):
+    return PACK_MARKDOWN[pack["kind"]](pack["data"])
+
+
+def generate_pack(llm, kind, name, priority=BACKGROUND):
+    """Pack data for one target from the LLM (JSON mode, schema-validated)"""
+    return llm.complete_json(**TEMPLATES.call(f"knowledge_pack.{kind}", name), priority=priority)
+
+
+class KnowledgePacks:
+    """On-disk pack store with staleness tracking and background refresh
+
+    generate(kind, name, priority) must return pack data matching the
+    kind's schema; it runs on worker threads and must not touch Streamlit.
+    """
+
+    def __init__(self, generate, root=DEFAULT_PACK_DIR, max_age=None, popular=POPULAR, top_requested=20,
+                 executor=None):
+        self.generate = generate
+        self.executor = executor or get_executor()
+        self.root = root
+        self.max_age = max_age or dict(PACK_KINDS)
+        self.popular = popular
+        self.top_requested = top_requested
+        self._lock = threading.Lock()
+        self._packs = {}
+        self._refreshing = set()
+        self._requests = Counter()
+        self._stop = threading.Event()
+        self.hits = 0
+        self.stale_hits = 0
+        self.generated = 0
+        for kind in PACK_KINDS:
+            os.makedirs(os.path.join(root, kind), exist_ok=True)
+
+    @classmethod
+    def from_env(cls, generate):
+        max_age_days = os.getenv("KNOWLEDGE_PACK_MAX_AGE_DAYS")
+        return cls(generate, root=os.getenv("KNOWLEDGE_PACK_DIR", DEFAULT_PACK_DIR),
+                   max_age={kind: float(max_age_days) * DAY for kind in PACK_KINDS} if max_age_days else None)
+
+    def _path(self, kind, key):
+        return os.path.join(self.root, kind, f"{key}.json")
+
+    def load(self, kind, name, reload=False):
+        """Stored pack or None (read from disk once per process unless reload)"""
+        key = slug(kind, name)
+        with self._lock:
+            if not reload and (kind, key) in self._packs:
+                return self._packs[(kind, key)]
+        try:
+            with open(self._path(kind, key), encoding="utf-8") as f:
+                pack = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._packs[(kind, key)] = pack
+        return pack
+
+    def is_stale(self, pack):
+        version = pack.get("version", 0)
+        if version != PACK_VERSION:
+            return version < PACK_VERSION
+        return time.time() - pack["generated_at"] > self.max_age[pack["kind"]]
+
+    def refresh(self, kind, name, priority=BACKGROUND):
+        """Generate and store a new revision of a pack; returns it"""
+        key = slug(kind, name)
+        data = self.generate(kind, name, priority)
+        previous = self.load(kind, name)
+        pack = {
+            "kind": kind,
+            "name": name,
+            "slug": key,
+            "version": PACK_VERSION,
+            "revision": (previous or {}).get("revision", 0) + 1,
+            "generated_at": time.time(),
+            "data": data,
+        }
+        path = self._path(kind, key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pack, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        with self._lock:
+            self._packs[(kind, key)] = pack
+            self.generated += 1
+        return pack
+
+    def _refresh_async(self, kind, name):
+        key = (kind, slug(kind, name))
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.refresh(kind, name)
+            except Exception:
+                pass  # the stale pack keeps being served; the next lookup or sweep retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.executor.submit(run)
+
+    def lookup(self, kind, name):
+        """(pack, source) where source is "pack", "stale" (refresh scheduled) or "generated"
+
+        Missing packs are generated on demand at normal priority; failures
+        raise to the caller.
+        """
+        with self._lock:
+            self._requests[(kind, slug(kind, name))] += 1
+        pack = self.load(kind, name)
+        if pack is not None and self.is_stale(pack):
+            # Another process (or the warm CLI) may have refreshed it already
+            pack = self.load(kind, name, reload=True)
+        if pack is None:
+            return self.refresh(kind, name, priority=NORMAL), "generated"
+        if self.is_stale(pack):
+            with self._lock:
+                self.stale_hits += 1
+            # Keep the stored display name rather than this request's spelling
+            self._refresh_async(kind, pack["name"])
+            return pack, "stale"
+        with self._lock:
+            self.hits += 1
+        return pack, "pack"
+
+    def warm_targets(self):
+        """(kind, name) pairs kept fresh: the popular list plus the most requested"""
+        targets = {(kind, slug(kind, name)): name for kind, names in self.popular.items() for name in names}
+        with self._lock:
+            requested = self._requests.most_common(self.top_requested)
+            packs = dict(self._packs)
+        for (kind, key), _ in requested:
+            pack = packs.get((kind, key))
+            if pack:
+                targets.setdefault((kind, key), pack["name"])
+        return [(kind, name) for (kind, _), name in targets.items()]
+
+    def warm(self, targets=None, force=False, workers=4, progress=None):
+        """Generate missing or stale packs; returns {"refreshed", "fresh", "failed"}"""
+        targets = targets if targets is not None else self.warm_targets()
+        todo = [(kind, name) for kind, name in targets
+                if force or self.load(kind, name) is None or self.is_stale(self.load(kind, name))]
+        counts = {"refreshed": 0, "fresh": len(targets) - len(todo), "failed": 0}
+
+        def run(target):
+            try:
+                self.refresh(*target)
+                return True
+            except Exception as e:
+                if progress:
+                    progress(f"{target[0]} {target[1]}: {type(e).__name__}: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for target, ok in zip(todo, pool.map(run, todo)):
+                counts["refreshed" if ok else "failed"] += 1
+                if progress and ok:
+                    progress(f"{target[0]} {target[1]}: ok")
+        return counts
+
+    def start_refresher(self, interval_seconds):
+        """Daemon thread that warms missing or stale popular/requested packs
+        now and then every interval, one pack at a time"""
+        def loop():
+            while True:
+                self.warm(workers=1)
+                if self._stop.wait(interval_seconds):
+                    return
+
+        thread = threading.Thread(target=loop, name="knowledge-pack-refresher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        """One row per stored pack: kind, name, revision, age and staleness"""
+        rows = []
+        for kind in PACK_KINDS:
+            directory = os.path.join(self.root, kind)
+            for filename in sorted(os.listdir(directory)):
+                if not filename.endswith(".json"):
+                    continue
+                pack = self.load(kind, filename[:-5])
+                if pack:
+                    rows.append({"kind": kind, "name": pack["name"], "revision": pack["revision"],
+                                 "age_days": round((time.time() - pack["generated_at"]) / DAY, 1),
+                                 "stale": self.is_stale(pack)})
+        return rows
+
+    def stats(self):
+        with self._lock:
+            return {"loaded": len(self._packs), "hits": self.hits,
+                    "stale_hits": self.stale_hits, "generated": self.generated,
+                    "refreshing": len(self._refreshing)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pregenerate and inspect company/role knowledge packs")
+    parser.add_argument("command", choices=("warm", "status"))
+    parser.add_argument("--kind", choices=tuple(PACK_KINDS), default=None, help="only this kind")
+    parser.add_argument("--names", default=None, help="comma-separated targets instead of the popular list")
+    parser.add_argument("--force", action="store_true", help="regenerate even fresh packs")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        packs = KnowledgePacks.from_env(generate=None)
+        for row in packs.status():
+            if not args.kind or row["kind"] == args.kind:
+                print(json.dumps(row))
+        return
+
+    from core.backends import backend_name, config_error, create_backend
+    from core.llm import LLMClient
+    from core.routing import ModelRouter
+    from core.scheduler import RequestScheduler
+
+    error = config_error()
+    if error:
+        parser.error(error)
+    llm = LLMClient(create_backend(), model=os.getenv("LLM_MODEL"), scheduler=RequestScheduler.from_env(),
+                    router=ModelRouter.from_env(backend_name()))
+    packs = KnowledgePacks.from_env(lambda kind, name, priority: generate_pack(llm, kind, name, priority))
+
+    kinds = [args.kind] if args.kind else list(PACK_KINDS)
+    if args.names:
+        targets = [(kind, name.strip()) for kind in kinds for name in args.names.split(",") if name.strip()]
+    else:
+        targets = [(kind, name) for kind in kinds for name in POPULAR[kind]]
+    counts = packs.warm(targets, force=args.force, workers=args.workers,
+                        progress=lambda line: print(line, file=sys.stderr, flush=True))
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Local answer linter
+Deterministic checks behind "Check Mistakes": filler and hedge words, vague
+statements, missing metrics, "we" vs "I", negative language and STAR balance
+against the 20/20/40/20 guide. Runs in milliseconds with no LLM call.
+"""
+
+import html
+import re
+
+# STAR share of the answer recommended by the Quick Practice guide
+STAR_GUIDE = {"situation": 0.20, "task": 0.20, "action": 0.40, "result": 0.20}
+STAR_TOLERANCE = 0.15
+
+FILLER_WORDS = (
+    "um", "uh", "erm", "you know", "basically", "actually", "literally", "honestly",
+    "so yeah", "kind of", "sort of", "i mean", "stuff like that", "and stuff", "whatever",
+)
+HEDGES = (
+    "i think", "i guess", "i believe", "i feel like", "maybe", "probably", "perhaps", "somewhat",
+    "hopefully", "i tried to", "i was trying to", "more or less", "not sure", "might have",
+)
+VAGUE_PHRASES = (
+    "a lot", "lots of", "many things", "some things", "various", "stuff", "things like", "etc",
+    "and so on", "significantly", "greatly", "improved things", "helped with", "worked on",
+    "was involved in", "was part of", "a bunch of",
+)
+NEGATIVE_PHRASES = (
+    "hate", "hated", "terrible", "awful", "stupid", "incompetent", "useless", "lazy", "toxic",
+    "my fault", "their fault", "blame", "blamed", "never listened", "couldn't stand", "worst",
+    "idiot", "clueless", "i failed", "not my job", "wasn't my job",
+)
+
+
+def _lexicon_re(phrases):
+    alternatives = sorted((re.escape(p).replace(r"\ ", r"\s+") for p in phrases), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.I)
+
+
+_FILLER_RE = _lexicon_re(FILLER_WORDS)
+_HEDGE_RE = _lexicon_re(HEDGES)
+_VAGUE_RE = _lexicon_re(VAGUE_PHRASES)
+_NEGATIVE_RE = _lexicon_re(NEGATIVE_PHRASES)
+_I_RE = re.compile(r"\b(?:i|me|my|mine|myself)\b", re.I)
+_WE_RE = re.compile(r"\b(?:we|us|our|ours|ourselves)\b", re.I)
+_WORD_RE = re.compile(r"\b[\w'’]+\b")
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|$)")
+_METRIC_RE = re.compile(
+    r"(?:[$€£₹]\s?\d[\d,.]*\s?(?:k|m|mm|bn|b|million|billion)?\b"
+    r"|\b\d[\d,.]*\s?(?:%|percent\b|x\b|k\b|m\b|ms\b|s\b|seconds?\b|minutes?\b|hours?\b|days?\b|weeks?\b"
+    r"|months?\b|users?\b|customers?\b|people\b|engineers?\b|requests?\b|million\b|billion\b)"
+    r"|\b(?:doubled|tripled|halved|quadrupled)\b)",
+    re.I,
+)
+
+# Sentence cues for the STAR section heuristics
+_STAR_CUES = {
+    "situation": re.compile(
+        r"\b(?:when i was|at my (?:previous|last|current)|in my (?:previous|last|current) role|"
+        r"our team|the company|the project|there was|we had|back in|last year|context|background)\b", re.I),
+    "task": re.compile(
+        r"\b(?:my (?:goal|task|job|responsibility|role) was|i was (?:asked|responsible|tasked|assigned)|"
+        r"i needed to|i had to|needed to|the goal was|the challenge was|objective|deadline)\b", re.I),
+    "action": re.compile(
+        r"\bi (?:built|designed|implemented|led|created|wrote|analy[sz]ed|proposed|organized|set up|"
+        r"introduced|migrated|automated|refactored|negotiated|coordinated|mentored|decided|started|"
+        r"reached out|worked with|investigated|prioriti[sz]ed|developed|launched|ran|used|added|took)\b", re.I),
+    "result": re.compile(
+        r"\b(?:as a result|resulted in|result was|which led to|this led to|in the end|ultimately|"
+        r"reduced|increased|improved|saved|grew|cut|achieved|delivered|outcome|impact|learned)\b", re.I),
+}
+
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+class Issue:
+    """One finding, anchored to a span of the answer when it has one"""
+
+    def __init__(self, kind, message, severity="medium", start=None, end=None):
+        self.kind = kind
+        self.message = message
+        self.severity = severity
+        self.start = start
+        self.end = end
+
+
+class LintReport:
+    """All findings and stats for one answer"""
+
+    def __init__(self, answer, issues, stats, star_shares):
+        self.answer = answer
+        self.issues = issues
+        self.stats = stats
+        self.star_shares = star_shares
+
+    @property
+    def spans(self):
+        return [issue for issue in self.issues if issue.start is not None]
+
+    @property
+    def summary_issues(self):
+        """Answer-level findings (no span), most severe first"""
+        return sorted((i for i in self.issues if i.start is None), key=lambda i: SEVERITY_ORDER[i.severity])
+
+
+def _span_issues(answer, pattern, kind, message, severity):
+    return [
+        Issue(kind, message.format(text=m.group(0)), severity, m.start(), m.end())
+        for m in pattern.finditer(answer)
+    ]
+
+
+def sentences(text):
+    """(start, end, sentence) for each sentence of text"""
+    return [(m.start(), m.end(), m.group(0)) for m in _SENTENCE_RE.finditer(text) if m.group(0).strip()]
+
+
+def star_sections(text):
+    """Label each sentence situation/task/action/result
+
+    Cue words decide where they match; otherwise a sentence inherits the
+    previous label, since STAR answers move forward through the sections.
+    """
+    labelled = []
+    current = "situation"
+    order = list(STAR_GUIDE)
+    for start, end, sentence in sentences(text):
+        matched = [part for part in order if _STAR_CUES[part].search(sentence)]
+        if _METRIC_RE.search(sentence) and order.index(current) >= order.index("action"):
+            matched.append("result")
+        if matched:
+            # Prefer the earliest cue at or after the current section
+            later = [part for part in matched if order.index(part) >= order.index(current)]
+            current = later[0] if later else matched[-1]
+        labelled.append((start, end, current))
+    return labelled
+
+
+def star_shares(text):
+    """Fraction of words in each STAR section"""
+    counts = dict.fromkeys(STAR_GUIDE, 0)
+    for start, end, part in star_sections(text):
+        counts[part] += len(_WORD_RE.findall(text[start:end]))
+    total = sum(counts.values())
+    return {part: (count / total if total else 0.0) for part, count in counts.items()}
+
+
+def lint(answer):
+    """Run every rule over an answer and return a LintReport"""
+    answer = answer or ""
+    words = _WORD_RE.findall(answer)
+    word_count = len(words)
+
+    issues = []
+    issues += _span_issues(answer, _FILLER_RE, "filler", 'Filler word "{text}"', "low")
+    issues += _span_issues(answer, _HEDGE_RE, "hedge", 'Hedging "{text}" undercuts confidence', "medium")
+    issues += _span_issues(answer, _VAGUE_RE, "vague", 'Vague "{text}" - be specific', "medium")
+    issues += _span_issues(answer, _NEGATIVE_RE, "negative", 'Negative language "{text}"', "high")
+    we_spans = _span_issues(answer, _WE_RE, "we", '"{text}" - say what YOU did', "low")
+
+    i_count = len(_I_RE.findall(answer))
+    we_count = len(we_spans)
+    metrics = [m.group(0) for m in _METRIC_RE.finditer(answer)]
+    shares = star_shares(answer)
+
+    if we_count > i_count:
+        issues += we_spans
+        issues.append(Issue("we", f'"We" outnumbers "I" ({we_count} vs {i_count}) - interviewers assess your '
+                                  "individual contribution", "high"))
+    if not metrics:
+        issues.append(Issue("metrics", "No numbers - quantify the result (%, $, time saved, users)", "high"))
+    if word_count < 80:
+        issues.append(Issue("length", f"Only {word_count} words - aim for 150-300 for a complete STAR answer", "medium"))
+    elif word_count > 450:
+        issues.append(Issue("length", f"{word_count} words - trim to under 300 to keep the interviewer engaged", "low"))
+
+    for part, target in STAR_GUIDE.items():
+        share = shares[part]
+        if share == 0:
+            issues.append(Issue("star", f"No clear {part.title()} section (guide: {target:.0%})", "high"))
+        elif abs(share - target) > STAR_TOLERANCE:
+            direction = "Too much" if share > target else "Too little"
+            issues.append(Issue("star", f"{direction} {part.title()}: {share:.0%} of the answer (guide: {target:.0%})",
+                                "medium"))
+
+    filler_count = sum(1 for i in issues if i.kind == "filler")
+    stats = {
+        "words": word_count,
+        "filler": filler_count,
+        "hedges": sum(1 for i in issues if i.kind == "hedge"),
+        "vague": sum(1 for i in issues if i.kind == "vague"),
+        "negative": sum(1 for i in issues if i.kind == "negative"),
+        "metrics": metrics,
+        "i_count": i_count,
+        "we_count": we_count,
+        "i_ratio": i_count / (i_count + we_count) if i_count + we_count else None,
+        "filler_rate": filler_count / word_count if word_count else 0.0,
+    }
+    return LintReport(answer, issues, stats, shares)
+
+
+HIGHLIGHT_COLORS = {
+    "filler": "#ffe08a",
+    "hedge": "#ffd0a8",
+    "vague": "#cfe2ff",
+    "negative": "#ffb3b3",
+    "we": "#e2d4ff",
+}
+
+
+def highlight_html(report):
+    """Answer as escaped HTML with each flagged span wrapped in a <mark>"""
+    answer = report.answer
+    parts = []
+    position = 0
+    for issue in sorted(report.spans, key=lambda i: (i.start, -i.end)):
+        if issue.start < position:
+            continue  # overlapping match; the earlier one wins
+        parts.append(html.escape(answer[position:issue.start]))
+        parts.append(
+            f'<mark style="background:{HIGHLIGHT_COLORS.get(issue.kind, "#eee")};border-radius:3px" '
+            f'title="{html.escape(issue.message)}">{html.escape(answer[issue.start:issue.end])}</mark>'
+        )
+        position = issue.end
+    parts.append(html.escape(answer[position:]))
+    return "".join(parts).replace("\n", "<br>")
+
+
+def report_markdown(report):
+    """Plain markdown summary of a report (for feedback text and history)"""
+    stats = report.stats
+    ratio = f"{stats['i_ratio']:.0%}" if stats["i_ratio"] is not None else "n/a"
+    lines = [f"- **{issue.message}**" if issue.severity == "high" else f"- {issue.message}"
+             for issue in report.summary_issues]
+    counts = []
+    for kind, label in (("filler", "Filler words"), ("hedge", "Hedges"), ("vague", "Vague phrases"),
+                        ("negative", "Negative language")):
+        found = sorted({report.answer[i.start:i.end].lower() for i in report.spans if i.kind == kind})
+        if found:
+            counts.append(f"- {label} ({len(found)}): " + ", ".join(f'"{text}"' for text in found))
+    lines += counts
+    lines.append(f"- Words: {stats['words']} • Metrics found: {len(stats['metrics'])} • \"I\" share: {ratio}")
+    lines.append("- STAR balance: " + " / ".join(
+        f"{part.title()} {share:.0%}" for part, share in report.star_shares.items()) + " (guide 20/20/40/20)")
+    return "\n".join(lines)
@@ -0,0 +1,175 @@
+"""
+Headless LLM client
+Combines a backend with the response cache; no Streamlit dependency, so the
+same call path serves the app, CLIs and benchmarks
+"""
+
+from core.cache import is_cacheable, make_cache_key
+from core.scheduler import NORMAL
+from core.structured import StructuredOutputError, check, repair_messages, schema_instructions
+from core.telemetry import Tracer
+from core.tokens import count_tokens, message_tokens
+
+
+def estimate_request_tokens(messages, max_tokens):
+    """Upper-bound token cost of a request, used for tokens/min limiting"""
+    return message_tokens(messages) + max_tokens
+
+
+class LLMClient:
+    """Chat completions through a pluggable backend with optional caching
+
+    With a scheduler, every backend call is rate limited, retried on
+    transient errors and admitted according to its priority lane. With a
+    router, the task class picks the model, and a non-streaming result that
+    fails validation is retried once on the router's fallback model. Every
+    public call is recorded as a span on the tracer.
+    """
+
+    def __init__(self, backend, cache=None, model=None, scheduler=None, router=None, tracer=None):
+        self.backend = backend
+        self.cache = cache
+        self.model = model or backend.default_model
+        self.scheduler = scheduler
+        self.router = router
+        self.tracer = tracer or Tracer()
+
+    def model_for(self, task=None):
+        """Model a task class is routed to"""
+        return self.router.model_for(task, self.model) if self.router else self.model
+
+    def _call(self, model, messages, temperature, max_tokens, priority, span, **kwargs):
+        call = lambda: self.backend.complete(model, messages, temperature, max_tokens, **kwargs)
+        if self.scheduler:
+            result = self.scheduler.run(call, model, estimate_request_tokens(messages, max_tokens), priority,
+                                        on_retry=span.add_retry)
+        else:
+            result = call()
+        span.add_tokens(result.prompt_tokens, result.completion_tokens)
+        return result
+
+    def _attributes(self, task, model, priority, site):
+        attributes = {"model": model, "task": task, "priority": priority, "cache_hit": False, "retries": 0}
+        if site:
+            attributes["site"] = site
+        return attributes
+
+    def _span(self, name, task, model, priority, site):
+        return self.tracer.span(name, **self._attributes(task, model, priority, site))
+
+    def _cache_key(self, model, messages, temperature, max_tokens, use_cache):
+        if self.cache is None or not is_cacheable(temperature, use_cache):
+            return None
+        return make_cache_key(model, messages, temperature, max_tokens)
+
+    def complete(self, messages, temperature=0.7, max_tokens=500, use_cache=None, priority=NORMAL, task=None,
+                 site=None):
+        """Return the completion text; raises on backend errors
+
+        site labels the span (defaults to the call_site context, then task).
+        """
+        model = self.model_for(task)
+        with self._span("complete", task, model, priority, site) as span:
+            return self._complete(span, model, messages, temperature, max_tokens, use_cache, priority, task)
+
+    def _complete(self, span, model, messages, temperature, max_tokens, use_cache, priority, task):
+        cache_key = self._cache_key(model, messages, temperature, max_tokens, use_cache)
+
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                span.set(cache_hit=True)
+                return cached
+
+        content = self._call(model, messages, temperature, max_tokens, priority, span).text
+
+        fallback = self.router.fallback_for(task, model, content) if self.router else None
+        if fallback:
+            span.set(fallback_model=fallback)
+            content = self._call(fallback, messages, temperature, max_tokens, priority, span).text
+
+        if cache_key and content:
+            self.cache.set(cache_key, content, model=model)
+        return content
+
+    def complete_json(self, messages, schema, temperature=0.2, max_tokens=800, use_cache=None,
+                      priority=NORMAL, task=None, site=None):
+        """Return a dict matching schema, using the backend's JSON mode
+
+        Invalid output gets one repair retry (the errors are sent back to the
+        model); if that also fails, StructuredOutputError is raised.
+        """
+        messages = [schema_instructions(schema)] + messages
+        model = self.model_for(task)
+        with self._span("complete_json", task, model, priority, site) as span:
+            return self._complete_json(span, model, messages, schema, temperature, max_tokens, use_cache, priority)
+
+    def _complete_json(self, span, model, messages, schema, temperature, max_tokens, use_cache, priority):
+        cache_key = self._cache_key(model, messages, temperature, max_tokens, use_cache)
+
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                data, errors = check(cached, schema)
+                if not errors:
+                    span.set(cache_hit=True)
+                    return data
+
+        json_mode = {"response_format": {"type": "json_object"}}
+        text = self._call(model, messages, temperature, max_tokens, priority, span, **json_mode).text
+        data, errors = check(text, schema)
+        if errors:
+            span.set(repaired=True)
+            text = self._call(model, repair_messages(messages, text, errors), temperature, max_tokens,
+                              priority, span, **json_mode).text
+            data, errors = check(text, schema)
+            if errors:
+                raise StructuredOutputError(errors)
+
+        if cache_key:
+            self.cache.set(cache_key, text, model=model)
+        return data
+
+    def stream(self, messages, temperature=0.7, max_tokens=500, use_cache=None, priority=NORMAL, task=None,
+               site=None):
+        """Yield completion text chunks; a cache hit arrives as one chunk
+
+        Streams are routed but never re-run on the fallback model, since the
+        text has already been shown. Stream token counts are estimates.
+        """
+        model = self.model_for(task)
+        span = self.tracer.start("stream", **self._attributes(task, model, priority, site))
+        error = None
+        try:
+            cache_key = self._cache_key(model, messages, temperature, max_tokens, use_cache)
+
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    span.set(cache_hit=True)
+                    span.mark_first_token()
+                    yield cached
+                    return
+
+            open_stream = lambda: self.backend.stream(model, messages, temperature, max_tokens)
+            if self.scheduler:
+                deltas = self.scheduler.stream(open_stream, model, estimate_request_tokens(messages, max_tokens),
+                                               priority, on_retry=span.add_retry)
+            else:
+                deltas = open_stream()
+
+            chunks = []
+            for delta in deltas:
+                span.mark_first_token()
+                chunks.append(delta)
+                yield delta
+
+            text = "".join(chunks)
+            span.add_tokens(message_tokens(messages), count_tokens(text))
+            if cache_key and chunks:
+                self.cache.set(cache_key, text, model=model)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.tracer.finish(span, error)
@@ -0,0 +1,554 @@
+"""
+Load test
+Simulates concurrent candidates end-to-end against the stub LLM backend:
+
+    practice   generate question -> answer -> lint + parallel feedback sections
+    mock       start -> 4 interviewer turns (with context compaction)
+               -> typed scorecard in parallel with a streamed 2500-token review
+
+Two drivers run these flows. "core" (the default) calls the core helpers
+with the app's prompts, token budgets, priorities and fan-out, so its
+numbers cover only the LLM client, scheduler and backend. "app" drives the
+real app.py through streamlit.testing's AppTest, each virtual user in its
+own process, so each step also pays for the script rerun, session_state
+setup and fragment execution (slower; the stub is configured through its
+env vars). Being one process per user, it does not see contention inside a
+single server process or the sharing of cache_resource between sessions.
+
+Virtual users are ramped up linearly and loop over their flow until the
+duration ends. Reports throughput, per-step latency percentiles (and time
+to first token for core-driver streams), memory (tracemalloc: per session
+for core, peak per worker process for app) and error rates as JSON, for regression tracking:
+
+    python -m core.loadtest --users 50 --ramp 20 --duration 60 -o loadtest.json
+    python -m core.loadtest --users 10,50,100 --latency lognormal:400:0.5 --failure-rate 0.02
+    python -m core.loadtest --driver app --users 5,10 --duration 60
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+from core.backends import StubBackend
+from core.batch_eval import percentile
+from core.concurrency import fan_out
+from core.conversation import build_transcript, compact, interviewer_system_prompt
+from core.linter import lint
+from core.llm import LLMClient
+from core.prompts import TEMPLATES, feedback_section_calls, mock_turn_call
+from core.routing import ModelRouter
+from core.scheduler import INTERACTIVE, RequestScheduler
+from core.telemetry import Tracer, call_site
+
+FLOWS = ("practice", "mock", "mixed")
+DRIVERS = ("core", "app")
+MOCK_TURNS = 4
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+# Seconds between reruns while an app-driver user waits on a background job
+APP_POLL_SECONDS = 0.5
+
+# Candidate answers are drawn from these, so prompts (and stub output) vary per user
+ANSWERS = [
+    "In my last role our checkout service was timing out during a sales event. I was the on-call engineer, "
+    "so I owned the fix. I profiled the service, found an N+1 query in the cart lookup and rewrote it as a "
+    "single batched query behind a cache. Latency dropped from 2.1s to 180ms and we handled 3x the traffic.",
+    "We had a disagreement about moving to microservices. I asked for a week to gather data, benchmarked both "
+    "options and shared a one-page comparison. The team agreed on a modular monolith first, and I led the "
+    "refactor, which cut deploy time by 40% without the operational overhead.",
+    "I had to learn Kubernetes in two weeks for a migration. I built a small staging cluster, paired with our "
+    "platform team and wrote runbooks as I went. We migrated 12 services on schedule with zero downtime, and "
+    "the runbooks are still used for onboarding.",
+    "Um, basically we kind of improved the system a lot. I think we made it faster and the team was happy. "
+    "It was a good project overall and we learned a lot from it.",
+]
+
+
+def latency_sampler(spec):
+    """Time-to-first-token sampler from a spec string, in milliseconds
+
+    fixed:MS, uniform:LOW:HIGH, normal:MEAN:STDEV, lognormal:MEDIAN:SIGMA
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(":") if v]
+    shapes = {
+        "fixed": (1, lambda rng, ms: ms),
+        "uniform": (2, lambda rng, low, high: rng.uniform(low, high)),
+        "normal": (2, lambda rng, mean, stdev: rng.gauss(mean, stdev)),
+        "lognormal": (2, lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma)),
+    }
+    if kind not in shapes or len(values) != shapes[kind][0]:
+        raise ValueError(f"Bad latency spec '{spec}' (e.g. fixed:200, uniform:100:500, normal:300:80, lognormal:300:0.5)")
+    sample = shapes[kind][1]
+    return lambda rng: max(0.0, sample(rng, *values))
+
+
+class Recorder:
+    """Thread-safe per-step latencies, time to first token and errors"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.ttfts = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+        self.flows = defaultdict(int)
+        self.session_bytes = []
+
+    def step(self, name, fn):
+        """Run one step, timing it; failures are counted and re-raised"""
+        started = time.perf_counter()
+        try:
+            with call_site(name):
+                return fn()
+        except Exception as e:
+            with self._lock:
+                self.errors[name] += 1
+                self.error_samples.setdefault(name, f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            with self._lock:
+                self.latencies[name].append((time.perf_counter() - started) * 1000)
+
+    def stream(self, name, chunks):
+        """Consume a stream as one step, also recording its time to first token"""
+        def consume():
+            started, text = time.perf_counter(), []
+            for chunk in chunks:
+                if not text:
+                    with self._lock:
+                        self.ttfts[name].append((time.perf_counter() - started) * 1000)
+                text.append(chunk)
+            return "".join(text)
+        return self.step(name, consume)
+
+    def flow_done(self, flow, ok, session, error=None):
+        with self._lock:
+            self.flows[(flow, ok)] += 1
+            self.session_bytes.append(len(json.dumps(session, default=str)))
+            if error is not None:
+                self.error_samples.setdefault(f"{flow}.flow", f"{type(error).__name__}: {error}")
+
+    def export(self):
+        """Plain-data copy, to send from a worker process"""
+        with self._lock:
+            return {"latencies": dict(self.latencies), "ttfts": dict(self.ttfts), "errors": dict(self.errors),
+                    "error_samples": dict(self.error_samples), "flows": dict(self.flows),
+                    "session_bytes": list(self.session_bytes)}
+
+    def merge(self, data):
+        """Fold in another recorder's export()"""
+        with self._lock:
+            for name, values in data["latencies"].items():
+                self.latencies[name].extend(values)
+            for name, values in data["ttfts"].items():
+                self.ttfts[name].extend(values)
+            for name, count in data["errors"].items():
+                self.errors[name] += count
+            for name, sample in data["error_samples"].items():
+                self.error_samples.setdefault(name, sample)
+            for key, count in data["flows"].items():
+                self.flows[key] += count
+            self.session_bytes.extend(data["session_bytes"])
+
+    def summary(self):
+        with self._lock:
+            steps = {}
+            for name, values in sorted(self.latencies.items()):
+                ttft = self.ttfts.get(name)
+                steps[name] = {
+                    "count": len(values),
+                    "errors": self.errors[name],
+                    "error_rate": round(self.errors[name] / len(values), 4),
+                    "p50_ms": _round(percentile(values, 50)),
+                    "p95_ms": _round(percentile(values, 95)),
+                    "p99_ms": _round(percentile(values, 99)),
+                    "max_ms": _round(max(values)),
+                }
+                if ttft:
+                    steps[name]["ttft_p50_ms"] = _round(percentile(ttft, 50))
+                    steps[name]["ttft_p95_ms"] = _round(percentile(ttft, 95))
+            flows = {}
+            for (flow, ok), count in self.flows.items():
+                flows.setdefault(flow, {"completed": 0, "failed": 0})["completed" if ok else "failed"] += count
+            return steps, flows, dict(self.error_samples), list(self.session_bytes)
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+class VirtualUser:
+    """One simulated candidate; session mirrors the app's per-session state"""
+
+    def __init__(self, llm, recorder, seed, think_ms=0.0, difficulty="Mid Level (2-5 years)",
+                 interview_type="Behavioral/STAR", role="Software Engineer", company=""):
+        self.llm = llm
+        self.recorder = recorder
+        self.rng = random.Random(seed)
+        self.think_ms = think_ms
+        self.profile = (difficulty, interview_type, role, company)
+        self.session = {}
+
+    def think(self):
+        if self.think_ms:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.think_ms / 1000)
+
+    def answer(self):
+        # A per-user suffix keeps requests distinct, like real answers
+        return f"{self.rng.choice(ANSWERS)} (ref {self.rng.randrange(10 ** 6)})"
+
+    def practice(self):
+        step = self.recorder.step
+        question = step("practice.generate", lambda: self.llm.complete(
+            **TEMPLATES.call("quick_practice.generate", *self.profile), use_cache=False))
+        self.think()
+        answer = self.answer()
+        self.session.update(current_question=question, answer=answer)
+        step("practice.lint", lambda: lint(answer))
+
+        def feedback():
+            calls = feedback_section_calls(question, answer)
+            tasks = {name: (lambda kwargs=kwargs: self.llm.complete_json(**kwargs) if "schema" in kwargs
+                            else self.llm.complete(**kwargs)) for name, kwargs in calls.items()}
+            sections = {}
+            for name, result, error in fan_out(tasks):
+                if error is not None:
+                    raise error
+                sections[name] = result
+            return sections
+        self.session["feedback"] = step("practice.feedback", feedback)
+
+    def mock(self):
+        step, stream = self.recorder.step, self.recorder.stream
+        difficulty, _, role, company = self.profile
+        system_prompt = interviewer_system_prompt(role, difficulty, company)
+        messages, summary, summarized_upto = [], "", 0
+        self.session.update(mock_messages=messages, mock_system_prompt=system_prompt)
+
+        opening = step("mock.start", lambda: self.llm.complete(
+            **TEMPLATES.call("mock.start", system_prompt, messages), priority=INTERACTIVE))
+        messages.append({"role": "interviewer", "content": opening})
+
+        for _ in range(MOCK_TURNS):
+            self.think()
+            messages.append({"role": "candidate", "content": self.answer()})
+            summary, summarized_upto = step("mock.compact", lambda: compact(
+                messages, summary, summarized_upto,
+                lambda previous, turns: self.llm.complete(**TEMPLATES.call("mock.summarize", previous, turns),
+                                                          priority=INTERACTIVE)))
+            turn = stream("mock.turn", self.llm.stream(
+                **mock_turn_call(system_prompt, messages, summary, summarized_upto), priority=INTERACTIVE))
+            messages.append({"role": "interviewer", "content": turn})
+
+        transcript = build_transcript(messages)
+        scorecard = {}
+        scorecard_thread = threading.Thread(target=lambda: scorecard.update(result=step(
+            "mock.scorecard", lambda: self.llm.complete_json(
+                **TEMPLATES.call("mock.scorecard", transcript=transcript)))))
+        scorecard_thread.start()
+        try:
+            self.session["mock_review"] = stream("mock.review", self.llm.stream(
+                **TEMPLATES.call("mock.review", transcript=transcript)))
+        finally:
+            scorecard_thread.join()
+        if "result" not in scorecard:
+            raise RuntimeError("Scorecard failed")
+        self.session["mock_scorecard"] = scorecard["result"]
+
+    def run(self, flow, stop):
+        """Loop the flow (alternating for "mixed") until stop is set"""
+        iteration = 0
+        while not stop.is_set():
+            name = flow if flow != "mixed" else FLOWS[iteration % 2]
+            self.session = {}
+            error = None
+            try:
+                getattr(self, name)()
+            except Exception as e:
+                error = e
+            self.recorder.flow_done(name, error is None, self.session, error)
+            iteration += 1
+
+
+class AppUser(VirtualUser):
+    """One simulated candidate clicking through app.py in an AppTest session
+
+    Every flow starts a fresh session (a new browser tab), so "app.load"
+    measures session_state setup. Each later step is one script run after a
+    widget interaction, and a background job is polled by rerunning the
+    script like the page's fragment does. AppTest swaps Streamlit's global
+    runtime on every run, so each AppUser needs a process of its own.
+    """
+
+    def __init__(self, recorder, seed, think_ms=0.0, timeout=300.0):
+        super().__init__(None, recorder, seed, think_ms)
+        self.timeout = timeout
+        self.app = None
+
+    def _run(self, name):
+        def run():
+            self.app.run()
+            if self.app.exception:
+                raise RuntimeError(self.app.exception[0].value)
+            if self.app.error:
+                raise RuntimeError(self.app.error[0].value)
+        self.recorder.step(name, run)
+
+    def _button(self, label):
+        return next(button for button in self.app.button if button.label.startswith(label))
+
+    def _open(self):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(APP_SCRIPT, default_timeout=self.timeout)
+        self._run("app.load")
+
+    def _wait_job(self, slot, name):
+        from core.jobs import FINISHED
+
+        def wait():
+            state = self.app.session_state
+            while f"job_{slot}" in state and state[f"job_{slot}"]["status"] not in FINISHED:
+                time.sleep(APP_POLL_SECONDS)
+                self._run("app.poll")
+        self.recorder.step(name, wait)
+
+    def _snapshot(self):
+        state = self.app.session_state
+        return {key: state[key] for key in state}
+
+    def practice(self):
+        self._open()
+        self._button("🎲").click()
+        self._run("app.practice.generate")
+        self.think()
+        self.app.text_area(key="practice_answer").input(self.answer())
+        self._button("🔍 Get AI Feedback").click()
+        self._run("app.practice.feedback")
+        self.session = self._snapshot()
+
+    def mock(self):
+        self._open()
+        self._button("🎬").click()
+        self._run("app.mock.start")
+        for _ in range(MOCK_TURNS):
+            self.think()
+            # Typing the answer is its own rerun (it starts the speculative draft)
+            self.app.text_area(key="mock_response_input").input(self.answer())
+            self._run("app.mock.answer")
+            self._button("📤").click()
+            self._run("app.mock.turn")
+        self._button("🔚").click()
+        self._run("app.mock.end")
+        self._wait_job("mock_review", "app.mock.review")
+        self.session = self._snapshot()
+
+
+def _app_worker(flow, seed, think_ms, stop, results, trace_memory):
+    """Process entry point: one AppUser looping its flow, reporting its recorder"""
+    recorder = Recorder()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        AppUser(recorder, seed, think_ms).run(flow, stop)
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        results.put((recorder.export(), peak))
+
+
+def configure_app(first_token_ms=300.0, tokens_per_second=250.0, failure_rate=0.0, rate_limited=False):
+    """Point app.py at the stub backend and throwaway data stores, through its env vars
+
+    Worker processes inherit the environment; each one is a separate app
+    process, so LLM clients, caches and the scheduler are per user, while
+    the history and response stores are shared files.
+    """
+    data_dir = tempfile.mkdtemp(prefix="loadtest-")
+    os.environ.update({
+        "LLM_BACKEND": "stub",
+        "STUB_FIRST_TOKEN_MS": str(first_token_ms),
+        "STUB_TOKENS_PER_SECOND": str(tokens_per_second),
+        "STUB_FAILURE_RATE": str(failure_rate),
+        "RESPONSE_CACHE_PATH": os.path.join(data_dir, "responses.sqlite3"),
+        "HISTORY_DB_PATH": os.path.join(data_dir, "history.sqlite3"),
+        "STATE_DB_PATH": os.path.join(data_dir, "state.sqlite3"),
+        "EXPORT_DIR": os.path.join(data_dir, "exports"),
+        "KNOWLEDGE_PACK_DIR": os.path.join(data_dir, "packs"),
+        "KNOWLEDGE_PACK_REFRESH_SECONDS": "0",
+    })
+    if not rate_limited:
+        router = ModelRouter.from_env("stub")
+        models = set(router.routes.values()) | {StubBackend.default_model, router.fallback_model}
+        os.environ["LLM_RATE_LIMITS"] = json.dumps({model: {"rpm": 10 ** 7, "tpm": 10 ** 10}
+                                                    for model in models if model})
+    return data_dir
+
+
+def build_client(latency=None, first_token_ms=300.0, tokens_per_second=250.0, failure_rate=0.0,
+                 rate_limited=False):
+    """LLMClient over a stub backend, shaped like the app's process-wide client
+
+    The response cache is off (every simulated answer is distinct anyway).
+    Rate limits are lifted unless rate_limited, so the run measures the
+    instance rather than the provider quota.
+    """
+    backend = StubBackend(first_token_ms=first_token_ms, tokens_per_second=tokens_per_second,
+                          latency_sampler=latency_sampler(latency) if latency else None,
+                          failure_rate=failure_rate)
+    router = ModelRouter.from_env("stub")
+    scheduler = RequestScheduler.from_env()
+    if not rate_limited:
+        models = set(router.routes.values()) | {backend.default_model, router.fallback_model}
+        scheduler.rate_limits = {model: {"rpm": 10 ** 7, "tpm": 10 ** 10} for model in models if model}
+    return LLMClient(backend, scheduler=scheduler, router=router, tracer=Tracer(max_spans=0, window=100_000))
+
+
+def run_stage(llm, users, ramp_s, duration_s, flow="mixed", think_ms=0.0, seed=0, trace_memory=True):
+    """Ramp `users` virtual users over ramp_s, hold until duration_s, report
+
+    With llm=None each user drives app.py from its own process (see
+    AppUser and configure_app), and memory is reported per worker process.
+    """
+    recorder = Recorder()
+    if llm is None:
+        context = multiprocessing.get_context("spawn")
+        stop, results = context.Event(), context.Queue()
+    else:
+        stop = threading.Event()
+    workers, worker_peaks, peak_memory, baseline = [], [], 0, 0
+    traced_here = trace_memory and llm is not None
+    if traced_here:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    started = time.perf_counter()
+    for i in range(users):
+        # Linear ramp: user i starts at i/users of the ramp window
+        delay = started + ramp_s * i / users - time.perf_counter()
+        if delay > 0:
+            stop.wait(delay)
+        if llm is None:
+            worker = context.Process(target=_app_worker, name=f"vu-{i}", daemon=True,
+                                     args=(flow, seed * 100_003 + i, think_ms, stop, results, trace_memory))
+        else:
+            user = VirtualUser(llm, recorder, seed=seed * 100_003 + i, think_ms=think_ms)
+            worker = threading.Thread(target=user.run, args=(flow, stop), name=f"vu-{i}", daemon=True)
+        worker.start()
+        workers.append(worker)
+
+    while time.perf_counter() - started < duration_s:
+        if traced_here:
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[0])
+        time.sleep(min(0.5, max(0.0, duration_s - (time.perf_counter() - started))))
+    stop.set()
+    # Users finish the flow they are in, so every counted flow is complete
+    if llm is None:
+        for _ in workers:
+            data, peak = results.get()
+            recorder.merge(data)
+            if peak is not None:
+                worker_peaks.append(peak)
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    if traced_here:
+        tracemalloc.stop()
+
+    steps, flows, error_samples, session_bytes = recorder.summary()
+    completed = sum(f["completed"] for f in flows.values())
+    failed = sum(f["failed"] for f in flows.values())
+    step_count = sum(s["count"] for s in steps.values())
+    step_errors = sum(s["errors"] for s in steps.values())
+    return {
+        "users": users,
+        "elapsed_s": round(elapsed, 2),
+        "flows": flows,
+        "throughput": {
+            "flows_per_s": round(completed / elapsed, 3),
+            "steps_per_s": round(step_count / elapsed, 3),
+        },
+        "error_rate": {
+            "flows": round(failed / (completed + failed), 4) if completed + failed else 0.0,
+            "steps": round(step_errors / step_count, 4) if step_count else 0.0,
+        },
+        "errors": error_samples,
+        "steps": steps,
+        "llm_calls": llm.tracer.percentiles("llm") if llm else None,
+        "memory": {
+            "traced_peak_bytes": peak_memory - baseline if traced_here else None,
+            "per_session_bytes": round((peak_memory - baseline) / users) if traced_here and users else None,
+            "worker_peak_p50_bytes": percentile(worker_peaks, 50),
+            "session_state_p50_bytes": percentile(session_bytes, 50),
+            "session_state_max_bytes": max(session_bytes) if session_bytes else None,
+        },
+        "scheduler": {
+            "max_concurrency": llm.scheduler.gate.max_concurrency,
+            "retries": llm.scheduler.retries,
+            "throttled_s": round(llm.scheduler.throttled_seconds, 2),
+        } if llm else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent candidates against the stub backend")
+    parser.add_argument("--users", default="20", help="virtual users; comma-separated for one stage per count")
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds to ramp up to the user count")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds per stage, including the ramp")
+    parser.add_argument("--flow", choices=FLOWS, default="mixed")
+    parser.add_argument("--driver", choices=DRIVERS, default="core",
+                        help="core: call the LLM helpers directly (backend + scheduler only); "
+                             "app: drive app.py through AppTest (adds reruns and session state)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's steps")
+    parser.add_argument("--latency", default=None,
+                        help="time-to-first-token distribution, e.g. fixed:300, uniform:100:500, lognormal:300:0.5")
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=250.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of stub calls that fail (retried)")
+    parser.add_argument("--rate-limited", action="store_true", help="apply LLM_RATE_LIMITS instead of lifting them")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip memory tracing (it slows Python down)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=None, help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    try:
+        user_counts = [int(n) for n in args.users.split(",") if n.strip()]
+        if args.latency:
+            latency_sampler(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.driver == "app":
+        if args.latency:
+            parser.error("--latency needs --driver core (the app's stub takes --first-token-ms)")
+        configure_app(args.first_token_ms, args.tokens_per_second, args.failure_rate, args.rate_limited)
+
+    stages = []
+    for users in user_counts:
+        # A fresh client per stage so scheduler counters and call spans don't carry over
+        llm = None if args.driver == "app" else build_client(
+            args.latency, args.first_token_ms, args.tokens_per_second, args.failure_rate, args.rate_limited)
+        print(f"Stage: {users} users, {args.flow} flow, {args.duration:g}s", file=sys.stderr, flush=True)
+        stages.append(run_stage(llm, users, args.ramp, args.duration, args.flow, args.think_ms, args.seed,
+                                trace_memory=not args.no_tracemalloc))
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "stages": stages,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
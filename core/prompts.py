@@ -0,0 +1,254 @@
+"""
+Prompt builders
+Question generation, answer analysis and mock review prompts shared by the
+Streamlit app and the headless batch tools. Builders return chat messages;
+TEMPLATES (bottom of the file) registers them per call site with their
+output budget, and returns call_groq_api keyword arguments.
+"""
+
+import functools
+
+from core import routing
+from core.conversation import build_turn_messages, next_turn_instruction, summarization_messages
+from core.speculation import validation_messages
+from core.structured import (ANSWER_SCORE_SCHEMA, COMPANY_PACK_SCHEMA, MOCK_SCORECARD_SCHEMA, ROLE_PACK_SCHEMA,
+                             STAR_ANALYSIS_SCHEMA, STAR_COMPONENT_SCHEMA, STAR_COMPONENTS)
+from core.templates import TemplateRegistry
+
+COACH_SYSTEM_PROMPT = "You are an expert interview coach."
+HIRING_MANAGER_SYSTEM_PROMPT = "You are a senior hiring manager."
+
+
+def question_generation_messages(difficulty, interview_type, role, company, avoid=None):
+    """Messages for generating one interview question"""
+    prompt = f"""Generate a realistic {difficulty} {interview_type} interview question for {role or 'Software Engineer'}{f' at {company}' if company else ''}.
+
+Format:
+**Question:** [The question]
+**What they're looking for:** [Brief explanation]"""
+    if avoid:
+        prompt += "\n\nAsk something different from these recent questions:\n" + "\n".join(f"- {q}" for q in avoid)
+    return [
+        {"role": "system", "content": "You are a senior technical interviewer."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+# Quick Practice feedback is split into independent sections that run in
+# parallel; the order here is the display / history order.
+# name -> (title, instructions, max_tokens, schema or None for free text)
+FEEDBACK_SECTIONS = {
+    'score': ("🏆 Score, Strengths & Improvements", """Provide:
+1. Score (0-100)
+2. Strengths (4-5 points)
+3. Improvements (4-5 points)""", 600, ANSWER_SCORE_SCHEMA),
+    'star': ("⭐ STAR Analysis", """Provide a STAR Analysis: score the Situation, Task, Action and Result
+parts of the answer (0-100 each) and say what is missing in each and how to fix it.""", 500, STAR_ANALYSIS_SCHEMA),
+    'enhanced': ("✨ Enhanced Version", """Provide:
+1. Enhanced Version of the answer
+2. Key Takeaways (3-4 points)""", 700, None),
+}
+
+
+def answer_analysis_messages(question, answer, instructions):
+    """Messages for one answer-analysis section"""
+    prompt = f"""Analyze this interview answer:
+
+Question: {question}
+Answer: {answer}
+
+{instructions}
+
+Be specific and actionable."""
+    return [
+        {"role": "system", "content": COACH_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def feedback_section_calls(question, answer, sections=None):
+    """call_groq_api arguments for each Quick Practice feedback section
+
+    Sections with a schema carry a "schema" key and go through JSON mode.
+    """
+    return {name: TEMPLATES.call(f"quick_practice.feedback.{name}", question=question, answer=answer)
+            for name in sections or FEEDBACK_SECTIONS}
+
+
+def mistakes_messages(question, answer):
+    """Messages for the LLM common-mistakes scan"""
+    prompt = f"""Check for common mistakes:
+Question: {question}
+Answer: {answer}
+
+Check: Filler words, vague statements, no metrics, weak structure, negative language, using "we" instead of "I"."""
+    return [{"role": "user", "content": prompt}]
+
+
+def mistakes_call(question, answer):
+    """call_groq_api arguments for the LLM common-mistakes scan"""
+    return TEMPLATES.call("quick_practice.deep_check", question=question, answer=answer)
+
+
+def mock_turn_call(system_prompt, mock_messages, summary="", summarized_upto=0):
+    """call_groq_api arguments for the interviewer's next turn (a question, or the closing turn)"""
+    interviewer_count = sum(1 for m in mock_messages if m["role"] == "interviewer")
+    site = "mock.turn" if interviewer_count < 4 else "mock.conclude"
+    return TEMPLATES.call(site, system_prompt, mock_messages, summary, summarized_upto,
+                          next_turn_instruction(interviewer_count))
+
+
+def mock_review_messages(transcript):
+    """Messages for the narrative end-of-interview review"""
+    prompt = f"""Analyze this mock interview:
+
+{transcript}
+
+Provide:
+1. Score (0-100) with justification
+2. Strengths (3-5)
+3. Improvements (3-5)
+4. Communication Breakdown
+5. STAR Analysis
+6. Best/Weakest Answers
+7. Hiring Decision
+8. Action Items (7-10)
+9. Questions to Ask Interviewer
+
+Be honest, specific, constructive."""
+    return [
+        {"role": "system", "content": HIRING_MANAGER_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def mock_scorecard_messages(transcript):
+    """JSON-mode request for the typed mock interview scorecard"""
+    return [
+        {"role": "system", "content": HIRING_MANAGER_SYSTEM_PROMPT},
+        {"role": "user", "content": f"""Score this mock interview:
+
+{transcript}
+
+Give an overall score (0-100), 3-5 strengths, 3-5 improvements, a 0-100 score
+with one-line feedback for each STAR component across the candidate's answers,
+and a hiring decision (Strong hire / Hire / Lean hire / Lean no hire / No hire)."""}
+    ]
+
+
+def resume_advice_messages(gap_summary, role=None):
+    """Narrative resume advice from the local ATS gap summary (never the raw resume)"""
+    prompt = f"""A candidate{f' targeting {role}' if role else ''} ran their resume through an ATS check:
+
+{gap_summary}
+
+Provide:
+1. Top 5 fixes, most impactful first
+2. How to work the missing keywords in honestly (example bullet rewrites)
+3. Section-by-section suggestions
+Keep it concise and actionable."""
+    return [
+        {"role": "system", "content": "You are an expert technical recruiter and resume coach."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+# What a strong version of each STAR component does, for the STAR Coach
+STAR_COMPONENT_GUIDANCE = {
+    "situation": "Sets concise, specific context: where, when, who and why it mattered. 2-3 sentences.",
+    "task": "States the candidate's own responsibility or goal and what made it hard.",
+    "action": "Describes the specific steps the candidate personally took (\"I\", not \"we\") and why.",
+    "result": "Gives a measurable outcome (numbers, time, money, users) and what was learned.",
+}
+
+
+def star_component_messages(component, text, question=None):
+    """Messages scoring one STAR component on its own (JSON mode)"""
+    prompt = f"""Score only the {component.upper()} part of a STAR interview answer{f' to: {question}' if question else ''}.
+
+A strong {component}: {STAR_COMPONENT_GUIDANCE[component]}
+
+{component.title()}: {text}
+
+Give a 0-100 score, one or two sentences of feedback, and one concrete suggestion."""
+    return [
+        {"role": "system", "content": COACH_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def star_enhance_messages(question, parts, evaluations):
+    """Messages for the enhanced answer, built from the per-component feedback
+
+    parts maps each STAR component to the candidate's text and evaluations
+    to its cached score/feedback/suggestion, so the answer isn't re-analysed.
+    """
+    sections = "\n\n".join(
+        f"{part.upper()} (score {evaluations[part]['score']:.0f}): {parts[part]}\n"
+        f"Feedback: {evaluations[part]['feedback']}\nSuggestion: {evaluations[part]['suggestion']}"
+        for part in STAR_COMPONENTS
+    )
+    prompt = f"""Rewrite this STAR interview answer{f' to: {question}' if question else ''}, applying the feedback on each part.
+
+{sections}
+
+Return the enhanced answer as four short paragraphs (Situation, Task, Action, Result), first person,
+keeping the candidate's facts and inventing no new numbers (use [X%] placeholders where a metric is missing)."""
+    return [
+        {"role": "system", "content": COACH_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def company_pack_messages(company):
+    """JSON-mode request for a company knowledge pack"""
+    return [
+        {"role": "system", "content": COACH_SYSTEM_PROMPT},
+        {"role": "user", "content": f"""Summarize interview prep intel for {company}: company culture, the typical
+interview process (stages), common interview questions, what they value in candidates, and tips to stand
+out. 3-6 short items per list."""}
+    ]
+
+
+def role_pack_messages(role):
+    """JSON-mode request for a role (salary) knowledge pack"""
+    return [
+        {"role": "system", "content": COACH_SYSTEM_PROMPT},
+        {"role": "user", "content": f"""Summarize salary insights for {role} in the US: total compensation ranges
+(USD) for entry, mid and senior levels, top negotiation strategies, key value points to emphasize, and
+current market trends. 3-6 short items per list."""}
+    ]
+
+
+# Every prompt by call site: builder, output ceiling (max_tokens until the
+# site's observed output lengths take over), temperature and task class
+TEMPLATES = TemplateRegistry()
+TEMPLATES.register("quick_practice.generate", question_generation_messages, 400, temperature=0.8,
+                   task=routing.GENERATE_QUESTION)
+TEMPLATES.register("question_pool.refill", question_generation_messages, 400, temperature=0.8,
+                   task=routing.GENERATE_QUESTION)
+for _name, (_, _instructions, _max_tokens, _schema) in FEEDBACK_SECTIONS.items():
+    TEMPLATES.register(f"quick_practice.feedback.{_name}",
+                       functools.partial(answer_analysis_messages, instructions=_instructions), _max_tokens,
+                       temperature=0.3, task=routing.FULL_FEEDBACK, schema=_schema)
+TEMPLATES.register("quick_practice.deep_check", mistakes_messages, 600, task=routing.MISTAKES)
+# Interviewer turns are sampled on purpose, so they never come from the cache
+TEMPLATES.register("mock.start", build_turn_messages, 350, task=routing.MOCK_TURN, use_cache=False)
+TEMPLATES.register("mock.turn", build_turn_messages, 300, task=routing.MOCK_TURN, use_cache=False)
+TEMPLATES.register("mock.conclude", build_turn_messages, 150, task=routing.CONCLUDE, use_cache=False)
+TEMPLATES.register("mock.speculation_check", validation_messages, 3, temperature=0.0,
+                   task=routing.SPECULATION_CHECK)
+TEMPLATES.register("mock.summarize", summarization_messages, 300, temperature=0.2, task=routing.SUMMARIZE)
+TEMPLATES.register("mock.scorecard", mock_scorecard_messages, 800, temperature=0.2, task=routing.MOCK_REVIEW,
+                   schema=MOCK_SCORECARD_SCHEMA)
+TEMPLATES.register("mock.review", mock_review_messages, 2500, temperature=0.3, task=routing.MOCK_REVIEW, min_tokens=600)
+TEMPLATES.register("resume.advice", resume_advice_messages, 800, temperature=0.3, task=routing.RESUME_ADVICE)
+for _component in STAR_COMPONENTS:
+    TEMPLATES.register(f"star_coach.{_component}", functools.partial(star_component_messages, _component), 250,
+                       temperature=0.2, task=routing.STAR_COMPONENT, schema=STAR_COMPONENT_SCHEMA)
+TEMPLATES.register("star_coach.enhance", star_enhance_messages, 700, temperature=0.4, task=routing.STAR_ENHANCE)
+# Packs are regenerated only when stale, so a cached copy would defeat the refresh
+TEMPLATES.register("knowledge_pack.company", company_pack_messages, 700, temperature=0.3,
+                   task=routing.COMPANY_INTEL, schema=COMPANY_PACK_SCHEMA, use_cache=False)
+TEMPLATES.register("knowledge_pack.role", role_pack_messages, 600, temperature=0.3, task=routing.SALARY,
+                   schema=ROLE_PACK_SCHEMA, use_cache=False)
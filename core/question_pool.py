@@ -0,0 +1,165 @@
+"""
+Prewarmed interview question pool
+Keeps a few ready questions per (difficulty, interview_type, role, company)
+key, refilled by background workers so "Generate" returns instantly
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+from core.concurrency import get_executor
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def question_text(markdown):
+    """The question itself, without the "What they're looking for" part"""
+    match = re.search(r"\*\*Question:\*\*\s*(.+?)(?:\n\s*\*\*What they|\Z)", markdown, re.S)
+    return (match.group(1) if match else markdown).strip()
+
+
+def shingles(text):
+    """Word bigram set used for near-duplicate detection"""
+    words = _WORD_RE.findall(question_text(text).lower())
+    if len(words) < 2:
+        return set(words)
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def similarity(a, b):
+    """Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Slot:
+    """Ready questions for one key plus what has already been served"""
+
+    def __init__(self, history_size):
+        self.ready = deque()
+        self.seen = deque(maxlen=history_size)
+        self.refilling = False
+        self.last_used = time.monotonic()
+
+
+class QuestionPool:
+    """Per-key question buffers with async refill, dedupe and cold-key eviction
+
+    generate(key, avoid) must return one question (markdown) or None, where
+    avoid lists recent question texts to steer away from; it runs on worker
+    threads and must not touch Streamlit.
+    """
+
+    def __init__(self, generate, target_size=3, max_keys=64, similarity_threshold=0.6,
+                 history_size=50, executor=None):
+        self.generate = generate
+        self.target_size = target_size
+        self.max_keys = max_keys
+        self.similarity_threshold = similarity_threshold
+        self.history_size = history_size
+        self.executor = executor or get_executor()
+        self._slots = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.duplicates_dropped = 0
+
+    def _slot(self, key):
+        """Slot for key, creating it and evicting the coldest key if needed"""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _Slot(self.history_size)
+            while len(self._slots) > self.max_keys:
+                self._slots.popitem(last=False)
+        self._slots.move_to_end(key)
+        slot.last_used = time.monotonic()
+        return slot
+
+    def _is_duplicate(self, slot, candidate):
+        fingerprint = shingles(candidate)
+        known = [shingles(q) for q in list(slot.ready) + list(slot.seen)]
+        return any(similarity(fingerprint, other) >= self.similarity_threshold for other in known)
+
+    def add(self, key, question):
+        """Offer a question to the pool; near-duplicates are dropped"""
+        with self._lock:
+            # Background refills must not make a key look recently used
+            slot = self._slots.get(key) or self._slot(key)
+            if self._is_duplicate(slot, question):
+                self.duplicates_dropped += 1
+                return False
+            slot.ready.append(question)
+            return True
+
+    def mark_served(self, key, question):
+        """Remember a question shown to the user so it won't come back"""
+        with self._lock:
+            self._slot(key).seen.append(question_text(question))
+
+    def take(self, key):
+        """Pop a ready question (or None) and trigger an async refill"""
+        with self._lock:
+            slot = self._slot(key)
+            question = slot.ready.popleft() if slot.ready else None
+            if question:
+                self.hits += 1
+                slot.seen.append(question_text(question))
+            else:
+                self.misses += 1
+        self.refill(key)
+        return question
+
+    def prefetch(self, key):
+        """Warm a key the first time it's seen"""
+        with self._lock:
+            known = key in self._slots
+        if not known:
+            self.refill(key)
+
+    def refill(self, key):
+        """Top the key up to target_size on a worker (no-op if already running)"""
+        with self._lock:
+            slot = self._slot(key)
+            if slot.refilling or len(slot.ready) >= self.target_size:
+                return
+            slot.refilling = True
+        self.executor.submit(self._refill, key)
+
+    def _refill(self, key):
+        attempts = 0
+        try:
+            # Allow some extra attempts for duplicates, but never spin forever
+            while attempts < self.target_size * 2:
+                with self._lock:
+                    slot = self._slots.get(key)
+                    if slot is None or len(slot.ready) >= self.target_size:
+                        return
+                    avoid = [question_text(q) for q in slot.ready] + list(slot.seen)[-5:]
+                attempts += 1
+                try:
+                    question = self.generate(key, avoid)
+                except Exception:
+                    return
+                if question:
+                    self.add(key, question)
+        finally:
+            with self._lock:
+                slot = self._slots.get(key)
+                if slot is not None:
+                    slot.refilling = False
+
+    def stats(self):
+        """Pool occupancy and hit/miss counters"""
+        with self._lock:
+            ready = sum(len(slot.ready) for slot in self._slots.values())
+            keys = len(self._slots)
+        return {
+            "keys": keys,
+            "ready": ready,
+            "hits": self.hits,
+            "misses": self.misses,
+            "duplicates_dropped": self.duplicates_dropped,
+        }
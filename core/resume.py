@@ -0,0 +1,350 @@
+"""
+Resume analysis pipeline
+Parses an uploaded resume page by page (PDF via pypdf, DOCX via
+python-docx, or plain text), detects sections and scores it against a job
+description locally: keyword coverage over a precomputed skills vocabulary,
+TF-IDF similarity and per-section BM25 relevance. Only the compact gap
+summary is ever sent to the LLM. Results are cached by content hash.
+"""
+
+import hashlib
+import io
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+MAX_PAGES = 40
+MAX_CHARS = 200_000
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "professional summary", "objective", "about me", "career objective"),
+    "experience": ("experience", "work experience", "professional experience", "employment history",
+                   "work history", "employment"),
+    "education": ("education", "academic background", "qualifications", "academics"),
+    "skills": ("skills", "technical skills", "core competencies", "competencies", "technologies", "tech stack"),
+    "projects": ("projects", "personal projects", "key projects", "selected projects"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses & certifications"),
+    "achievements": ("achievements", "awards", "honors", "honours", "accomplishments"),
+    "publications": ("publications", "papers", "research"),
+}
+REQUIRED_SECTIONS = ("experience", "education", "skills")
+
+# Precomputed vocabulary of multi-word and single-word skills recognised in
+# both the resume and the job description (lowercase, canonical spelling)
+SKILL_VOCABULARY = (
+    # languages
+    "python", "java", "javascript", "typescript", "c++", "c#", "golang", "rust", "kotlin", "swift",
+    "scala", "ruby", "php", "sql", "bash", "matlab",
+    # web / backend
+    "react", "angular", "vue", "node.js", "django", "flask", "fastapi", "spring", "spring boot", "graphql",
+    "rest api", "microservices", "html", "css", "next.js", "express",
+    # data / ml
+    "machine learning", "deep learning", "nlp", "computer vision", "pytorch", "tensorflow", "keras",
+    "scikit-learn", "pandas", "numpy", "spark", "hadoop", "airflow", "kafka", "etl", "data pipelines",
+    "data analysis", "data visualization", "statistics", "a/b testing", "llm", "generative ai", "mlops",
+    "tableau", "power bi", "excel", "dbt", "snowflake", "bigquery",
+    # infra
+    "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ci/cd", "jenkins", "github actions",
+    "linux", "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "dynamodb", "distributed systems",
+    "system design", "observability", "monitoring",
+    # practice / soft skills
+    "agile", "scrum", "kanban", "jira", "leadership", "mentoring", "stakeholder management",
+    "communication", "project management", "product management", "roadmap", "cross-functional",
+    "problem solving", "testing", "unit testing", "tdd", "code review", "security", "git",
+)
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each etc few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not now of off on once only or other
+our out over own per same she should so some such than that the their them then there these they this those
+through to too under until up very via was we were what when where which while who whom why will with within
+would you your years year experience work working role team strong ability plus including looking join etc
+""".split())
+
+_HEADING_RES = {
+    name: re.compile(r"^\s*(?:" + "|".join(re.escape(h) for h in headings) + r")\s*:?\s*$", re.I)
+    for name, headings in SECTION_HEADINGS.items()
+}
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]", re.I)
+_SKILL_RE = re.compile(
+    r"(?<![\w+#])(?:" + "|".join(re.escape(s) for s in sorted(SKILL_VOCABULARY, key=len, reverse=True)) + r")(?![\w+#])",
+    re.I,
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-•*▪●◦‣]|\d+[.)])\s+", re.M)
+_METRIC_RE = re.compile(r"\d[\d,.]*\s?(?:%|x\b|k\b|m\b|\+)|[$€£₹]\s?\d", re.I)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+
+
+class ResumeParseError(ValueError):
+    """The upload couldn't be read (unsupported type or missing parser)"""
+
+
+def content_hash(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_pages(data, filename="resume.txt", max_pages=MAX_PAGES):
+    """Yield the document's text one page (PDF) or paragraph block at a time"""
+    name = filename.lower()
+    if name.endswith(".pdf"):
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise ResumeParseError("PDF support needs pypdf (pip install pypdf)")
+        reader = PdfReader(io.BytesIO(data))
+        for page in reader.pages[:max_pages]:
+            yield page.extract_text() or ""
+    elif name.endswith(".docx"):
+        try:
+            import docx
+        except ImportError:
+            raise ResumeParseError("DOCX support needs python-docx (pip install python-docx)")
+        block = []
+        for paragraph in docx.Document(io.BytesIO(data)).paragraphs:
+            block.append(paragraph.text)
+            if len(block) >= 50:
+                yield "\n".join(block)
+                block = []
+        if block:
+            yield "\n".join(block)
+    elif name.endswith((".txt", ".md")) or "." not in name:
+        text = data.decode("utf-8", errors="replace") if isinstance(data, bytes) else data
+        # Whole lines per block, so joining the blocks with newlines restores the text
+        lines = text.splitlines()
+        for start in range(0, len(lines), 100):
+            yield "\n".join(lines[start:start + 100])
+    else:
+        raise ResumeParseError(f"Unsupported file type: {filename} (use PDF, DOCX or TXT)")
+
+
+def read_text(data, filename="resume.txt", max_chars=MAX_CHARS):
+    """(text, pages) read incrementally, stopping once max_chars is reached
+
+    Pages are real for PDFs and estimated (~500 words each) otherwise.
+    """
+    parts, size, chunks = [], 0, 0
+    for chunk in iter_pages(data, filename):
+        chunks += 1
+        parts.append(chunk[:max_chars - size])
+        size += len(parts[-1])
+        if size >= max_chars:
+            break
+    text = "\n".join(parts)
+    pages = chunks if filename.lower().endswith(".pdf") else max(1, -(-len(text.split()) // 500))
+    return text, pages
+
+
+def tokenize(text):
+    """Lowercase content tokens without stopwords"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and not t.isdigit()]
+
+
+def skills(text):
+    """Counter of SKILL_VOCABULARY terms mentioned in text"""
+    return Counter(m.group(0).lower() for m in _SKILL_RE.finditer(text))
+
+
+def detect_sections(text):
+    """{section: text} split on recognised headings ("header" before the first)"""
+    sections = OrderedDict(header=[])
+    current = "header"
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = next((name for name, pattern in _HEADING_RES.items()
+                        if len(stripped) <= 40 and pattern.match(stripped)), None)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    return OrderedDict((name, "\n".join(lines).strip()) for name, lines in sections.items()
+                       if name != "header" or any(l.strip() for l in lines))
+
+
+class ParsedDocument:
+    """Tokenized text plus the term statistics scoring needs, computed once"""
+
+    def __init__(self, text, pages=1):
+        self.text = text
+        self.pages = pages
+        self.tokens = tokenize(text)
+        self.term_counts = Counter(self.tokens)
+        self.skills = skills(text)
+        self.sections = detect_sections(text)
+        self.section_tokens = {name: tokenize(body) for name, body in self.sections.items()}
+
+    @property
+    def words(self):
+        return len(self.text.split())
+
+
+def jd_keywords(jd, limit=40):
+    """Job-description keywords: every vocabulary skill plus the most frequent other terms"""
+    keywords = OrderedDict((skill, count + 2) for skill, count in jd.skills.most_common())
+    for term, count in jd.term_counts.most_common():
+        if len(keywords) >= limit:
+            break
+        if term not in keywords and len(term) > 2 and count > 1:
+            keywords[term] = count
+    return keywords
+
+
+def tfidf_similarity(a_counts, b_counts, idf):
+    """Cosine similarity of two term-count vectors under shared IDF weights"""
+    a = {t: c * idf.get(t, 0.0) for t, c in a_counts.items()}
+    b = {t: c * idf.get(t, 0.0) for t, c in b_counts.items()}
+    dot = sum(w * b[t] for t, w in a.items() if t in b)
+    norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def bm25_scores(query_terms, documents, k1=BM25_K1, b=BM25_B):
+    """BM25 relevance of each {name: tokens} document for the query terms"""
+    n = len(documents)
+    if not n:
+        return {}
+    counts = {name: Counter(tokens) for name, tokens in documents.items()}
+    avg_len = sum(len(tokens) for tokens in documents.values()) / n or 1.0
+    df = Counter(term for c in counts.values() for term in set(query_terms) if term in c)
+    idf = {term: math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5)) for term in set(query_terms)}
+    scores = {}
+    for name, tokens in documents.items():
+        c, length = counts[name], len(tokens)
+        scores[name] = sum(
+            idf[term] * c[term] * (k1 + 1) / (c[term] + k1 * (1 - b + b * length / avg_len))
+            for term in set(query_terms) if c[term]
+        )
+    return scores
+
+
+def analyze(resume, jd=None):
+    """Local ATS analysis of a ParsedDocument against an optional JD ParsedDocument"""
+    found = [name for name in resume.sections if name != "header"]
+    missing_sections = [name for name in REQUIRED_SECTIONS if name not in resume.sections]
+    bullets = len(_BULLET_RE.findall(resume.text))
+    metrics = len(_METRIC_RE.findall(resume.text))
+    contact = bool(_EMAIL_RE.search(resume.text)) + bool(_PHONE_RE.search(resume.text))
+
+    structure = 100 * (len(REQUIRED_SECTIONS) - len(missing_sections)) / len(REQUIRED_SECTIONS)
+    formatting = min(100, 40 * (contact / 2) + min(30, bullets * 2) + min(30, metrics * 3))
+    result = {
+        "pages": resume.pages,
+        "words": resume.words,
+        "sections": found,
+        "missing_sections": missing_sections,
+        "bullets": bullets,
+        "metrics": metrics,
+        "contact": contact,
+        "skills": [skill for skill, _ in resume.skills.most_common(25)],
+        "structure_score": round(structure),
+        "formatting_score": round(formatting),
+    }
+
+    if jd is None or not jd.tokens:
+        result["ats_score"] = round(0.6 * structure + 0.4 * formatting)
+        return result
+
+    keywords = jd_keywords(jd)
+    resume_terms = resume.term_counts + resume.skills
+    matched = [k for k in keywords if resume_terms[k]]
+    missing = [k for k in keywords if not resume_terms[k]]
+    weight = sum(keywords.values()) or 1
+    coverage = sum(keywords[k] for k in matched) / weight
+
+    documents = dict(resume.section_tokens)
+    documents["__jd__"] = jd.tokens
+    df = Counter(term for tokens in documents.values() for term in set(tokens))
+    idf = {term: math.log((1 + len(documents)) / (1 + count)) + 1 for term, count in df.items()}
+    similarity = tfidf_similarity(resume_terms, jd.term_counts + jd.skills, idf)
+
+    relevance = bm25_scores(list(keywords), resume.section_tokens)
+    top = max(relevance.values(), default=0) or 1.0
+
+    result.update({
+        "keyword_coverage": round(100 * coverage),
+        "matched_keywords": matched,
+        "missing_keywords": missing,
+        "tfidf_similarity": round(similarity, 3),
+        "section_relevance": {name: round(100 * score / top) for name, score in relevance.items()},
+        "ats_score": round(0.5 * 100 * coverage + 0.15 * 100 * min(1.0, similarity * 2)
+                           + 0.2 * structure + 0.15 * formatting),
+    })
+    return result
+
+
+def gap_summary(result, max_keywords=15):
+    """Compact plain-text summary of an analysis for the LLM (a few hundred tokens)"""
+    lines = [
+        f"ATS score: {result['ats_score']}/100",
+        f"Length: {result['pages']} page(s), {result['words']} words, {result['bullets']} bullets, "
+        f"{result['metrics']} quantified results",
+        "Sections found: " + (", ".join(result["sections"]) or "none"),
+    ]
+    if result["missing_sections"]:
+        lines.append("Missing sections: " + ", ".join(result["missing_sections"]))
+    if result["contact"] < 2:
+        lines.append("Contact details incomplete (email/phone)")
+    if result["skills"]:
+        lines.append("Skills on resume: " + ", ".join(result["skills"][:max_keywords]))
+    if "keyword_coverage" in result:
+        lines.append(f"JD keyword coverage: {result['keyword_coverage']}%, TF-IDF similarity "
+                     f"{result['tfidf_similarity']:.2f}")
+        if result["matched_keywords"]:
+            lines.append("Matched JD keywords: " + ", ".join(result["matched_keywords"][:max_keywords]))
+        if result["missing_keywords"]:
+            lines.append("Missing JD keywords: " + ", ".join(result["missing_keywords"][:max_keywords]))
+        weak = [name for name, score in sorted(result["section_relevance"].items(), key=lambda kv: kv[1])
+                if score < 40 and name != "header"]
+        if weak:
+            lines.append("Sections least relevant to the JD: " + ", ".join(weak[:4]))
+    return "\n".join(lines)
+
+
+class ResumeAnalyzer:
+    """Parse-once, analyze-once cache keyed by resume and JD content hashes"""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._documents = OrderedDict()
+        self._results = OrderedDict()
+
+    def _remember(self, table, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    def document(self, data, filename="resume.txt"):
+        """ParsedDocument for an upload or pasted text (parsed once per content)"""
+        key = content_hash(data)
+        with self._lock:
+            if key in self._documents:
+                self._documents.move_to_end(key)
+                return key, self._documents[key]
+        text, pages = read_text(data, filename)
+        document = ParsedDocument(text, pages)
+        with self._lock:
+            self._remember(self._documents, key, document)
+        return key, document
+
+    def analyze(self, resume_data, filename="resume.txt", jd_text=""):
+        """(cache key, analysis) for a resume and optional job description"""
+        resume_key, resume = self.document(resume_data, filename)
+        jd_key, jd = self.document(jd_text or "", "jd.txt") if (jd_text or "").strip() else (None, None)
+        key = f"{resume_key}:{jd_key}"
+        with self._lock:
+            if key in self._results:
+                return key, self._results[key]
+        result = analyze(resume, jd)
+        with self._lock:
+            self._remember(self._results, key, result)
+        return key, result
@@ -0,0 +1,99 @@
+"""
+Model routing
+Chooses a model per task class: a small fast model for cheap, high-frequency
+tasks and the 70B model for deep analysis, with an optional fallback to the
+larger model when the small model's output fails validation
+"""
+
+import json
+import os
+
+SMALL_MODEL = "llama-3.1-8b-instant"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+
+# Task classes used by the app
+GENERATE_QUESTION = "generate_question"
+MOCK_TURN = "mock_turn"
+CONCLUDE = "conclude"
+MISTAKES = "mistakes"
+FULL_FEEDBACK = "full_feedback"
+MOCK_REVIEW = "mock_review"
+SUMMARIZE = "summarize"
+SALARY = "salary"
+COMPANY_INTEL = "company_intel"
+SPECULATION_CHECK = "speculation_check"
+RESUME_ADVICE = "resume_advice"
+STAR_COMPONENT = "star_component"
+STAR_ENHANCE = "star_enhance"
+
+DEFAULT_ROUTES = {
+    GENERATE_QUESTION: SMALL_MODEL,
+    MOCK_TURN: LARGE_MODEL,
+    CONCLUDE: SMALL_MODEL,
+    MISTAKES: SMALL_MODEL,
+    FULL_FEEDBACK: LARGE_MODEL,
+    MOCK_REVIEW: LARGE_MODEL,
+    SUMMARIZE: SMALL_MODEL,
+    SALARY: LARGE_MODEL,
+    COMPANY_INTEL: LARGE_MODEL,
+    SPECULATION_CHECK: SMALL_MODEL,
+    RESUME_ADVICE: LARGE_MODEL,
+    STAR_COMPONENT: SMALL_MODEL,
+    STAR_ENHANCE: LARGE_MODEL,
+}
+
+
+def _min_length(n):
+    return lambda text: len(text.strip()) >= n
+
+
+VALIDATORS = {
+    GENERATE_QUESTION: lambda text: "question" in text.lower() and len(text.strip()) >= 40,
+    MOCK_TURN: lambda text: "?" in text,
+    CONCLUDE: lambda text: 20 <= len(text.strip()) <= 1200,
+    MISTAKES: _min_length(60),
+    SUMMARIZE: _min_length(40),
+    SPECULATION_CHECK: lambda text: text.strip().upper().startswith(("YES", "NO")),
+}
+
+
+class ModelRouter:
+    """Maps task classes to models and decides when to fall back"""
+
+    def __init__(self, routes=None, fallback_model=LARGE_MODEL, validators=None):
+        self.routes = DEFAULT_ROUTES if routes is None else routes
+        self.fallback_model = fallback_model
+        self.validators = VALIDATORS if validators is None else validators
+        self.fallbacks = 0
+
+    @classmethod
+    def from_env(cls, backend=None):
+        """Routes from LLM_ROUTES (JSON task->model, merged over the defaults)
+
+        Third-party OpenAI-compatible endpoints don't serve the Groq model
+        names, so they start with no routes unless LLM_ROUTES sets some.
+        LLM_FALLBACK_MODEL='' disables the validation fallback.
+        """
+        routes = {} if backend == "openai" else dict(DEFAULT_ROUTES)
+        if os.getenv("LLM_ROUTES"):
+            routes.update(json.loads(os.getenv("LLM_ROUTES")))
+        fallback = os.getenv("LLM_FALLBACK_MODEL", LARGE_MODEL if backend != "openai" else "")
+        return cls(routes, fallback or None)
+
+    def model_for(self, task, default):
+        """Model for a task class (default when the task isn't routed)"""
+        return self.routes.get(task, default) if task else default
+
+    def is_valid(self, task, text):
+        """Whether a completion passes the task's validator"""
+        if not text or not text.strip():
+            return False
+        validator = self.validators.get(task)
+        return validator(text) if validator else True
+
+    def fallback_for(self, task, model, text):
+        """Larger model to retry with if the output failed validation, else None"""
+        if not self.fallback_model or model == self.fallback_model or self.is_valid(task, text):
+            return None
+        self.fallbacks += 1
+        return self.fallback_model
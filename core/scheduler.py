@@ -0,0 +1,352 @@
+"""
+Process-wide LLM request scheduler
+Per-model token-bucket rate limiting (requests/min and tokens/min), bounded
+concurrency with priority lanes, and retries with jittered exponential
+backoff that honours Retry-After. The lanes apply to the rate budget too:
+interactive requests queue on the buckets, lower lanes only take budget
+that is free above their reserved headroom
+"""
+
+import email.utils
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+# Lower value = served first
+INTERACTIVE = 0  # mock interview turns
+NORMAL = 1       # quick practice feedback, question generation
+BACKGROUND = 2   # sidebar intel, prefetching
+
+# Groq free-tier style defaults; override with LLM_RATE_LIMITS='{"model": {"rpm": 30, "tpm": 12000}}'
+DEFAULT_RATE_LIMITS = {
+    "llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+    "llama-3.1-8b-instant": {"rpm": 30, "tpm": 6000},
+}
+FALLBACK_RATE_LIMIT = {"rpm": 30, "tpm": 6000}
+
+# Share of each rate-limit bucket a lane must leave for the lanes above it;
+# interactive requests may use the whole bucket
+RESERVED_HEADROOM = {NORMAL: 0.0, BACKGROUND: 0.25}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "RateLimitError",
+                         "InternalServerError", "ConnectionError", "TimeoutError"}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() and take() return how long to wait"""
+
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def reserve(self, amount=1.0):
+        """Take amount now (possibly going negative) and return the wait in seconds"""
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_per_second
+
+    def take(self, amount=1.0, headroom=0.0):
+        """Take amount only if headroom (a share of capacity) stays in the bucket
+
+        Returns 0 when taken, otherwise the wait before it might succeed;
+        unlike reserve(), nothing is taken while waiting, so reserving
+        callers are served first.
+        """
+        floor = self.capacity * headroom
+        amount = min(float(amount), self.capacity - floor)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens - amount >= floor:
+                self.tokens -= amount
+                return 0.0
+            return (floor + amount - self.tokens) / self.refill_per_second
+
+    def refund(self, amount):
+        """Give back tokens that were reserved but not used"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + float(amount))
+
+
+class SharedTokenBucket:
+    """TokenBucket kept in a shared state backend (see core.state), so every
+    process and node draws from the same per-model budget"""
+
+    def __init__(self, state, key, capacity, refill_per_second):
+        self.state = state
+        self.key = key
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+
+    def reserve(self, amount=1.0):
+        amount = min(float(amount), self.capacity)
+        tokens = self.state.bucket(self.key, self.capacity, self.refill_per_second, -amount)
+        return 0.0 if tokens >= 0 else -tokens / self.refill_per_second
+
+    def take(self, amount=1.0, headroom=0.0):
+        floor = self.capacity * headroom
+        amount = min(float(amount), self.capacity - floor)
+        tokens = self.state.bucket(self.key, self.capacity, self.refill_per_second, -amount)
+        if tokens >= floor:
+            return 0.0
+        self.state.bucket(self.key, self.capacity, self.refill_per_second, amount)
+        return (floor - tokens) / self.refill_per_second
+
+    def refund(self, amount):
+        self.state.bucket(self.key, self.capacity, self.refill_per_second, float(amount))
+
+
+class PriorityGate:
+    """Bounded concurrency where waiters are admitted in priority order
+
+    Background work may only use background_slots of the slots, so
+    interactive requests always find headroom.
+    """
+
+    def __init__(self, max_concurrency=8, background_slots=None):
+        self.max_concurrency = max_concurrency
+        self.background_slots = background_slots or max(1, max_concurrency // 2)
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._counter = itertools.count()
+        self.active = 0
+        self.active_background = 0
+
+    def _can_enter(self, priority):
+        if self.active >= self.max_concurrency:
+            return False
+        return priority < BACKGROUND or self.active_background < self.background_slots
+
+    def _next_admissible(self):
+        """Highest-priority waiter that could enter right now"""
+        for entry in sorted(self._waiting):
+            if self._can_enter(entry[0]):
+                return entry
+        return None
+
+    def acquire(self, priority=NORMAL):
+        with self._cond:
+            entry = (priority, next(self._counter))
+            self._waiting.append(entry)
+            while self._next_admissible() != entry:
+                self._cond.wait()
+            self._waiting.remove(entry)
+            self.active += 1
+            if priority >= BACKGROUND:
+                self.active_background += 1
+            self._cond.notify_all()
+
+    def release(self, priority=NORMAL):
+        with self._cond:
+            self.active -= 1
+            if priority >= BACKGROUND:
+                self.active_background -= 1
+            self._cond.notify_all()
+
+
+def status_code(exc):
+    """HTTP status carried by an SDK exception, if any"""
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code
+
+
+def is_retryable(exc):
+    """Rate limits, transient 5xx and connection problems are worth retrying"""
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def retry_after_seconds(exc):
+    """Seconds requested by a Retry-After (or retry-after-ms) header, if present"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+class RequestScheduler:
+    """Coordinates every LLM request made by this process"""
+
+    def __init__(self, rate_limits=None, max_concurrency=8, background_slots=None,
+                 max_retries=4, base_delay=0.5, max_delay=20.0, state=None):
+        self.rate_limits = rate_limits or DEFAULT_RATE_LIMITS
+        # Concurrency stays per process; with a shared state the rate-limit
+        # buckets are global across replicas
+        self.state = state
+        self.gate = PriorityGate(max_concurrency, background_slots)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, state=None):
+        """Build a scheduler from LLM_* environment variables"""
+        limits = dict(DEFAULT_RATE_LIMITS)
+        if os.getenv("LLM_RATE_LIMITS"):
+            limits.update(json.loads(os.getenv("LLM_RATE_LIMITS")))
+        return cls(
+            rate_limits=limits,
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            state=state,
+        )
+
+    def buckets(self, model):
+        """(requests, tokens) buckets for a model, created on first use"""
+        with self._buckets_lock:
+            if model not in self._buckets:
+                limit = self.rate_limits.get(model, FALLBACK_RATE_LIMIT)
+                if self.state is not None:
+                    self._buckets[model] = (
+                        SharedTokenBucket(self.state, f"ratelimit:{model}:rpm", limit["rpm"], limit["rpm"] / 60.0),
+                        SharedTokenBucket(self.state, f"ratelimit:{model}:tpm", limit["tpm"], limit["tpm"] / 60.0),
+                    )
+                else:
+                    self._buckets[model] = (
+                        TokenBucket(limit["rpm"], limit["rpm"] / 60.0),
+                        TokenBucket(limit["tpm"], limit["tpm"] / 60.0),
+                    )
+            return self._buckets[model]
+
+    def _throttle(self, model, tokens, priority=NORMAL):
+        """Reserve the rate-limit budget for one attempt, sleeping until it is available
+
+        Interactive requests reserve their place on the buckets; lower lanes
+        wait until the budget is free above their RESERVED_HEADROOM, so
+        background work yields the rate budget to interactive turns. Called
+        before taking a concurrency slot, so a throttled request never holds
+        a slot that an interactive request could use.
+        """
+        requests_bucket, tokens_bucket = self.buckets(model)
+        if priority <= INTERACTIVE:
+            wait = max(requests_bucket.reserve(1), tokens_bucket.reserve(tokens))
+            if wait > 0:
+                self.throttled_seconds += wait
+                time.sleep(wait)
+            return
+        headroom = RESERVED_HEADROOM.get(priority, RESERVED_HEADROOM[BACKGROUND])
+        while True:
+            wait = requests_bucket.take(1, headroom)
+            if not wait:
+                wait = tokens_bucket.take(tokens, headroom)
+                if not wait:
+                    return
+                requests_bucket.refund(1)
+            self.throttled_seconds += wait
+            time.sleep(wait)
+
+    def _refund(self, model, tokens):
+        if tokens > 0:
+            self.buckets(model)[1].refund(tokens)
+
+    def backoff_delay(self, attempt, exc=None):
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        hinted = retry_after_seconds(exc) if exc is not None else None
+        if hinted is not None:
+            delay = max(delay, min(hinted, self.max_delay * 3))
+        return delay
+
+    def run(self, fn, model, estimated_tokens=0, priority=NORMAL, on_retry=None):
+        """Call fn() under the rate limits, retrying transient failures
+
+        If fn returns an object with prompt/completion token counts, unused
+        reserved tokens are refunded to the bucket; a failed attempt refunds
+        all of its tokens. on_retry(exc) is called before each retry.
+        """
+        attempt = 0
+        while True:
+            self._throttle(model, estimated_tokens, priority)
+            self.gate.acquire(priority)
+            try:
+                result = fn()
+            except Exception as e:
+                self._refund(model, estimated_tokens)
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay, failure = self.backoff_delay(attempt, e), e
+            else:
+                used = getattr(result, "prompt_tokens", 0) + getattr(result, "completion_tokens", 0)
+                if used and used < estimated_tokens:
+                    self._refund(model, estimated_tokens - used)
+                return result
+            finally:
+                self.gate.release(priority)
+
+            attempt += 1
+            self.retries += 1
+            if on_retry:
+                on_retry(failure)
+            time.sleep(delay)
+
+    def stream(self, open_stream, model, estimated_tokens=0, priority=NORMAL, on_retry=None):
+        """Yield from open_stream() under the rate limits
+
+        Failures before the first chunk are retried (and refund their
+        tokens); once text has been delivered an error is raised to the
+        caller. The concurrency slot is held for the whole stream.
+        """
+        attempt = 0
+        while True:
+            self._throttle(model, estimated_tokens, priority)
+            self.gate.acquire(priority)
+            started = False
+            try:
+                for chunk in open_stream():
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if not started:
+                    self._refund(model, estimated_tokens)
+                if started or attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay, failure = self.backoff_delay(attempt, e), e
+            finally:
+                self.gate.release(priority)
+
+            attempt += 1
+            self.retries += 1
+            if on_retry:
+                on_retry(failure)
+            time.sleep(delay)
@@ -0,0 +1,274 @@
+"""
+Semantic index over practice history
+Embeds questions and answers with a CPU-only model (a sentence-transformers
+model when EMBEDDING_MODEL names one and the package is installed, otherwise
+a feature-hashing embedder with no dependencies) and keeps the vectors in a
+NumPy matrix per user. Brute-force inner product stays well under a
+millisecond for thousands of items; hnswlib is used on top for large
+indexes when installed.
+"""
+
+import os
+import re
+import threading
+import warnings
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from core.question_pool import question_text
+
+DEFAULT_DIM = 384
+DUPLICATE_THRESHOLD = 0.82
+HNSW_MIN_ITEMS = 5000
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Dependency-free embedder: hashed word unigrams/bigrams and character
+    trigrams with signed buckets, L2-normalised"""
+
+    name = "hashing"
+
+    def __init__(self, dim=DEFAULT_DIM, max_cached=200_000):
+        self.dim = dim
+        self.max_cached = max_cached
+        # Per-token sparse contributions; vocabularies are small, so nearly
+        # every word and bigram after the first few texts is a cache hit
+        self._cache = {}
+
+    def _bucket(self, feature, weight):
+        h = zlib.crc32(feature.encode("utf-8"))
+        return h % self.dim, (weight if (h >> 31) & 1 else -weight)
+
+    def _word(self, word):
+        cached = self._cache.get(word)
+        if cached is None:
+            padded = f"#{word}#"
+            buckets = [self._bucket(word, 1.0)]
+            buckets += [self._bucket(padded[i:i + 3], 0.5) for i in range(len(padded) - 2)]
+            cached = self._remember(word, buckets)
+        return cached
+
+    def _bigram(self, bigram):
+        cached = self._cache.get(bigram)
+        if cached is None:
+            # Bigrams carry more meaning than character trigrams
+            cached = self._remember(bigram, [self._bucket(bigram, 2.0)])
+        return cached
+
+    def _remember(self, key, buckets):
+        value = (np.array([b for b, _ in buckets], dtype=np.int64), np.array([w for _, w in buckets], dtype=np.float32))
+        if len(self._cache) < self.max_cached:
+            self._cache[key] = value
+        return value
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_RE.findall(text.lower())
+            parts = [self._word(w) for w in words] + [self._bigram(f"{a} {b}") for a, b in zip(words, words[1:])]
+            if parts:
+                np.add.at(matrix[row], np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]))
+        return _normalize(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers model on CPU (e.g. all-MiniLM-L6-v2)"""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        vectors = self.model.encode(list(texts), batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+
+def create_embedder(name=None):
+    """Embedder from EMBEDDING_MODEL ("hashing" by default)
+
+    A sentence-transformers model name falls back to hashing (with a
+    warning) when the package isn't installed.
+    """
+    name = name or os.getenv("EMBEDDING_MODEL", "hashing")
+    if name == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(name)
+    except ImportError:
+        warnings.warn(f"sentence-transformers not installed; using hashing embeddings instead of {name}")
+        return HashingEmbedder()
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _hnswlib():
+    if os.getenv("SEMANTIC_INDEX_HNSW", "1") == "0":
+        return None
+    try:
+        import hnswlib
+    except ImportError:
+        return None
+    return hnswlib
+
+
+class VectorIndex:
+    """Append-only matrix of unit vectors with metadata and top-k search"""
+
+    def __init__(self, dim, capacity=256):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.items = []
+        self._hnsw = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, vectors, items):
+        """Append rows of vectors with one metadata dict each"""
+        n, needed = len(self.items), len(self.items) + len(items)
+        if needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+            grown[:n] = self._vectors[:n]
+            self._vectors = grown
+        self._vectors[n:needed] = vectors
+        self.items.extend(items)
+        self._update_hnsw(n, needed)
+
+    def _update_hnsw(self, start, end):
+        if self._hnsw is None:
+            hnswlib = _hnswlib() if end >= HNSW_MIN_ITEMS else None
+            if hnswlib is None:
+                return
+            self._hnsw = hnswlib.Index(space="ip", dim=self.dim)
+            self._hnsw.init_index(max_elements=2 * end, ef_construction=200, M=16)
+            self._hnsw.set_ef(64)
+            start = 0
+        if end > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(2 * end)
+        self._hnsw.add_items(self._vectors[start:end], np.arange(start, end))
+
+    def search(self, query, k=5):
+        """[(similarity, item)] for the k nearest items, best first"""
+        n = len(self.items)
+        if not n:
+            return []
+        k = min(k, n)
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(query, k=k)
+            return [(1.0 - float(d), self.items[int(i)]) for i, d in zip(labels[0], distances[0])]
+        scores = self._vectors[:n] @ query
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.items[i]) for i in top]
+
+
+class SemanticIndex:
+    """Per-user question/answer vectors for dedupe, similar-question retrieval
+    and history search
+
+    Items are dicts with at least "record_id", "kind" ("question" or
+    "answer") and "text". Users are loaded lazily with bootstrap(user_id,
+    records) and the coldest users are dropped beyond max_users.
+    """
+
+    def __init__(self, embedder=None, max_users=256):
+        self.embedder = embedder or create_embedder()
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _index(self, user_id):
+        index = self._users.get(user_id)
+        if index is not None:
+            self._users.move_to_end(user_id)
+        return index
+
+    def is_loaded(self, user_id):
+        with self._lock:
+            return user_id in self._users
+
+    def forget(self, user_id):
+        """Drop a user's index, so the next bootstrap rebuilds it from history"""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def bootstrap(self, user_id, records):
+        """Build a user's index from full history records (once)"""
+        index = VectorIndex(self.embedder.dim)
+        items = [item for record in records for item in record_items(record)]
+        if items:
+            index.add(self.embedder.embed([item["text"] for item in items]), items)
+        with self._lock:
+            self._users[user_id] = index
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return index
+
+    def add_record(self, user_id, record):
+        """Index a new history record for a loaded user"""
+        items = record_items(record)
+        if not items:
+            return
+        vectors = self.embedder.embed([item["text"] for item in items])
+        with self._lock:
+            index = self._index(user_id)
+            if index is not None:
+                index.add(vectors, items)
+
+    def search(self, user_id, text, k=5, kind=None):
+        """[(similarity, item)] best first, one hit per record"""
+        query = self.embedder.embed([text])[0]
+        with self._lock:
+            index = self._index(user_id)
+            if index is None:
+                return []
+            hits = index.search(query, k * 4 if kind else k * 2)
+        results, seen = [], set()
+        for score, item in hits:
+            if (kind and item["kind"] != kind) or item["record_id"] in seen:
+                continue
+            seen.add(item["record_id"])
+            results.append((score, item))
+            if len(results) >= k:
+                break
+        return results
+
+    def similar_questions(self, user_id, question, k=3):
+        return self.search(user_id, question, k, kind="question")
+
+    def is_duplicate(self, user_id, question, threshold=DUPLICATE_THRESHOLD):
+        """Whether the user has already practiced a near-identical question"""
+        hits = self.similar_questions(user_id, question, k=1)
+        return bool(hits) and hits[0][0] >= threshold
+
+    def stats(self):
+        with self._lock:
+            return {
+                "embedder": self.embedder.name,
+                "users": len(self._users),
+                "items": sum(len(index) for index in self._users.values()),
+            }
+
+
+def record_items(record, max_chars=2000):
+    """Index items for one history record (its question and its answer)"""
+    items = []
+    question = question_text(record["question"]) if record.get("question") else None
+    answer = record.get("answer") or record.get("transcript")
+    base = {"record_id": record.get("id"), "type": record.get("type"), "timestamp": record.get("timestamp")}
+    if question:
+        items.append({**base, "kind": "question", "text": question[:max_chars]})
+    if answer:
+        items.append({**base, "kind": "answer", "text": answer[:max_chars]})
+    return items
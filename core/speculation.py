@@ -0,0 +1,142 @@
+"""
+Speculative prefetch of the next mock-interviewer turn
+Drafts the next question from the candidate's partial answer while they are
+still writing, and reuses the draft on submit if it is already finished and
+the answer hasn't materially changed; otherwise the normal turn streams in
+"""
+
+import difflib
+import re
+import threading
+import time
+
+from core.concurrency import get_executor
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def answer_similarity(partial, final):
+    """Word-level similarity of the speculated and submitted answers (0..1)"""
+    a = _WORD_RE.findall(partial.lower())
+    b = _WORD_RE.findall(final.lower())
+    if not a or not b:
+        return 0.0
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def validation_messages(final_answer, draft):
+    """Cheap yes/no check that a drafted follow-up still fits the final answer"""
+    prompt = f"""A candidate gave this interview answer:
+{final_answer}
+
+The interviewer plans to reply:
+{draft}
+
+Does the reply still make sense as a response to this exact answer? Answer YES or NO."""
+    return [{"role": "user", "content": prompt}]
+
+
+class SpeculativeTurn:
+    """One session's in-flight speculation
+
+    turn_key identifies the conversation state the draft was built on (e.g.
+    number of messages and summary position); a draft is never reused
+    across turns.
+    """
+
+    def __init__(self, min_chars=80, debounce_seconds=2.0, restart_below=0.9,
+                 reuse_above=0.85, validate_above=0.6, executor=None):
+        self.min_chars = min_chars
+        self.debounce_seconds = debounce_seconds
+        self.restart_below = restart_below
+        self.reuse_above = reuse_above
+        self.validate_above = validate_above
+        self.executor = executor or get_executor()
+        self._lock = threading.Lock()
+        self.partial = None
+        self.turn_key = None
+        self.future = None
+        self.started_at = 0.0
+        self.stats = {"started": 0, "reused": 0, "validated": 0, "rejected": 0, "late": 0, "missed": 0}
+
+    def maybe_start(self, partial, turn_key, draft):
+        """Start drafting from a partial answer, debounced
+
+        draft(partial) runs on a worker and returns the drafted turn (any
+        value the caller's validate understands), or None. Returns True if a
+        new speculation was started.
+        """
+        partial = (partial or "").strip()
+        if len(partial) < self.min_chars:
+            return False
+
+        with self._lock:
+            if self.future is not None and self.turn_key == turn_key:
+                if time.monotonic() - self.started_at < self.debounce_seconds:
+                    return False
+                if answer_similarity(self.partial, partial) >= self.restart_below:
+                    return False
+                self.future.cancel()
+
+            self.partial = partial
+            self.turn_key = turn_key
+            self.started_at = time.monotonic()
+            self.future = self.executor.submit(draft, partial)
+            self.stats["started"] += 1
+            return True
+
+    def take(self, final_answer, turn_key, validate=None):
+        """Return a reusable draft for the submitted answer, or None
+
+        Only a finished draft is used: one still in flight is cancelled
+        rather than awaited, so the caller can stream the normal turn
+        without waiting on it. Very similar answers reuse the draft as-is;
+        moderately similar ones only if validate(final_answer, draft) approves.
+        """
+        with self._lock:
+            future, partial, key = self.future, self.partial, self.turn_key
+            self.future = self.partial = self.turn_key = None
+
+        if future is None or key != turn_key:
+            self.stats["missed"] += 1
+            return None
+
+        similarity = answer_similarity(partial, final_answer.strip())
+        if similarity < self.validate_above or (similarity < self.reuse_above and validate is None):
+            future.cancel()
+            self.stats["rejected"] += 1
+            return None
+
+        if not future.done():
+            future.cancel()
+            self.stats["late"] += 1
+            return None
+        try:
+            draft = future.result()
+        except Exception:
+            self.stats["missed"] += 1
+            return None
+        if not draft:
+            self.stats["missed"] += 1
+            return None
+
+        if similarity >= self.reuse_above:
+            self.stats["reused"] += 1
+            return draft
+
+        try:
+            approved = validate(final_answer, draft)
+        except Exception:
+            approved = False
+        if approved:
+            self.stats["validated"] += 1
+            return draft
+        self.stats["rejected"] += 1
+        return None
+
+    def reset(self):
+        """Drop any in-flight speculation (e.g. on restart)"""
+        with self._lock:
+            if self.future is not None:
+                self.future.cancel()
+            self.future = self.partial = self.turn_key = None
@@ -0,0 +1,123 @@
+"""
+STAR Method Coach
+Scores the Situation, Task, Action and Result parts of an answer
+independently. Each evaluation is cached by a hash of its own text, so
+editing one part re-scores only that part; the enhanced answer is one final
+call over the cached feedback. Word balance against the 20/20/40/20 guide
+and a few lint checks run locally on every keystroke.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from core.concurrency import fan_out
+from core.linter import STAR_GUIDE, STAR_TOLERANCE, lint
+from core.prompts import TEMPLATES
+from core.structured import STAR_COMPONENTS
+
+MIN_COMPONENT_CHARS = 20
+
+
+def normalize(text):
+    """Whitespace-insensitive form of a component, so reflowing text keeps its cache entry"""
+    return " ".join((text or "").split())
+
+
+def component_key(component, text, question=""):
+    payload = f"{component}\x00{normalize(question)}\x00{normalize(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ready(parts):
+    """Components long enough to be worth scoring"""
+    return [part for part in STAR_COMPONENTS if len(normalize(parts.get(part))) >= MIN_COMPONENT_CHARS]
+
+
+def word_shares(parts):
+    """{component: (words, share of the whole answer)}"""
+    counts = {part: len(normalize(parts.get(part)).split()) for part in STAR_COMPONENTS}
+    total = sum(counts.values())
+    return {part: (count, count / total if total else 0.0) for part, count in counts.items()}
+
+
+def local_checks(parts):
+    """Instant per-component hints: guide balance plus the checks that matter for each part"""
+    hints = {part: [] for part in STAR_COMPONENTS}
+    shares = word_shares(parts)
+    if sum(words for words, _ in shares.values()) >= 40:
+        for part, (_, share) in shares.items():
+            target = STAR_GUIDE[part]
+            if abs(share - target) > STAR_TOLERANCE:
+                hints[part].append(f"{'Too long' if share > target else 'Too short'}: {share:.0%} of the answer "
+                                   f"(guide {target:.0%})")
+    for part in STAR_COMPONENTS:
+        text = normalize(parts.get(part))
+        if not text:
+            continue
+        stats = lint(text).stats
+        if part == "result" and not stats["metrics"]:
+            hints[part].append("No numbers - quantify the outcome")
+        if part == "action" and stats["we_count"] > stats["i_count"]:
+            hints[part].append(f'"We" outnumbers "I" ({stats["we_count"]} vs {stats["i_count"]})')
+        if stats["filler"] + stats["hedges"]:
+            hints[part].append(f"{stats['filler'] + stats['hedges']} filler/hedge word(s)")
+        if stats["negative"]:
+            hints[part].append("Negative language")
+    return hints
+
+
+class StarCoach:
+    """Process-wide cache of per-component evaluations keyed by content hash"""
+
+    def __init__(self, llm, max_entries=4096):
+        self.llm = llm
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._evaluations = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, component, text, question=""):
+        """Evaluation for exactly this text, or None"""
+        key = component_key(component, text, question)
+        with self._lock:
+            if key in self._evaluations:
+                self._evaluations.move_to_end(key)
+                return self._evaluations[key]
+        return None
+
+    def pending(self, parts, question=""):
+        """Components with enough text whose current version isn't scored yet"""
+        return [part for part in ready(parts) if self.cached(part, parts[part], question) is None]
+
+    def _evaluate(self, component, text, question):
+        return self.llm.complete_json(**TEMPLATES.call(f"star_coach.{component}", text=normalize(text),
+                                                       question=question or None))
+
+    def evaluate(self, parts, question=""):
+        """Score the pending components in parallel
+
+        Returns ({component: evaluation} for every scored component, the
+        components re-scored by this call, {component: error}).
+        """
+        pending = self.pending(parts, question)
+        with self._lock:
+            self.hits += len(ready(parts)) - len(pending)
+            self.misses += len(pending)
+        errors = {}
+        tasks = {part: (lambda part=part: self._evaluate(part, parts[part], question)) for part in pending}
+        for part, result, error in fan_out(tasks):
+            if error is not None:
+                errors[part] = error
+                continue
+            with self._lock:
+                self._evaluations[component_key(part, parts[part], question)] = result
+                while len(self._evaluations) > self.max_entries:
+                    self._evaluations.popitem(last=False)
+        scored = {part: self.cached(part, parts[part], question) for part in STAR_COMPONENTS if parts.get(part)}
+        return {part: value for part, value in scored.items() if value}, [p for p in pending if p not in errors], errors
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._evaluations), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,288 @@
+"""
+Shared state backends
+A small key-value interface (JSON values with optional TTL, counters and
+atomic token buckets) so several Streamlit processes or nodes can share
+session snapshots, the response cache and rate-limit buckets. Select with
+STATE_BACKEND:
+
+    memory   one process (development)
+    sqlite   every process on the host (STATE_DB_PATH)
+    redis    every node (REDIS_URL); any redis-py compatible client works,
+             e.g. fakeredis for local testing
+
+Unset keeps the per-process / per-host defaults.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STATE_PATH = os.path.join(".data", "state.sqlite3")
+DEFAULT_SESSION_TTL = 7 * 24 * 60 * 60
+PURGE_EVERY_WRITES = 500
+
+# Session fields worth carrying to another replica; caches and live objects
+# (analytics engine, speculation) are rebuilt locally
+# History rows and the counters derived from them are not shared: they are
+# reloaded from the history store for whoever holds the history key.
+SESSION_KEYS = (
+    "total_questions", "user_profile", "total_practice_time", "checklist",
+    "current_question", "mock_messages", "mock_started", "mock_system_prompt",
+    "mock_summary", "mock_summarized_upto",
+)
+
+
+def _bucket_after(bucket, capacity, refill_per_second, delta, now):
+    """Token bucket {"tokens", "updated"} refilled to now, then changed by delta"""
+    if bucket is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, bucket["tokens"] + (now - bucket["updated"]) * refill_per_second)
+    return {"tokens": min(capacity, tokens + delta), "updated": now}
+
+
+def _bucket_ttl(capacity, refill_per_second):
+    # A bucket idle for this long is full again, so it can simply expire
+    return max(1, int(capacity / refill_per_second) + 1)
+
+
+class MemoryState:
+    """Dict-backed state for a single process"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item and item[1] is not None and item[1] <= now:
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key, time.time())
+            return item[0] if item else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            item = self._live(key, time.time())
+            value = (item[0] if item else 0) + amount
+            self._data[key] = (value, item[1] if item else None)
+            return value
+
+    def keys(self, prefix):
+        now = time.time()
+        with self._lock:
+            return [key for key in list(self._data) if key.startswith(prefix) and self._live(key, now)]
+
+    def bucket(self, key, capacity, refill_per_second, delta):
+        """Atomically refill and change a token bucket; returns the tokens left"""
+        now = time.time()
+        with self._lock:
+            item = self._live(key, now)
+            bucket = _bucket_after(item[0] if item else None, capacity, refill_per_second, delta, now)
+            self._data[key] = (bucket, now + _bucket_ttl(capacity, refill_per_second))
+            return bucket["tokens"]
+
+
+class SQLiteState:
+    """State in one SQLite file (WAL), shared by every process on the host"""
+
+    name = "sqlite"
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Autocommit mode so bucket updates can take an explicit write lock
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL
+                )
+            """)
+
+    def _read(self, key, now):
+        row = self._conn.execute(
+            "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, now)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, key, value, expires_at):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state(key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), expires_at),
+        )
+
+    def _update(self, key, change):
+        """Read-modify-write under BEGIN IMMEDIATE; change(old, now, expires_at) -> (new, expires_at)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT value, expires_at FROM state WHERE key = ?", (key,)).fetchone()
+                old, expires_at = (json.loads(row[0]), row[1]) if row and (row[1] is None or row[1] > now) else (None, None)
+                value, expires_at = change(old, now, expires_at)
+                self._write(key, value, expires_at)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def get(self, key):
+        with self._lock:
+            return self._read(key, time.time())
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._write(key, value, time.time() + ttl if ttl else None)
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 0:
+                self._conn.execute("DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def incr(self, key, amount=1):
+        return self._update(key, lambda old, now, expires_at: ((old or 0) + amount, expires_at))
+
+    def keys(self, prefix):
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM state WHERE key LIKE ? ESCAPE '\\' AND (expires_at IS NULL OR expires_at > ?)",
+                (escaped + "%", time.time()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def bucket(self, key, capacity, refill_per_second, delta):
+        ttl = _bucket_ttl(capacity, refill_per_second)
+        bucket = self._update(key, lambda old, now, _: (
+            _bucket_after(old, capacity, refill_per_second, delta, now), now + ttl))
+        return bucket["tokens"]
+
+
+class RedisState:
+    """State in Redis (or anything speaking the redis-py client API)
+
+    Keys are namespaced with `prefix`, so several deployments can share one
+    server.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix="interview_prep:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, prefix="interview_prep:"):
+        import redis
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key, amount=1):
+        if isinstance(amount, int):
+            return self.client.incrby(self.prefix + key, amount)
+        return self.client.incrbyfloat(self.prefix + key, amount)
+
+    def keys(self, prefix):
+        start = len(self.prefix)
+        return [(key.decode() if isinstance(key, bytes) else key)[start:]
+                for key in self.client.scan_iter(match=self.prefix + prefix + "*", count=500)]
+
+    def bucket(self, key, capacity, refill_per_second, delta):
+        name, ttl, result = self.prefix + key, _bucket_ttl(capacity, refill_per_second), {}
+
+        def update(pipe):
+            raw = pipe.get(name)
+            bucket = _bucket_after(json.loads(raw) if raw is not None else None,
+                                   capacity, refill_per_second, delta, time.time())
+            pipe.multi()
+            pipe.set(name, json.dumps(bucket), ex=ttl)
+            result.update(bucket)
+
+        # WATCH/MULTI with automatic retry when another node touched the bucket
+        self.client.transaction(update, name)
+        return result["tokens"]
+
+
+def create_state(name=None):
+    """State backend from STATE_BACKEND, or None to keep per-process state"""
+    name = (name or os.getenv("STATE_BACKEND", "")).lower()
+    if not name:
+        return None
+    if name == "memory":
+        return MemoryState()
+    if name == "sqlite":
+        return SQLiteState(os.getenv("STATE_DB_PATH", DEFAULT_STATE_PATH))
+    if name == "redis":
+        return RedisState.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                                   os.getenv("REDIS_PREFIX", "interview_prep:"))
+    raise ValueError(f"Unknown STATE_BACKEND: {name} (expected memory, sqlite or redis)")
+
+
+class SessionStore:
+    """Snapshots of per-session UI state, so any replica can pick up a session
+
+    Sessions are identified by an opaque id (kept in the page URL by the
+    app). save() skips the write when nothing changed since the last save.
+    """
+
+    def __init__(self, state, ttl=DEFAULT_SESSION_TTL, keys=SESSION_KEYS):
+        self.state = state
+        self.ttl = ttl
+        self.keys = keys
+
+    def snapshot(self, session):
+        """JSON-safe copy of the shared fields of a session mapping"""
+        return {key: session[key] for key in self.keys if key in session}
+
+    def load(self, session_id):
+        return self.state.get(f"session:{session_id}")
+
+    def save(self, session_id, session, last_digest=None):
+        """Persist the session if it changed; returns the new digest"""
+        text = json.dumps(self.snapshot(session), sort_keys=True, default=str)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if digest != last_digest:
+            self.state.set(f"session:{session_id}", json.loads(text), ttl=self.ttl)
+        return digest
+
+    def delete(self, session_id):
+        self.state.delete(f"session:{session_id}")
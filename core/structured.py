@@ -0,0 +1,224 @@
+"""
+Structured (JSON) LLM output
+Schemas for typed scoring results, a small JSON-schema subset validator and
+helpers to parse model output and build a one-shot repair request
+"""
+
+import json
+import re
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.I)
+
+STAR_COMPONENTS = ("situation", "task", "action", "result")
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_STAR_PART = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 100},
+        "feedback": {"type": "string"},
+    },
+    "required": ["score", "feedback"],
+}
+_STAR = {
+    "type": "object",
+    "properties": {part: _STAR_PART for part in STAR_COMPONENTS},
+    "required": list(STAR_COMPONENTS),
+}
+
+# Quick Practice: score, strengths, improvements
+ANSWER_SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 100},
+        "strengths": _STRING_LIST,
+        "improvements": _STRING_LIST,
+    },
+    "required": ["score", "strengths", "improvements"],
+}
+
+# Quick Practice: per-component STAR analysis
+STAR_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {"star": _STAR},
+    "required": ["star"],
+}
+
+# Mock interview scorecard (the narrative review is streamed separately)
+# STAR Coach: one component scored on its own
+STAR_COMPONENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 100},
+        "feedback": {"type": "string"},
+        "suggestion": {"type": "string"},
+    },
+    "required": ["score", "feedback", "suggestion"],
+}
+
+# Knowledge packs: pregenerated company / role intel
+COMPANY_PACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "culture": _STRING_LIST,
+        "interview_process": _STRING_LIST,
+        "common_questions": _STRING_LIST,
+        "values": _STRING_LIST,
+        "tips": _STRING_LIST,
+    },
+    "required": ["culture", "interview_process", "common_questions", "values", "tips"],
+}
+
+ROLE_PACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "salary_ranges": {
+            "type": "object",
+            "properties": {level: {"type": "string"} for level in ("entry", "mid", "senior")},
+            "required": ["entry", "mid", "senior"],
+        },
+        "negotiation": _STRING_LIST,
+        "value_points": _STRING_LIST,
+        "market_trends": _STRING_LIST,
+    },
+    "required": ["salary_ranges", "negotiation", "value_points", "market_trends"],
+}
+
+MOCK_SCORECARD_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 100},
+        "strengths": _STRING_LIST,
+        "improvements": _STRING_LIST,
+        "star": _STAR,
+        "hiring_decision": {"type": "string"},
+    },
+    "required": ["score", "strengths", "improvements", "star", "hiring_decision"],
+}
+
+# Rough output tokens of the smallest useful value of each type, for
+# schema_min_tokens (prompts ask for 3-5 items per list)
+_VALUE_TOKENS = {"string": 24, "number": 2, "integer": 2, "boolean": 2}
+_MIN_LIST_ITEMS = 3
+
+
+def schema_min_tokens(schema):
+    """Rough completion tokens of a minimal complete answer for a schema
+
+    A max_tokens below this would cut the JSON object short, so learned
+    output budgets never go under it.
+    """
+    kind = schema.get("type")
+    if kind == "object":
+        return 2 + sum(4 + schema_min_tokens(sub) for sub in schema.get("properties", {}).values())
+    if kind == "array":
+        return 2 + _MIN_LIST_ITEMS * (1 + schema_min_tokens(schema.get("items", {})))
+    return _VALUE_TOKENS.get(kind, 8)
+
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def validate(value, schema, path="$"):
+    """Errors for value against a JSON-schema subset (type, properties,
+    required, items, minimum, maximum); empty list when valid"""
+    expected = schema.get("type")
+    if expected and not _TYPE_CHECKS[expected](value):
+        return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+    errors = []
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: missing")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], subschema, f"{path}.{key}"))
+    elif expected == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    elif expected in ("number", "integer"):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: {value} < {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: {value} > {schema['maximum']}")
+    return errors
+
+
+def parse_json(text):
+    """Parse a JSON object from model output (tolerates code fences / chatter)"""
+    text = _FENCE_RE.sub("", (text or "").strip())
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            raise
+        return json.loads(text[start:end + 1])
+
+
+def check(text, schema):
+    """(data, errors) for a raw completion"""
+    try:
+        data = parse_json(text)
+    except (json.JSONDecodeError, TypeError) as e:
+        return None, [f"invalid JSON: {e}"]
+    return data, validate(data, schema)
+
+
+def schema_instructions(schema):
+    """System message telling the model to answer with matching JSON"""
+    return {
+        "role": "system",
+        "content": "Respond with a single JSON object only (no markdown) matching this JSON schema:\n"
+                   + json.dumps(schema, separators=(",", ":")),
+    }
+
+
+def repair_messages(messages, bad_output, errors):
+    """Follow-up request asking the model to fix invalid JSON"""
+    return messages + [
+        {"role": "assistant", "content": bad_output or ""},
+        {"role": "user", "content": "That JSON was invalid:\n- " + "\n- ".join(errors[:10])
+                                    + "\nReturn the corrected JSON object only."},
+    ]
+
+
+class StructuredOutputError(ValueError):
+    """Model output still failed validation after the repair retry"""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors[:5]))
+        self.errors = errors
+
+
+def score_markdown(data):
+    """Markdown rendering of an ANSWER_SCORE_SCHEMA / scorecard result"""
+    lines = [f"**Score:** {data['score']:.0f}/100", "", "**Strengths:**"]
+    lines += [f"- {item}" for item in data.get("strengths", [])]
+    lines += ["", "**Improvements:**"]
+    lines += [f"- {item}" for item in data.get("improvements", [])]
+    if data.get("hiring_decision"):
+        lines += ["", f"**Hiring Decision:** {data['hiring_decision']}"]
+    return "\n".join(lines)
+
+
+def star_markdown(star):
+    """Markdown table of per-component STAR scores and feedback"""
+    lines = ["| Component | Score | Feedback |", "|---|---|---|"]
+    for part in STAR_COMPONENTS:
+        item = star.get(part) or {}
+        lines.append(f"| {part.title()} | {item.get('score', 0):.0f} | {item.get('feedback', '')} |")
+    return "\n".join(lines)
+
+
+def star_scores(star):
+    """{component: score} for storing as compact metrics"""
+    return {part: (star.get(part) or {}).get("score") for part in STAR_COMPONENTS}
@@ -0,0 +1,153 @@
+"""
+Local OpenAI-compatible stub server
+Serves /v1/chat/completions (plain and SSE streaming) from the deterministic
+StubBackend, so the full HTTP path can be benchmarked offline:
+
+    python -m core.stub_server --port 8808 --first-token-ms 300 --tokens-per-second 200
+    LLM_BACKEND=openai OPENAI_BASE_URL=http://127.0.0.1:8808/v1 streamlit run app.py
+"""
+
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.backends import StubBackend
+
+# Optional OpenAI request fields passed through to the backend as kwargs
+FORWARDED_FIELDS = ("response_format", "stop", "top_p", "seed", "presence_penalty", "frequency_penalty")
+
+
+def make_handler(backend):
+    """Request handler class bound to a stub backend"""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/") in ("/health", "/v1/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": backend.default_model, "object": "model"}]})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/chat/completions":
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            model = request.get("model", backend.default_model)
+            args = (model, request.get("messages", []), request.get("temperature", 0.7), request.get("max_tokens", 500))
+            kwargs = {field: request[field] for field in FORWARDED_FIELDS if request.get(field) is not None}
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+            created = int(time.time())
+
+            try:
+                if request.get("stream"):
+                    self._stream(completion_id, created, model, backend.stream(*args, **kwargs))
+                    return
+                completion = backend.complete(*args, **kwargs)
+            except Exception as e:
+                self._send_json(500, {"error": {"message": str(e)}})
+                return
+
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": completion.text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": completion.prompt_tokens,
+                    "completion_tokens": completion.completion_tokens,
+                    "total_tokens": completion.prompt_tokens + completion.completion_tokens,
+                },
+            })
+
+        def _stream(self, completion_id, created, model, chunks):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+            def send(event):
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            def chunk(delta, finish_reason=None):
+                send({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                })
+
+            # The 200 headers are already out, so a failure mid-stream is
+            # reported as an SSE error event (which OpenAI clients raise) and
+            # the connection is closed without the [DONE] marker
+            self.close_connection = True
+            try:
+                chunk({"role": "assistant"})
+                for text in chunks:
+                    chunk({"content": text})
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            except Exception as e:
+                send({"error": {"message": str(e), "type": "server_error"}})
+                return
+            chunk({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return StubHandler
+
+
+def serve(host="127.0.0.1", port=8808, backend=None):
+    """Create (but don't start) a threaded stub server"""
+    return ThreadingHTTPServer((host, port), make_handler(backend or StubBackend.from_env()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--first-token-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=250.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fill-ratio", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    backend = StubBackend(args.first_token_ms, args.tokens_per_second, args.jitter_ms,
+                          args.fill_ratio, failure_rate=args.failure_rate)
+    server = serve(args.host, args.port, backend)
+    print(f"Stub LLM server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
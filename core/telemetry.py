@@ -0,0 +1,261 @@
+"""
+Request tracing
+Records a span per LLM call and per Streamlit rerun (time to first token,
+total time, tokens, cache hit, retries, model, call site) into an in-memory
+ring buffer with per-site latency percentiles. Spans can be appended to a
+JSONL file and metrics written in the Prometheus text format, e.g. for the
+node_exporter textfile collector:
+
+    TELEMETRY_SPANS_PATH=.data/telemetry/spans.jsonl
+    TELEMETRY_PROM_PATH=.data/telemetry/metrics.prom
+    TELEMETRY_PROM_INTERVAL=5    # seconds between textfile rewrites
+"""
+
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = "interview_prep"
+
+_call_site = contextvars.ContextVar("call_site", default=None)
+
+
+@contextmanager
+def call_site(name):
+    """Label every span started inside the block (and in tasks fanned out from it)"""
+    token = _call_site.set(name)
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+
+def current_call_site():
+    return _call_site.get()
+
+
+class Span:
+    """One timed operation; attributes are free-form but LLM spans use
+    model, task, site, cache_hit, retries, prompt_tokens, completion_tokens"""
+
+    __slots__ = ("name", "kind", "attributes", "start", "first_token", "end", "error")
+
+    def __init__(self, name, kind, attributes):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.first_token = None
+        self.end = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_retry(self, *_):
+        self.attributes["retries"] = self.attributes.get("retries", 0) + 1
+
+    def add_tokens(self, prompt_tokens=0, completion_tokens=0):
+        self.attributes["prompt_tokens"] = self.attributes.get("prompt_tokens", 0) + prompt_tokens
+        self.attributes["completion_tokens"] = self.attributes.get("completion_tokens", 0) + completion_tokens
+
+    def mark_first_token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def ttft(self):
+        return self.first_token - self.start if self.first_token is not None else None
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "ts": time.time() - self.duration,
+            "duration_ms": round(self.duration * 1000, 2),
+            "ttft_ms": round(self.ttft * 1000, 2) if self.ttft is not None else None,
+            "error": self.error,
+            **self.attributes,
+        }
+
+
+class Tracer:
+    """Collects finished spans and aggregates them per (kind, site)"""
+
+    def __init__(self, max_spans=2000, window=2000, spans_path=None, prom_path=None, prom_interval=5.0):
+        self.recent = deque(maxlen=max_spans)
+        self.window = window
+        self.spans_path = spans_path
+        self.prom_path = prom_path
+        self.prom_interval = prom_interval
+        self._lock = threading.Lock()
+        self._prom_lock = threading.Lock()
+        self._prom_written = None
+        self._durations = defaultdict(lambda: deque(maxlen=self.window))
+        self._ttfts = defaultdict(lambda: deque(maxlen=self.window))
+        self._buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self._sums = defaultdict(float)
+        self._counters = defaultdict(float)
+        self._listeners = []
+        for path in (spans_path, prom_path):
+            if path and os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(spans_path=os.getenv("TELEMETRY_SPANS_PATH") or None,
+                   prom_path=os.getenv("TELEMETRY_PROM_PATH") or None,
+                   prom_interval=float(os.getenv("TELEMETRY_PROM_INTERVAL", "5")))
+
+    def add_listener(self, listener):
+        """Call listener(record) with every finished span"""
+        self._listeners.append(listener)
+
+    def start(self, name, kind="llm", **attributes):
+        attributes.setdefault("site", current_call_site() or attributes.get("task") or name)
+        return Span(name, kind, attributes)
+
+    def finish(self, span, error=None):
+        span.end = time.perf_counter()
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        record = span.as_dict()
+        key = (span.kind, span.attributes["site"])
+        labels = (span.kind, span.attributes["site"], span.attributes.get("model") or "")
+        with self._lock:
+            self.recent.append(record)
+            self._durations[key].append(span.duration)
+            if span.ttft is not None:
+                self._ttfts[key].append(span.ttft)
+            buckets = self._buckets[labels]
+            buckets[next((i for i, b in enumerate(LATENCY_BUCKETS) if span.duration <= b), len(LATENCY_BUCKETS))] += 1
+            self._sums[labels] += span.duration
+            self._counters[("requests", labels)] += 1
+            self._counters[("errors", labels)] += error is not None
+            self._counters[("cache_hits", labels)] += bool(span.attributes.get("cache_hit"))
+            self._counters[("retries", labels)] += span.attributes.get("retries", 0)
+            self._counters[("prompt_tokens", labels)] += span.attributes.get("prompt_tokens", 0)
+            self._counters[("completion_tokens", labels)] += span.attributes.get("completion_tokens", 0)
+            if self.spans_path:
+                with open(self.spans_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        for listener in self._listeners:
+            listener(record)
+        return record
+
+    @contextmanager
+    def span(self, name, kind="llm", **attributes):
+        span, error = self.start(name, kind, **attributes), None
+        try:
+            yield span
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Also reached via st.rerun()/st.stop(), which raise BaseException
+            self.finish(span, error)
+
+    def percentiles(self, kind=None):
+        """Rows of count and p50/p95/p99 latency (and TTFT) per site, in ms"""
+        with self._lock:
+            series = {key: list(values) for key, values in self._durations.items()}
+            ttfts = {key: list(values) for key, values in self._ttfts.items()}
+        rows = []
+        for (span_kind, site), values in sorted(series.items()):
+            if kind and span_kind != kind:
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+            ttft = ttfts.get((span_kind, site))
+            rows.append({
+                "kind": span_kind, "site": site, "count": len(values),
+                "p50_ms": round(float(p50), 1), "p95_ms": round(float(p95), 1), "p99_ms": round(float(p99), 1),
+                "ttft_p50_ms": round(float(np.percentile(ttft, 50)) * 1000, 1) if ttft else None,
+            })
+        return rows
+
+    def totals(self):
+        """Process-wide counter totals (requests, errors, tokens, cache hits, retries)"""
+        totals = defaultdict(float)
+        with self._lock:
+            for (metric, labels), value in self._counters.items():
+                if labels[0] == "llm":
+                    totals[metric] += value
+        return dict(totals)
+
+    def prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {METRIC_PREFIX}_span_duration_seconds Span latency by kind, call site and model",
+            f"# TYPE {METRIC_PREFIX}_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            buckets = {labels: list(counts) for labels, counts in self._buckets.items()}
+            sums = dict(self._sums)
+            counters = dict(self._counters)
+        for labels, counts in sorted(buckets.items()):
+            label_text = _labels(labels)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{METRIC_PREFIX}_span_duration_seconds_bucket{{{label_text},le="{le}"}} {cumulative}')
+            lines.append(f"{METRIC_PREFIX}_span_duration_seconds_sum{{{label_text}}} {sums[labels]:.6f}")
+            lines.append(f"{METRIC_PREFIX}_span_duration_seconds_count{{{label_text}}} {cumulative}")
+        for metric in ("requests", "errors", "cache_hits", "retries", "prompt_tokens", "completion_tokens"):
+            name = f"{METRIC_PREFIX}_{metric}_total"
+            lines += [f"# TYPE {name} counter"]
+            lines += [f"{name}{{{_labels(labels)}}} {value:g}"
+                      for (counter, labels), value in sorted(counters.items()) if counter == metric]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, force=False):
+        """Atomically rewrite the Prometheus textfile, if configured
+
+        Called after every rerun from every session, so rewrites are
+        throttled to one per prom_interval; a concurrent caller skips
+        instead of waiting. A failed write is dropped, never raised.
+        """
+        if not self.prom_path:
+            return
+        now = time.monotonic()
+        if not force and self._prom_written is not None and now - self._prom_written < self.prom_interval:
+            return
+        if not self._prom_lock.acquire(blocking=force):
+            return
+        tmp = None
+        try:
+            directory, name = os.path.split(os.path.abspath(self.prom_path))
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=f".{name}.",
+                                             suffix=".tmp", delete=False) as f:
+                tmp = f.name
+                f.write(self.prometheus())
+            os.replace(tmp, self.prom_path)
+            tmp = None
+            self._prom_written = now
+        except OSError:
+            pass
+        finally:
+            if tmp:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            self._prom_lock.release()
+
+
+def _labels(labels):
+    kind, site, model = labels
+    escape = lambda value: str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'kind="{escape(kind)}",site="{escape(site)}",model="{escape(model)}"'
@@ -0,0 +1,301 @@
+"""
+Prompt template registry
+Every prompt is registered under its call site together with its output
+ceiling, task class and temperature. Rendering compacts the inputs first:
+question markdown is reduced to the question itself (the "What they're
+looking for" notes are for the candidate, not the grader), and answers and
+transcripts are capped. max_tokens follows the observed output lengths of
+the site once enough calls have been seen, never above the ceiling.
+
+    python -m core.templates report                       # prompt tokens per site, before/after
+    python -m core.templates report --spans .data/telemetry/spans.jsonl --user <id>
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from collections import defaultdict, deque
+
+import numpy as np
+
+from core.question_pool import question_text
+from core.structured import schema_min_tokens
+from core.tokens import message_tokens, tokenizer_name, truncate
+
+ANSWER_TOKEN_CAP = int(os.getenv("PROMPT_ANSWER_TOKEN_CAP", "600"))
+TRANSCRIPT_TOKEN_CAP = int(os.getenv("PROMPT_TRANSCRIPT_TOKEN_CAP", "3000"))
+
+# Field name -> compaction applied to that argument before rendering
+COMPACTORS = {
+    "question": question_text,
+    "answer": lambda text: truncate(text, ANSWER_TOKEN_CAP),
+    "text": lambda text: truncate(text, ANSWER_TOKEN_CAP),
+    "transcript": lambda text: truncate(text, TRANSCRIPT_TOKEN_CAP),
+}
+
+
+class OutputBudget:
+    """max_tokens per call site from the observed completion lengths
+
+    Fed with finished spans (Tracer.add_listener(budget.observe)). Once a
+    site has min_samples completions, its budget is the quantile plus
+    headroom, rounded up to a step so cache keys stay stable, and clamped to
+    the template's floor and ceiling. Outputs cut off at the budget count as
+    the budget, so a site that keeps hitting it grows back toward the ceiling.
+    """
+
+    def __init__(self, quantile=95, headroom=1.25, step=64, min_samples=20, window=500):
+        self.quantile = quantile
+        self.headroom = headroom
+        self.step = step
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def observe(self, record):
+        tokens = record.get("completion_tokens") or 0
+        if record.get("kind") != "llm" or record.get("cache_hit") or tokens <= 0:
+            return
+        with self._lock:
+            self._samples[record["site"]].append(tokens)
+
+    def load_spans(self, path):
+        """Observe every span in a TELEMETRY_SPANS_PATH file"""
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self.observe(json.loads(line))
+
+    def samples(self, site):
+        with self._lock:
+            return list(self._samples.get(site, ()))
+
+    def max_tokens(self, site, ceiling, floor=32):
+        samples = self.samples(site)
+        if len(samples) < self.min_samples:
+            return ceiling
+        wanted = np.percentile(samples, self.quantile) * self.headroom
+        return int(min(ceiling, max(floor, math.ceil(wanted / self.step) * self.step)))
+
+    def stats(self):
+        with self._lock:
+            series = {site: list(values) for site, values in self._samples.items()}
+        return {site: {"samples": len(values), "p50": float(np.percentile(values, 50)),
+                       "p95": float(np.percentile(values, self.quantile))}
+                for site, values in series.items()}
+
+
+class Template:
+    """One registered prompt: builder, call site and output ceiling
+
+    JSON-mode templates never get a budget below what a minimal answer for
+    their schema needs; use_cache (when not None) is passed to the call.
+    """
+
+    def __init__(self, site, build, max_tokens, temperature=0.7, task=None, schema=None, min_tokens=32,
+                 use_cache=None):
+        self.site = site
+        self.build = build
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.task = task
+        self.schema = schema
+        if schema:
+            min_tokens = max(min_tokens, schema_min_tokens(schema))
+        self.min_tokens = min(min_tokens, max_tokens)
+        self.use_cache = use_cache
+
+
+class TemplateRegistry:
+    """Templates by call site, sharing one output budget"""
+
+    def __init__(self, budget=None):
+        self.templates = {}
+        self.budget = budget or OutputBudget()
+
+    def register(self, site, build, max_tokens, **options):
+        self.templates[site] = Template(site, build, max_tokens, **options)
+        return self.templates[site]
+
+    def __getitem__(self, site):
+        return self.templates[site]
+
+    def __iter__(self):
+        return iter(self.templates)
+
+    def compact(self, fields):
+        return {name: COMPACTORS[name](value) if value and name in COMPACTORS else value
+                for name, value in fields.items()}
+
+    def render(self, site, *args, **fields):
+        """Messages for a site, built from compacted inputs"""
+        return self.templates[site].build(*args, **self.compact(fields))
+
+    def max_tokens(self, site):
+        template = self.templates[site]
+        return self.budget.max_tokens(site, template.max_tokens, template.min_tokens)
+
+    def call(self, site, *args, **fields):
+        """call_groq_api / LLMClient keyword arguments for a site
+
+        Templates with a schema carry a "schema" key and go through JSON mode.
+        """
+        template = self.templates[site]
+        call = {
+            "messages": self.render(site, *args, **fields),
+            "temperature": template.temperature,
+            "max_tokens": self.max_tokens(site),
+            "task": template.task,
+            "site": site,
+        }
+        if template.schema:
+            call["schema"] = template.schema
+        if template.use_cache is not None:
+            call["use_cache"] = template.use_cache
+        return call
+
+
+def report(registry, samples):
+    """Rows of average prompt tokens per site before and after compaction
+
+    samples maps a site to a list of (args, fields) inputs; max_tokens
+    "after" reflects whatever the registry's budget has observed.
+    """
+    rows = []
+    for site, inputs in samples.items():
+        if not inputs:
+            continue
+        template = registry[site]
+        before = [message_tokens(template.build(*args, **fields)) for args, fields in inputs]
+        after = [message_tokens(registry.render(site, *args, **fields)) for args, fields in inputs]
+        observed = registry.budget.samples(site)
+        rows.append({
+            "site": site,
+            "samples": len(inputs),
+            "prompt_tokens_before": round(float(np.mean(before)), 1),
+            "prompt_tokens_after": round(float(np.mean(after)), 1),
+            "saved": round(1 - sum(after) / sum(before), 3) if sum(before) else 0.0,
+            "max_tokens_before": template.max_tokens,
+            "max_tokens_after": registry.max_tokens(site),
+            "observed_outputs": len(observed),
+        })
+    return rows
+
+
+# Representative inputs for the report when no history is given
+SAMPLE_QUESTION = """**Question:** Tell me about a time you had to make a technical decision with incomplete information.
+**What they're looking for:** Judgement under uncertainty, how the candidate gathers data, weighs trade-offs,
+communicates risk to stakeholders and follows up once more information is available."""
+
+SAMPLE_GAP_SUMMARY = """ATS score 62/100. Matched: python, aws, docker. Missing: kubernetes, terraform, ci/cd.
+Sections: experience, skills (no summary). 2 of 9 bullets quantified."""
+
+
+def sample_inputs(registry):
+    """(args, fields) inputs per registered site, from the load-test answers"""
+    from core.conversation import build_transcript, interviewer_system_prompt, next_turn_instruction
+    from core.loadtest import ANSWERS
+
+    answers = ANSWERS + [" ".join(ANSWERS * 4)]
+    turns = []
+    for answer in ANSWERS * 2:
+        turns += [{"role": "interviewer", "content": "Thanks. " + question_text(SAMPLE_QUESTION)},
+                  {"role": "candidate", "content": answer}]
+    transcript = build_transcript(turns)
+    persona = interviewer_system_prompt("Backend Engineer", "Medium", "Stripe")
+    parts = dict(zip(("situation", "task", "action", "result"), ANSWERS))
+    evaluations = {part: {"score": 70, "feedback": "Clear but generic.", "suggestion": "Add a number."}
+                   for part in parts}
+
+    by_field = {
+        "question_answer": [((), {"question": SAMPLE_QUESTION, "answer": answer}) for answer in answers],
+        "transcript": [((), {"transcript": transcript})],
+        "gap_summary": [((), {"gap_summary": SAMPLE_GAP_SUMMARY, "role": "Backend Engineer"})],
+        "star_text": [((), {"text": answer, "question": question_text(SAMPLE_QUESTION)}) for answer in answers],
+        "star_enhance": [((), {"question": question_text(SAMPLE_QUESTION), "parts": parts,
+                               "evaluations": evaluations})],
+        "generate": [(("Medium", "Behavioral", "Backend Engineer", "Stripe"), {})],
+        "mock.start": [((persona, []), {})],
+        "mock.turn": [((persona, turns[:count], "", 0, next_turn_instruction(count // 2)), {})
+                      for count in (2, 4, 6)],
+        "mock.conclude": [((persona, turns, "", 0, next_turn_instruction(4)), {})],
+        "mock.speculation_check": [((answer, "Thanks. How did you measure the impact?"), {}) for answer in answers],
+        "mock.summarize": [(("", turns[:6]), {})],
+        "knowledge_pack.company": [(("Stripe",), {})],
+        "knowledge_pack.role": [(("Backend Engineer",), {})],
+    }
+    samples = {}
+    for site in registry:
+        if site in by_field:
+            samples[site] = by_field[site]
+        elif site.startswith(("quick_practice.feedback", "quick_practice.deep_check")):
+            samples[site] = by_field["question_answer"]
+        elif site in ("mock.review", "mock.scorecard"):
+            samples[site] = by_field["transcript"]
+        elif site == "resume.advice":
+            samples[site] = by_field["gap_summary"]
+        elif site == "star_coach.enhance":
+            samples[site] = by_field["star_enhance"]
+        elif site.startswith("star_coach."):
+            samples[site] = by_field["star_text"]
+        elif site.endswith(".generate") or site.endswith(".refill"):
+            samples[site] = by_field["generate"]
+    return samples
+
+
+def history_inputs(registry, user_id, limit=200):
+    """(args, fields) inputs per site from a user's stored history"""
+    from core.exports import ReportStore, resolve_report
+    from core.history_store import HistoryStore
+
+    samples = defaultdict(list)
+    reports = ReportStore.from_env()
+    for count, record in enumerate(HistoryStore.from_env().iter_records(user_id)):
+        if count >= limit:
+            break
+        record = resolve_report(record, reports)
+        if record.get("type") == "Quick Practice" and record.get("answer"):
+            fields = {"question": record["question"], "answer": record["answer"]}
+            for site in registry:
+                if site.startswith(("quick_practice.feedback", "quick_practice.deep_check")):
+                    samples[site].append(((), fields))
+        elif record.get("transcript"):
+            for site in ("mock.review", "mock.scorecard"):
+                samples[site].append(((), {"transcript": record["transcript"]}))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt tokens per call site, before and after compaction")
+    parser.add_argument("command", choices=("report",))
+    parser.add_argument("--spans", default=os.getenv("TELEMETRY_SPANS_PATH"),
+                        help="span JSONL to learn output lengths from (default: TELEMETRY_SPANS_PATH)")
+    parser.add_argument("--user", default=None, help="use this user's history (HISTORY_DB_PATH) as inputs")
+    parser.add_argument("--json", action="store_true", help="print JSON rows instead of a table")
+    args = parser.parse_args()
+
+    from core.prompts import TEMPLATES
+
+    if args.spans and os.path.exists(args.spans):
+        TEMPLATES.budget.load_spans(args.spans)
+    samples = history_inputs(TEMPLATES, args.user) if args.user else sample_inputs(TEMPLATES)
+    rows = report(TEMPLATES, samples)
+
+    if args.json:
+        print(json.dumps({"tokenizer": tokenizer_name(), "rows": rows}, indent=2))
+        return
+    print(f"Tokenizer: {tokenizer_name()}", file=sys.stderr)
+    header = f"{'site':<34} {'n':>4} {'prompt before':>14} {'after':>8} {'saved':>7} {'max_tokens':>15}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['site']:<34} {row['samples']:>4} {row['prompt_tokens_before']:>14.0f} "
+              f"{row['prompt_tokens_after']:>8.0f} {row['saved']:>7.0%} "
+              f"{row['max_tokens_before']:>7} -> {row['max_tokens_after']:<5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Token counting
+Counts with tiktoken's cl100k_base encoding when it is installed (close
+enough to Llama-family tokenizers for budgeting), otherwise with a ~4
+characters per token heuristic. Rate-limit estimates, context compaction and
+prompt budgets all count through here.
+"""
+
+import threading
+
+MESSAGE_OVERHEAD = 4
+TRIM_MARKER = "\n[... {count} tokens trimmed ...]\n"
+
+_lock = threading.Lock()
+_encoding = None
+_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    _encoding = None
+                _loaded = True
+    return _encoding
+
+
+def tokenizer_name():
+    return "tiktoken:cl100k_base" if _get_encoding() else "heuristic:chars/4"
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def message_tokens(messages):
+    """Prompt tokens of a chat request, including per-message framing"""
+    return sum(count_tokens(m.get("content", "")) + MESSAGE_OVERHEAD for m in messages)
+
+
+def truncate(text, max_tokens, head=0.6):
+    """text cut to about max_tokens, keeping its start and end around a marker
+
+    The opening and the conclusion of answers and transcripts carry most of
+    the signal, so the middle goes first.
+    """
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    keep_head = int(max_tokens * head)
+    keep_tail = max(1, max_tokens - keep_head)
+    marker = TRIM_MARKER.format(count=total - max_tokens)
+    encoding = _get_encoding()
+    if encoding:
+        ids = encoding.encode(text, disallowed_special=())
+        return encoding.decode(ids[:keep_head]).rstrip() + marker + encoding.decode(ids[-keep_tail:]).lstrip()
+    return text[:keep_head * 4].rstrip() + marker + text[-keep_tail * 4:].lstrip()
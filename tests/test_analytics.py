@@ -0,0 +1,37 @@
+from datetime import date, datetime, timedelta
+
+from core.analytics import TIMESTAMP_FORMAT, AnalyticsEngine
+
+
+def rows(count, start=datetime(2026, 1, 1, 9, 0), step=timedelta(hours=12)):
+    return [{"timestamp": (start + i * step).strftime(TIMESTAMP_FORMAT), "type": "Quick Practice",
+             "score": float(i % 100), "metrics": None} for i in range(count)]
+
+
+def test_incremental_matches_bootstrap():
+    history = rows(30)
+    incremental = AnalyticsEngine(window=5)
+    for row in history:
+        incremental.update(row)
+    bulk = AnalyticsEngine.from_rows(history, window=5)
+    assert incremental.overall.as_dict() == bulk.overall.as_dict()
+    assert (incremental.current_streak, incremental.best_streak) == (bulk.current_streak, bulk.best_streak) == (15, 15)
+    assert list(incremental.series) == list(bulk.series)
+
+
+def test_score_series_is_bounded():
+    history = rows(50)
+    engine = AnalyticsEngine.from_rows(history, series_points=20)
+    for row in rows(10, start=datetime(2026, 3, 1)):
+        engine.update(row)
+    assert len(engine.series) == 20 and engine.overall.count == 60
+    series = engine.score_series(max_points=200)
+    assert len(series) == 20 and series["timestamp"].iloc[-1] == datetime(2026, 3, 5, 12, 0)
+
+
+def test_out_of_order_sessions_keep_the_streak():
+    engine = AnalyticsEngine()
+    for day in (3, 4, 1, 4, 5):
+        engine.update({"timestamp": f"2026-01-0{day} 10:00:00", "score": 50})
+    assert engine.current_streak == 3 and engine.streak(today=date(2026, 1, 6)) == 3
+    assert engine.streak(today=date(2026, 1, 8)) == 0
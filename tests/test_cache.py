@@ -0,0 +1,108 @@
+import pytest
+
+from core import cache
+from core.cache import ResponseCache, SharedResponseCache, is_cacheable, make_cache_key
+from core.state import MemoryState
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=60, max_entries=3)
+
+
+def test_key_depends_on_every_input():
+    messages = [{"role": "user", "content": "hi"}]
+    key = make_cache_key("m", messages, 0.2, 100)
+    assert key == make_cache_key("m", [dict(messages[0])], 0.2, 100)
+    assert key != make_cache_key("other", messages, 0.2, 100)
+    assert key != make_cache_key("m", messages, 0.3, 100)
+    assert key != make_cache_key("m", messages, 0.2, 200)
+
+
+def test_sampled_temperatures_skip_the_cache():
+    assert is_cacheable(0.2)
+    assert not is_cacheable(0.7)
+    assert not is_cacheable(0.9)
+    assert is_cacheable(0.9, use_cache=True)
+    assert not is_cacheable(0.0, use_cache=False)
+
+
+def test_hit_and_miss(store):
+    assert store.get("a") is None
+    store.set("a", "value")
+    assert store.get("a") == "value"
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_entries_expire_after_ttl(store, clock):
+    store.set("a", "value")
+    clock.now += 60
+    assert store.get("a") == "value"
+    clock.now += 1
+    assert store.get("a") is None
+    assert store.stats()["entries"] == 0
+
+
+def test_expired_entries_are_purged_on_write(store, clock):
+    store.set("a", "old")
+    clock.now += 61
+    store.set("b", "new")
+    stats = store.stats()
+    assert stats["entries"] == 1 and stats["evictions"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(store, clock):
+    for key in ("a", "b", "c"):
+        store.set(key, key)
+        clock.now += 1
+    store.get("a")
+    clock.now += 1
+    store.set("d", "d")
+    assert store.get("b") is None
+    assert [store.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert store.stats()["evictions"] == 1
+
+
+def test_counters_are_shared_through_the_file(tmp_path, clock):
+    path = str(tmp_path / "responses.sqlite3")
+    first, second = ResponseCache(path), ResponseCache(path)
+    first.set("a", "value")
+    assert second.get("a") == "value"
+    assert first.stats()["hits"] == 1 and first.stats()["process_hits"] == 0
+
+
+def test_clear_resets_entries_and_counters(store):
+    store.set("a", "value")
+    store.get("a")
+    store.clear()
+    stats = store.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (0, 0, 0)
+
+
+def test_shared_cache_uses_state_ttl(monkeypatch):
+    from core import state as state_module
+
+    clock = Clock()
+    monkeypatch.setattr(state_module.time, "time", clock)
+    shared = SharedResponseCache(MemoryState(), ttl_seconds=60)
+    shared.set("a", "value", model="m")
+    assert shared.get("a") == "value"
+    clock.now += 61
+    assert shared.get("a") is None
+    assert (shared.stats()["hits"], shared.stats()["misses"]) == (1, 1)
@@ -0,0 +1,96 @@
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from core.exports import ExportError, ReportStore, bundle_bytes, resolve_report, write_bundle
+from core.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path / "exports"))
+
+
+def test_put_dedupes_by_content(store):
+    ref = store.put("transcript")
+    assert store.put(b"transcript") == ref
+    assert store.put_stream([b"trans", b"cript"]) == ref
+    assert store.stats() == {"files": 1, "size_bytes": len("transcript")}
+    assert os.path.exists(os.path.join(store.root, ref[:2], ref))
+
+
+def test_different_content_gets_different_refs(store):
+    assert store.put("a") != store.put("b")
+    assert store.stats()["files"] == 2
+
+
+def test_read_joins_parts_and_loader_is_lazy(store):
+    first, second = store.put("transcript"), store.put("feedback")
+    load = store.loader(first, second)
+    assert store.read(first) == b"transcript"
+    assert load() == b"transcript\n\nfeedback"
+
+
+def test_failed_write_leaves_nothing_behind(store):
+    def chunks():
+        yield b"partial"
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        store.put_stream(chunks())
+    assert os.listdir(store.root) == []
+
+
+def test_bad_and_missing_refs(store):
+    with pytest.raises(ExportError):
+        store.path("../../etc/passwd")
+    with pytest.raises(ExportError):
+        store.read("0" * 64)
+
+
+def test_resolve_report_reads_referenced_parts(store):
+    record = {"type": "Mock Interview", "report": {"transcript": store.put("T"), "feedback": "f" * 64}}
+    resolved = resolve_report(record, store)
+    assert resolved["transcript"] == "T" and resolved["feedback"] is None
+    assert "transcript" not in record
+    inline = {"transcript": "inline", "report": {"transcript": "0" * 64}}
+    assert resolve_report(inline, store) is inline
+
+
+@pytest.fixture
+def history(tmp_path, store):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    history.append("me", {"timestamp": "2026-01-01 10:00:00", "type": "Quick Practice",
+                          "question": "**Question:** Why?", "answer": "Because.", "score": 70})
+    history.append("me", {"timestamp": "2026-01-02 10:00:00", "type": "Mock Interview",
+                          "report": {"transcript": store.put("Interviewer: Hi"), "feedback": store.put("Good")}})
+    history.append("someone-else", {"timestamp": "2026-01-03 10:00:00", "type": "Quick Practice"})
+    return history
+
+
+def test_jsonl_bundle_resolves_reports(history, store):
+    out = io.BytesIO()
+    write_bundle(history, "me", "jsonl", out, store)
+    records = [json.loads(line) for line in out.getvalue().decode("utf-8").splitlines()]
+    assert [record["type"] for record in records] == ["Quick Practice", "Mock Interview"]
+    assert records[1]["transcript"] == "Interviewer: Hi"
+
+
+def test_zip_bundle_bytes(history, store):
+    archive = zipfile.ZipFile(io.BytesIO(bundle_bytes(history, "me", "zip", store)))
+    names = archive.namelist()
+    assert names == ["history.jsonl", "sessions/00001-quick-practice.md", "sessions/00002-mock-interview.md"]
+    assert "## Transcript\n\nInterviewer: Hi" in archive.read(names[2]).decode("utf-8")
+
+
+def test_bundle_over_the_cap_fails(history, store):
+    with pytest.raises(ExportError, match="core.exports bundle"):
+        bundle_bytes(history, "me", "jsonl", store, max_bytes=100)
+
+
+def test_unknown_format(history):
+    with pytest.raises(ExportError):
+        write_bundle(history, "me", "docx", io.BytesIO())
@@ -0,0 +1,33 @@
+import pytest
+
+from core.history_store import HistoryStore, user_key
+
+
+@pytest.fixture
+def history(tmp_path):
+    return HistoryStore(str(tmp_path / "history.sqlite3"))
+
+
+def test_user_key_is_stable_and_hides_the_key():
+    owner = user_key("correct horse battery")
+    assert owner == user_key("correct horse battery")
+    assert owner != user_key("correct horse battery!")
+    assert owner.startswith("key:") and "horse" not in owner
+
+
+def test_user_key_rejects_short_keys():
+    with pytest.raises(ValueError):
+        user_key("short")
+
+
+def test_reassign_moves_only_that_owners_sessions(history):
+    history.append("guest:tab", {"timestamp": "2026-01-01 10:00:00", "type": "Quick Practice"})
+    history.append("guest:tab", {"timestamp": "2026-01-02 10:00:00", "type": "Mock Interview"})
+    history.append("guest:other", {"timestamp": "2026-01-03 10:00:00", "type": "Quick Practice"})
+    owner = user_key("correct horse battery")
+
+    assert history.reassign("guest:tab", owner) == 2
+    assert history.count("guest:tab") == 0
+    assert [row["type"] for row in history.page(owner)] == ["Mock Interview", "Quick Practice"]
+    assert history.count("guest:other") == 1
+    assert history.reassign("guest:tab", owner) == 0
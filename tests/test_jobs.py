@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from core.jobs import CANCELLED, DONE, FAILED, JobCancelled, JobEngine
+
+
+@pytest.fixture
+def engine():
+    engine = JobEngine(max_workers=2, timeout=5, heartbeat_timeout=60, reap_interval=60)
+    yield engine
+    engine.shutdown()
+
+
+def wait_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def test_job_result_and_stream(engine):
+    job = wait_finished(engine.submit("me", lambda job: job.stream(iter(["a", "b", "c"])), name="review"))
+    assert job.status == DONE and job.result == "abc" and job.text == "abc"
+    assert engine.stats()[DONE] == 1
+
+
+def test_job_failure_is_recorded(engine):
+    def fail(job):
+        raise RuntimeError("boom")
+
+    job = wait_finished(engine.submit("me", fail))
+    assert job.status == FAILED and isinstance(job.error, RuntimeError)
+    assert job.as_dict()["error"] == "RuntimeError: boom"
+
+
+def test_timeout_fails_and_cancels_the_job():
+    engine = JobEngine(max_workers=1, timeout=0.2, reap_interval=60)
+    try:
+        stopped = threading.Event()
+
+        def slow(job):
+            while not job.cancelled:
+                time.sleep(0.01)
+            stopped.set()
+
+        job = wait_finished(engine.submit("me", slow))
+        assert job.status == FAILED and isinstance(job.error, TimeoutError)
+        assert stopped.wait(2)
+    finally:
+        engine.shutdown()
+
+
+def test_cancel_stops_a_streaming_job(engine):
+    started, release = threading.Event(), threading.Event()
+
+    def chunks():
+        yield "first "
+        started.set()
+        release.wait(5)
+        yield "second"
+
+    job = engine.submit("me", lambda job: job.stream(chunks()))
+    assert started.wait(5)
+    assert engine.cancel(job.id)
+    release.set()
+    wait_finished(job)
+    assert job.status == CANCELLED and job.text == "first "
+    assert not engine.cancel(job.id)
+
+
+def test_cancel_owner_only_touches_named_jobs(engine):
+    release = threading.Event()
+
+    def wait(job):
+        release.wait(5)
+        job.check()
+        return "done"
+
+    review = engine.submit("me", wait, name="review")
+    advice = engine.submit("me", wait, name="advice")
+    other = engine.submit("you", wait, name="review")
+    assert engine.cancel_owner("me", "review") == 1
+    release.set()
+    assert wait_finished(review).status == CANCELLED
+    assert wait_finished(advice).status == DONE
+    assert wait_finished(other).status == DONE
+
+
+def test_check_raises_once_cancelled(engine):
+    job = engine.submit("me", lambda job: None)
+    wait_finished(job)
+    job._cancel.set()
+    with pytest.raises(JobCancelled):
+        job.check()
+
+
+def test_reap_cancels_unpolled_jobs_and_forgets_old_ones():
+    engine = JobEngine(max_workers=1, heartbeat_timeout=0.05, keep_finished=0.05, reap_interval=60)
+    try:
+        def idle(job):
+            while True:
+                job.check()
+                time.sleep(0.01)
+
+        job = engine.submit("me", idle)
+        time.sleep(0.1)
+        engine.reap()
+        wait_finished(job)
+        assert job.status == CANCELLED and engine.stats()["reaped"] == 1
+
+        time.sleep(0.1)
+        engine.reap()
+        assert engine.poll(job.id) is None
+    finally:
+        engine.shutdown()
+
+
+def test_poll_keeps_a_job_alive():
+    engine = JobEngine(max_workers=1, heartbeat_timeout=0.2, reap_interval=60)
+    try:
+        release = threading.Event()
+        job = engine.submit("me", lambda job: release.wait(5))
+        for _ in range(5):
+            time.sleep(0.1)
+            assert engine.poll(job.id) is job
+            engine.reap()
+        release.set()
+        assert wait_finished(job).status == DONE
+    finally:
+        engine.shutdown()
@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from core import knowledge_packs
+from core.knowledge_packs import DAY, PACK_VERSION, KnowledgePacks, pack_markdown, slug
+from core.scheduler import BACKGROUND, NORMAL
+
+COMPANY = {"culture": ["Writing culture"], "interview_process": ["Recruiter call", "Onsite"],
+           "common_questions": ["Why Stripe?"], "values": ["Users first"], "tips": ["Read the API docs"]}
+ROLE = {"salary_ranges": {"entry": "$120k", "mid": "$160k", "senior": "$210k"},
+        "negotiation": ["Anchor high"], "value_points": ["Scale"], "market_trends": ["AI infra"]}
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class Generator:
+    """Records (kind, name, priority) calls; raises while failing is set"""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = False
+        self._lock = threading.Lock()
+
+    def __call__(self, kind, name, priority):
+        with self._lock:
+            self.calls.append((kind, name, priority))
+        if self.failing:
+            raise RuntimeError("provider down")
+        return COMPANY if kind == "company" else ROLE
+
+
+@pytest.fixture
+def generator():
+    return Generator()
+
+
+@pytest.fixture
+def make_packs(tmp_path, generator):
+    def make(**kwargs):
+        return KnowledgePacks(generator, root=str(tmp_path), popular={"company": (), "role": ()},
+                              executor=InlineExecutor(), **kwargs)
+    return make
+
+
+def write_pack(root, kind, name, **fields):
+    pack = {"kind": kind, "name": name, "slug": slug(kind, name), "version": PACK_VERSION, "revision": 1,
+            "generated_at": 0, "data": COMPANY if kind == "company" else ROLE, **fields}
+    os.makedirs(os.path.join(root, kind), exist_ok=True)
+    with open(os.path.join(root, kind, f"{slug(kind, name)}.json"), "w", encoding="utf-8") as f:
+        json.dump(pack, f)
+    return pack
+
+
+@pytest.mark.parametrize("kind, name, expected", [
+    ("company", "Google LLC", "google"),
+    ("company", "Facebook", "meta"),
+    ("company", "J.P. Morgan", "j-p-morgan"),
+    ("company", "JPMorgan", "jpmorgan-chase"),
+    ("role", "  Sr   Software Engineer ", "senior-software-engineer"),
+    ("role", "SRE", "site-reliability-engineer"),
+])
+def test_slug(kind, name, expected):
+    assert slug(kind, name) == expected
+
+
+def test_missing_pack_is_generated_once_and_stored(make_packs, generator, tmp_path):
+    packs = make_packs()
+    pack, source = packs.lookup("company", "Stripe, Inc.")
+    assert source == "generated" and generator.calls == [("company", "Stripe, Inc.", NORMAL)]
+    assert pack["version"] == PACK_VERSION and pack["revision"] == 1
+    assert os.path.exists(tmp_path / "company" / "stripe.json")
+
+    assert packs.lookup("company", "stripe")[1] == "pack"
+    # Another process reads the stored pack instead of generating it again
+    assert make_packs().lookup("company", "Stripe")[1] == "pack"
+    assert len(generator.calls) == 1
+    assert packs.stats() == {"loaded": 1, "hits": 1, "stale_hits": 0, "generated": 1, "refreshing": 0}
+
+
+def test_stale_pack_is_served_and_refreshed_in_the_background(make_packs, generator, tmp_path):
+    write_pack(str(tmp_path), "role", "Backend Engineer", generated_at=0, revision=4)
+    packs = make_packs()
+    pack, source = packs.lookup("role", "backend engineer")
+    assert source == "stale" and pack["revision"] == 4
+    assert generator.calls == [("role", "Backend Engineer", BACKGROUND)]
+    refreshed, source = packs.lookup("role", "Backend Engineer")
+    assert source == "pack" and refreshed["revision"] == 5
+    with open(tmp_path / "role" / "backend-engineer.json", encoding="utf-8") as f:
+        assert json.load(f)["revision"] == 5
+
+
+def test_older_version_is_stale_even_when_recent(make_packs, tmp_path):
+    packs = make_packs()
+    write_pack(str(tmp_path), "company", "Stripe", version=PACK_VERSION - 1, generated_at=time.time())
+    assert packs.lookup("company", "Stripe")[1] == "stale"
+    assert packs.load("company", "Stripe")["version"] == PACK_VERSION
+
+
+def test_pack_without_a_version_is_stale(make_packs, tmp_path):
+    pack = write_pack(str(tmp_path), "company", "Stripe", generated_at=time.time())
+    del pack["version"]
+    assert make_packs().is_stale(pack)
+
+
+def test_newer_version_is_never_downgraded(make_packs, generator, tmp_path):
+    write_pack(str(tmp_path), "company", "Stripe", version=PACK_VERSION + 1, generated_at=0)
+    pack, source = make_packs().lookup("company", "Stripe")
+    assert source == "pack" and pack["version"] == PACK_VERSION + 1
+    assert generator.calls == []
+
+
+def test_stale_lookup_rereads_a_pack_refreshed_by_another_process(make_packs, generator, tmp_path):
+    write_pack(str(tmp_path), "company", "Stripe", generated_at=0)
+    packs = make_packs()
+    assert packs.is_stale(packs.load("company", "Stripe"))
+    write_pack(str(tmp_path), "company", "Stripe", generated_at=time.time(), revision=2)
+    pack, source = packs.lookup("company", "Stripe")
+    assert source == "pack" and pack["revision"] == 2 and generator.calls == []
+
+
+def test_failed_background_refresh_keeps_serving_the_stale_pack(make_packs, generator, tmp_path):
+    write_pack(str(tmp_path), "company", "Stripe", generated_at=0)
+    packs = make_packs()
+    generator.failing = True
+    assert packs.lookup("company", "Stripe")[1] == "stale"
+    assert packs.stats()["refreshing"] == 0
+    generator.failing = False
+    assert packs.lookup("company", "Stripe")[1] == "stale"
+    assert packs.lookup("company", "Stripe")[1] == "pack"
+
+
+def test_failed_on_demand_generation_raises(make_packs, generator):
+    generator.failing = True
+    with pytest.raises(RuntimeError):
+        make_packs().lookup("company", "Acme")
+
+
+def test_unreadable_pack_is_regenerated(make_packs, tmp_path):
+    packs = make_packs()
+    (tmp_path / "company" / "stripe.json").write_text("{not json", encoding="utf-8")
+    assert packs.lookup("company", "Stripe")[1] == "generated"
+
+
+def test_max_age_per_kind(make_packs, tmp_path):
+    write_pack(str(tmp_path), "company", "Stripe", generated_at=time.time() - 2 * DAY)
+    assert make_packs().lookup("company", "Stripe")[1] == "pack"
+    assert make_packs(max_age={"company": DAY, "role": DAY}).lookup("company", "Stripe")[1] == "stale"
+
+
+def test_warm_refreshes_missing_and_stale_targets(make_packs, generator, tmp_path):
+    write_pack(str(tmp_path), "company", "Stripe", generated_at=time.time())
+    write_pack(str(tmp_path), "company", "Datadog", generated_at=0)
+    packs = make_packs()
+    counts = packs.warm([("company", "Stripe"), ("company", "Datadog"), ("role", "Data Engineer")], workers=2)
+    assert counts == {"refreshed": 2, "fresh": 1, "failed": 0}
+    assert sorted(name for _, name, _ in generator.calls) == ["Data Engineer", "Datadog"]
+
+    generator.failing = True
+    lines = []
+    counts = packs.warm([("company", "Stripe")], force=True, progress=lines.append)
+    assert counts == {"refreshed": 0, "fresh": 0, "failed": 1}
+    assert lines == ["company Stripe: RuntimeError: provider down"]
+
+
+def test_warm_targets_add_the_most_requested_packs(tmp_path, generator):
+    packs = KnowledgePacks(generator, root=str(tmp_path), popular={"company": ("Google",), "role": ()},
+                           top_requested=1, executor=InlineExecutor())
+    packs.lookup("company", "Datadog")
+    packs.lookup("company", "Datadog")
+    packs.lookup("role", "Data Engineer")
+    assert packs.warm_targets() == [("company", "Google"), ("company", "Datadog")]
+
+
+def test_status_and_markdown(make_packs):
+    packs = make_packs()
+    packs.lookup("company", "Stripe")
+    packs.lookup("role", "Backend Engineer")
+    rows = packs.status()
+    assert [(row["kind"], row["name"], row["revision"], row["stale"]) for row in rows] == [
+        ("company", "Stripe", 1, False), ("role", "Backend Engineer", 1, False)]
+    assert "**🧭 Interview Process**\n- Recruiter call\n- Onsite" in pack_markdown(packs.load("company", "Stripe"))
+    assert "- Senior: $210k" in pack_markdown(packs.load("role", "Backend Engineer"))
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("KNOWLEDGE_PACK_DIR", str(tmp_path / "packs"))
+    monkeypatch.setenv("KNOWLEDGE_PACK_MAX_AGE_DAYS", "2")
+    packs = KnowledgePacks.from_env(generate=None)
+    assert packs.root == str(tmp_path / "packs")
+    assert packs.max_age == {kind: 2 * DAY for kind in knowledge_packs.PACK_KINDS}
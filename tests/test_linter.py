@@ -0,0 +1,101 @@
+from core.linter import highlight_html, lint, report_markdown, star_sections
+
+STRONG_ANSWER = (
+    "At my previous company the checkout service timed out during every sale and customers abandoned carts. "
+    "My goal was to get p99 latency under 300 ms before Black Friday, which was six weeks away. "
+    "I profiled the service and found that each request made 14 sequential database calls. "
+    "I designed a batched query layer, added a read-through cache in front of the catalogue "
+    "and wrote load tests that replayed real traffic. "
+    "I also set up alerts on queue depth so the on-call engineer saw regressions within minutes. "
+    "As a result p99 latency dropped from 2.4 seconds to 180 ms and checkout conversion rose by 12% during the sale."
+)
+
+
+def kinds(report):
+    return [issue.kind for issue in report.issues]
+
+
+def test_flags_filler_hedges_vague_and_negative_spans():
+    answer = "Um, I think we basically did a lot of stuff. Honestly the old team was useless."
+    report = lint(answer)
+    found = {(issue.kind, answer[issue.start:issue.end]) for issue in report.spans}
+    assert {("filler", "Um"), ("hedge", "I think"), ("filler", "basically"), ("vague", "a lot"),
+            ("filler", "Honestly"), ("negative", "useless")} <= found
+    assert report.stats["filler"] == 3 and report.stats["negative"] == 1
+
+
+def test_multiword_phrases_match_across_whitespace():
+    report = lint("I kind\nof   led it and you know, it went fine.")
+    assert sorted(report.answer[i.start:i.end] for i in report.spans if i.kind == "filler") == ["kind\nof", "you know"]
+
+
+def test_we_spans_only_when_we_outnumbers_i():
+    mostly_we = lint("We planned it, we built it and our team shipped it. I tested it.")
+    assert "we" in kinds(mostly_we)
+    assert any(i.kind == "we" and i.start is None and i.severity == "high" for i in mostly_we.issues)
+    assert mostly_we.stats["we_count"] == 3 and mostly_we.stats["i_count"] == 1
+
+    mostly_i = lint("I planned it, I built it and we shipped it.")
+    assert "we" not in kinds(mostly_i)
+    assert mostly_i.stats["i_ratio"] == 2 / 3
+
+
+def test_metrics_detection():
+    report = lint("I cut costs by $40k, latency by 30% and onboarding from 3 days to 4 hours; sign-ups doubled.")
+    assert report.stats["metrics"] == ["$40k", "30%", "3 days", "4 hours", "doubled"]
+    assert "metrics" not in kinds(report)
+    assert "metrics" in kinds(lint("I made the service faster and the team happier."))
+
+
+def test_length_rules():
+    short = lint("I fixed it.")
+    assert any(i.kind == "length" and "Only 3 words" in i.message for i in short.issues)
+    long = lint("I built it. " * 200)
+    assert any(i.kind == "length" and i.severity == "low" for i in long.issues)
+
+
+def test_star_sections_move_forward_through_the_answer():
+    labels = [part for _, _, part in star_sections(STRONG_ANSWER)]
+    assert labels[0] == "situation" and labels[1] == "task" and labels[-1] == "result"
+    assert labels == sorted(labels, key=["situation", "task", "action", "result"].index)
+
+
+def test_balanced_answer_has_no_high_severity_findings():
+    report = lint(STRONG_ANSWER)
+    assert [i.message for i in report.issues if i.severity == "high"] == []
+    assert abs(sum(report.star_shares.values()) - 1) < 1e-9
+    severities = [issue.severity for issue in report.summary_issues]
+    assert severities == sorted(severities, key=["high", "medium", "low"].index)
+
+
+def test_missing_star_sections_are_reported():
+    report = lint("I built a dashboard and I wrote the docs.")
+    missing = [i.message for i in report.issues if i.kind == "star" and i.message.startswith("No clear")]
+    assert "No clear Task section (guide: 20%)" in missing
+
+
+def test_empty_answer():
+    report = lint(None)
+    assert report.stats["words"] == 0 and report.stats["i_ratio"] is None and report.stats["filler_rate"] == 0.0
+    assert report.star_shares == {"situation": 0.0, "task": 0.0, "action": 0.0, "result": 0.0}
+
+
+def test_highlight_html_escapes_and_marks_spans():
+    report = lint("Um, <b>I think</b> it was\nfine.")
+    rendered = highlight_html(report)
+    assert "&lt;b&gt;" in rendered and "<b>" not in rendered
+    assert rendered.count("<mark") == 2 and ">Um</mark>" in rendered and ">I think</mark>" in rendered
+    assert "<br>" in rendered
+
+
+def test_highlight_html_skips_overlapping_spans():
+    # "stuff" (vague) sits inside "and stuff" (filler); only the earlier, longer span is marked
+    rendered = highlight_html(lint("I shipped features and stuff."))
+    assert rendered.count("<mark") == 1 and ">and stuff</mark>" in rendered
+
+
+def test_report_markdown_lists_findings_and_balance():
+    text = report_markdown(lint("Um, I think we did a lot. We shipped it."))
+    assert '- Filler words (1): "um"' in text
+    assert "**No numbers" in text
+    assert text.splitlines()[-1].startswith("- STAR balance: Situation")
@@ -0,0 +1,129 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.question_pool import QuestionPool, question_text, shingles, similarity
+
+KEY = ("Mid Level (2-5 years)", "System Design", "Backend Engineer", "Stripe")
+TOPICS = ["a rate limiter", "a URL shortener", "a chat service", "a news feed", "a payment ledger",
+          "a metrics pipeline", "a job scheduler", "a search index"]
+
+
+class InlineExecutor:
+    """Runs submitted work immediately, so refills finish before submit returns"""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class Generator:
+    """Question source that serves TOPICS in order and records the avoid lists"""
+
+    def __init__(self, topics=TOPICS):
+        self.topics = list(topics)
+        self.calls = []
+
+    def __call__(self, key, avoid):
+        self.calls.append(list(avoid))
+        topic = self.topics[(len(self.calls) - 1) % len(self.topics)]
+        return f"**Question:** Design {topic} for {key[3]}.\n\n**What they're looking for:** trade-offs"
+
+
+@pytest.fixture
+def generator():
+    return Generator()
+
+
+@pytest.fixture
+def pool(generator):
+    return QuestionPool(generator, target_size=3, executor=InlineExecutor())
+
+
+def test_question_text_strips_the_rubric():
+    assert question_text("**Question:** Design X?\n\n**What they're looking for:** Y") == "Design X?"
+    assert question_text("  Plain question  ") == "Plain question"
+
+
+def test_similarity_of_shingles():
+    a = shingles("**Question:** Design a rate limiter for an API")
+    assert similarity(a, shingles("Design a rate limiter for an API")) == 1.0
+    assert similarity(a, shingles("Tell me about a conflict")) == 0.0
+    assert similarity(set(), a) == 0.0
+
+
+def test_prefetch_warms_a_new_key_once(pool, generator):
+    pool.prefetch(KEY)
+    assert pool.stats()["ready"] == 3 and len(generator.calls) == 3
+    pool.prefetch(KEY)
+    assert len(generator.calls) == 3
+
+
+def test_take_serves_from_the_pool_and_refills(pool, generator):
+    pool.prefetch(KEY)
+    first = pool.take(KEY)
+    assert "rate limiter" in first
+    stats = pool.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 0 and stats["ready"] == 3
+    # The refill steers away from what is ready and what was just served
+    assert question_text(first) in generator.calls[-1]
+
+
+def test_cold_key_misses_then_fills():
+    pool = QuestionPool(Generator(), target_size=2, executor=InlineExecutor())
+    assert pool.take(KEY) is None
+    assert pool.stats()["misses"] == 1 and pool.stats()["ready"] == 2
+    assert pool.take(KEY) is not None
+
+
+def test_served_and_near_duplicate_questions_are_dropped():
+    generator = Generator(["a rate limiter", "a rate limiter", "a URL shortener"])
+    pool = QuestionPool(generator, target_size=2, executor=InlineExecutor())
+    pool.mark_served(KEY, "**Question:** Design a URL shortener for Stripe.")
+    pool.refill(KEY)
+    stats = pool.stats()
+    assert stats["duplicates_dropped"] == 3
+    assert stats["ready"] == 1  # attempts are capped at 2 * target_size, so the refill gives up
+
+
+def test_refill_stops_when_generation_fails():
+    calls = []
+
+    def failing(key, avoid):
+        calls.append(key)
+        raise RuntimeError("rate limited")
+
+    pool = QuestionPool(failing, target_size=3, executor=InlineExecutor())
+    pool.prefetch(KEY)
+    assert len(calls) == 1 and pool.stats()["ready"] == 0
+    pool.refill(KEY)  # not stuck in the refilling state
+    assert len(calls) == 2
+
+
+def test_only_one_refill_per_key_at_a_time():
+    release = threading.Event()
+    started = []
+
+    def slow(key, avoid):
+        started.append(key)
+        release.wait(5)
+        return f"**Question:** Design item {len(started)} of the backlog."
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pool = QuestionPool(slow, target_size=2, executor=executor)
+        for _ in range(5):
+            pool.refill(KEY)
+        release.set()
+    assert len(started) == 2 and pool.stats()["ready"] == 2
+
+
+def test_coldest_key_is_evicted_and_refills_do_not_warm_keys(generator):
+    a, b, c = (KEY[:3] + (company,) for company in ("Stripe", "Shopify", "Square"))
+    pool = QuestionPool(generator, target_size=1, max_keys=2, executor=InlineExecutor())
+    pool.prefetch(a)
+    pool.prefetch(b)
+    assert pool.stats() == {"keys": 2, "ready": 2, "hits": 0, "misses": 0, "duplicates_dropped": 0}
+    pool.add(a, "**Question:** A background refill question.")
+    pool.prefetch(c)  # a is still the coldest: add() doesn't count as a use
+    assert pool.stats()["keys"] == 2
+    assert pool.take(a) is None  # a was evicted, so this is a miss on a fresh slot
@@ -0,0 +1,140 @@
+import pytest
+
+from core.resume import (ParsedDocument, ResumeAnalyzer, ResumeParseError, analyze, bm25_scores,
+                         detect_sections, gap_summary, read_text, skills, tfidf_similarity, tokenize)
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 123 4567
+
+Summary
+Backend engineer who likes reliable systems.
+
+Experience
+- Built Python microservices on AWS serving 2M requests a day
+- Cut Kubernetes costs by 30% with autoscaling
+- Led a team of 4 engineers through a PostgreSQL migration
+
+Education
+BSc Computer Science
+
+Skills
+Python, Docker, Kubernetes, PostgreSQL, AWS
+"""
+
+JD = """Senior Backend Engineer
+We need Python and Kafka experience. You will own Kafka pipelines and Python services,
+run them on Kubernetes, and mentor engineers. Terraform is a plus.
+"""
+
+
+def test_tokenize_drops_stopwords_and_numbers_and_keeps_tech_terms():
+    assert tokenize("The C++ and node.js services, 2024") == ["c++", "node.js", "services"]
+
+
+def test_skills_match_the_vocabulary_case_insensitively():
+    found = skills("Machine Learning with PyTorch; shipped via CI/CD. pytorch again")
+    assert found == {"machine learning": 1, "pytorch": 2, "ci/cd": 1}
+
+
+def test_detect_sections_splits_on_headings():
+    sections = detect_sections(RESUME)
+    assert list(sections) == ["header", "summary", "experience", "education", "skills"]
+    assert sections["education"] == "BSc Computer Science"
+    assert "jane@example.com" in sections["header"]
+
+
+def test_read_text_keeps_plain_text_intact():
+    original = "\n".join(f"line {i}: " + "word " * 20 for i in range(400))
+    text, pages = read_text(original.encode(), "resume.txt")
+    assert text == original
+    assert pages == 18  # 8800 words at ~500 a page
+
+
+def test_read_text_caps_characters():
+    text, _ = read_text("x" * 20_000, "resume.md", max_chars=7_000)
+    assert text == "x" * 7_000
+
+
+def test_unsupported_file_type():
+    with pytest.raises(ResumeParseError, match="Unsupported"):
+        read_text(b"...", "resume.odt")
+
+
+def test_tfidf_similarity():
+    idf = {"python": 1.0, "kafka": 2.0, "java": 1.0}
+    assert tfidf_similarity({"python": 2}, {"python": 5}, idf) == pytest.approx(1.0)
+    assert tfidf_similarity({"python": 1}, {"java": 1}, idf) == 0.0
+    assert tfidf_similarity({}, {"python": 1}, idf) == 0.0
+    partial = tfidf_similarity({"python": 1, "kafka": 1}, {"kafka": 1}, idf)
+    assert 0 < partial < 1
+
+
+def test_bm25_ranks_the_section_with_the_query_terms_first():
+    documents = {
+        "experience": ["python", "kafka", "pipelines", "python"],
+        "education": ["computer", "science"],
+        "skills": ["python", "docker", "kubernetes", "terraform", "aws", "linux"],
+    }
+    scores = bm25_scores(["python", "kafka"], documents)
+    assert scores["experience"] > scores["skills"] > scores["education"] == 0
+    assert bm25_scores(["python"], {}) == {}
+
+
+def test_bm25_penalises_long_documents():
+    short = ["python", "api"]
+    long = ["python"] + ["filler"] * 40
+    scores = bm25_scores(["python"], {"short": short, "long": long})
+    assert scores["short"] > scores["long"]
+
+
+def test_analyze_without_a_job_description():
+    result = analyze(ParsedDocument(RESUME))
+    assert result["missing_sections"] == []
+    assert result["contact"] == 2 and result["bullets"] == 3 and result["metrics"] >= 1
+    assert {"python", "kubernetes", "postgresql", "aws", "docker"} <= set(result["skills"])
+    assert "keyword_coverage" not in result
+    assert result["ats_score"] == round(0.6 * result["structure_score"] + 0.4 * result["formatting_score"])
+
+
+def test_analyze_against_a_job_description():
+    result = analyze(ParsedDocument(RESUME), ParsedDocument(JD))
+    assert {"python", "kubernetes"} <= set(result["matched_keywords"])
+    assert {"kafka", "terraform"} <= set(result["missing_keywords"])
+    assert 0 < result["keyword_coverage"] < 100
+    assert 0 < result["tfidf_similarity"] < 1
+    assert max(result["section_relevance"].values()) == 100
+    assert result["section_relevance"]["experience"] > result["section_relevance"]["education"]
+
+
+def test_better_matching_resume_scores_higher():
+    jd = ParsedDocument(JD)
+    weaker = analyze(ParsedDocument(RESUME), jd)
+    stronger = analyze(ParsedDocument(RESUME + "\n- Ran Kafka pipelines provisioned with Terraform\n"), jd)
+    assert stronger["keyword_coverage"] > weaker["keyword_coverage"]
+    assert stronger["ats_score"] > weaker["ats_score"]
+
+
+def test_missing_sections_lower_the_structure_score():
+    result = analyze(ParsedDocument("Jane Doe\n\nExperience\n- Built things"))
+    assert result["missing_sections"] == ["education", "skills"]
+    assert result["structure_score"] == 33
+
+
+def test_gap_summary_is_compact():
+    result = analyze(ParsedDocument(RESUME), ParsedDocument(JD))
+    summary = gap_summary(result, max_keywords=3)
+    assert summary.startswith(f"ATS score: {result['ats_score']}/100")
+    assert "Missing JD keywords: " in summary
+    assert len(summary.splitlines()[-1].split(", ")) <= 4
+
+
+def test_analyzer_caches_by_content():
+    analyzer = ResumeAnalyzer(max_entries=2)
+    key, result = analyzer.analyze(RESUME.encode(), "resume.txt", JD)
+    again_key, again = analyzer.analyze(RESUME.encode(), "resume.txt", JD)
+    assert again_key == key and again is result
+    no_jd_key, no_jd = analyzer.analyze(RESUME.encode(), "resume.txt", "  ")
+    assert no_jd_key != key and "keyword_coverage" not in no_jd
+
+    analyzer.analyze(b"Another resume", "other.txt")
+    assert analyzer.analyze(RESUME.encode(), "resume.txt", JD)[1] is not result
@@ -0,0 +1,254 @@
+import threading
+import time
+
+import pytest
+
+from core import scheduler
+from core.scheduler import (BACKGROUND, INTERACTIVE, RequestScheduler, TokenBucket, is_retryable,
+                            retry_after_seconds)
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock)
+    monkeypatch.setattr(scheduler.time, "sleep", clock.sleep)
+    return clock
+
+
+class Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = Response(headers or {})
+
+
+def test_bucket_waits_for_the_deficit(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=2)
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(4) == pytest.approx(2.0)
+    clock.now += 2.0
+    assert bucket.reserve(0) == 0.0
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    bucket.reserve(10)
+    clock.now += 100
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_refund_is_capped(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    bucket.reserve(6)
+    bucket.refund(100)
+    assert bucket.tokens == 10
+
+
+def test_oversized_reservation_is_clamped_to_capacity(clock):
+    bucket = TokenBucket(capacity=10, refill_per_second=1)
+    assert bucket.reserve(50) == 0.0
+    assert bucket.tokens == 0
+
+
+def test_take_leaves_the_headroom(clock):
+    bucket = TokenBucket(capacity=100, refill_per_second=10)
+    assert bucket.take(70, headroom=0.25) == 0.0
+    assert bucket.take(10, headroom=0.25) == pytest.approx(0.5)
+    assert bucket.tokens == 30
+    clock.now += 0.5
+    assert bucket.take(10, headroom=0.25) == 0.0
+
+
+def test_take_yields_to_reservations(clock):
+    bucket = TokenBucket(capacity=100, refill_per_second=10)
+    bucket.reserve(120)
+    assert bucket.take(10) == pytest.approx(1.0)
+    assert bucket.tokens == 0
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "-2"}, 0.0),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    assert retry_after_seconds(APIError(429, headers)) == expected
+
+
+def test_retry_after_http_date_in_the_past():
+    assert retry_after_seconds(APIError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+
+
+def test_retryable_statuses():
+    assert is_retryable(APIError(429))
+    assert is_retryable(APIError(503))
+    assert not is_retryable(APIError(400))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ValueError())
+
+
+def test_backoff_honours_retry_after():
+    sched = RequestScheduler(base_delay=0.01, max_delay=1.0)
+    assert sched.backoff_delay(0, APIError(429, {"retry-after": "2"})) == 2.0
+    assert sched.backoff_delay(5) <= 1.0
+
+
+def make_scheduler(**options):
+    return RequestScheduler(rate_limits={"m": {"rpm": 600, "tpm": 1000}}, base_delay=0.01, **options)
+
+
+def test_run_retries_transient_failures(clock):
+    sched, calls, retried = make_scheduler(), [], []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise APIError(429, {"retry-after": "soon"})
+        return "ok"
+
+    assert sched.run(flaky, "m", estimated_tokens=100, on_retry=retried.append) == "ok"
+    assert len(calls) == 3 and len(retried) == 2 and sched.retries == 2
+    assert sched.gate.active == 0
+
+
+def test_run_does_not_retry_client_errors(clock):
+    sched, calls = make_scheduler(), []
+
+    def bad_request():
+        calls.append(1)
+        raise APIError(400)
+
+    with pytest.raises(APIError):
+        sched.run(bad_request, "m")
+    assert len(calls) == 1 and sched.retries == 0
+
+
+def test_run_gives_up_after_max_retries(clock):
+    sched, calls = make_scheduler(max_retries=2), []
+
+    def down():
+        calls.append(1)
+        raise APIError(503)
+
+    with pytest.raises(APIError):
+        sched.run(down, "m")
+    assert len(calls) == 3
+
+
+def test_failed_attempts_refund_their_tokens(clock):
+    sched = make_scheduler(max_retries=0)
+
+    def down():
+        raise APIError(503)
+
+    with pytest.raises(APIError):
+        sched.run(down, "m", estimated_tokens=400)
+    assert sched.buckets("m")[1].tokens == 1000
+
+
+def test_unused_tokens_are_refunded(clock):
+    class Result:
+        prompt_tokens, completion_tokens = 50, 50
+
+    sched = make_scheduler()
+    sched.run(Result, "m", estimated_tokens=400)
+    assert sched.buckets("m")[1].tokens == 900
+
+
+def test_throttled_request_does_not_hold_a_slot(clock, monkeypatch):
+    sched = make_scheduler(max_concurrency=1)
+    sched.buckets("m")[1].reserve(1000)
+    active_while_waiting = []
+
+    def sleep(seconds):
+        active_while_waiting.append(sched.gate.active)
+        clock.sleep(seconds)
+
+    monkeypatch.setattr(scheduler.time, "sleep", sleep)
+
+    assert sched.run(lambda: "ok", "m", estimated_tokens=100, priority=BACKGROUND) == "ok"
+    assert sched.throttled_seconds > 0
+    assert active_while_waiting == [0]
+
+
+def test_stream_retries_before_the_first_chunk(clock):
+    sched, opened = make_scheduler(), []
+
+    def open_stream():
+        opened.append(1)
+        if len(opened) == 1:
+            raise APIError(502)
+        yield from ("a", "b")
+
+    assert list(sched.stream(open_stream, "m", estimated_tokens=100)) == ["a", "b"]
+    assert len(opened) == 2 and sched.gate.active == 0
+
+
+def test_stream_raises_after_text_was_delivered(clock):
+    sched = make_scheduler()
+
+    def open_stream():
+        yield "partial"
+        raise APIError(502)
+
+    chunks = []
+    with pytest.raises(APIError):
+        for chunk in sched.stream(open_stream, "m"):
+            chunks.append(chunk)
+    assert chunks == ["partial"] and sched.retries == 0
+
+
+def test_background_cannot_spend_the_interactive_headroom(clock):
+    sched = make_scheduler()
+    sched.run(lambda: "warm", "m", estimated_tokens=750, priority=BACKGROUND)
+    assert sched.throttled_seconds == 0
+    sched.run(lambda: "turn", "m", estimated_tokens=250, priority=INTERACTIVE)
+    assert sched.throttled_seconds == 0
+    sched.run(lambda: "prefetch", "m", estimated_tokens=100, priority=BACKGROUND)
+    assert sched.throttled_seconds == pytest.approx(21.0)
+
+
+def test_interactive_goes_first_when_background_drained_the_bucket():
+    sched = RequestScheduler(rate_limits={"m": {"rpm": 60000, "tpm": 6000}})
+    order = []
+    sched.run(lambda: order.append("warm"), "m", estimated_tokens=4500, priority=BACKGROUND)
+
+    def call(name, priority):
+        sched.run(lambda: order.append(name), "m", estimated_tokens=50, priority=priority)
+
+    prefetch = threading.Thread(target=call, args=("prefetch", BACKGROUND))
+    prefetch.start()
+    time.sleep(0.05)
+    call("turn", INTERACTIVE)
+    prefetch.join(5)
+    assert order == ["warm", "turn", "prefetch"]
+
+
+def test_shared_bucket_take_leaves_the_headroom():
+    from core.scheduler import SharedTokenBucket
+    from core.state import MemoryState
+
+    bucket = SharedTokenBucket(MemoryState(), "tpm", capacity=100, refill_per_second=0.0001)
+    assert bucket.take(70, headroom=0.25) == 0.0
+    assert bucket.take(10, headroom=0.25) > 0
+    assert bucket.reserve(30) == 0.0
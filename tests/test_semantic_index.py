@@ -0,0 +1,115 @@
+import importlib.util
+
+import numpy as np
+import pytest
+
+from core.semantic_index import HashingEmbedder, SemanticIndex, VectorIndex, create_embedder, record_items
+
+RECORDS = [
+    {"id": 1, "type": "Quick Practice", "timestamp": "2026-01-01 10:00:00",
+     "question": "**Question:** Tell me about a time you disagreed with your manager.\n\n"
+                 "**What they're looking for:** conflict handling",
+     "answer": "I disagreed with my manager about the release date and proposed a phased rollout."},
+    {"id": 2, "type": "Quick Practice", "timestamp": "2026-01-02 10:00:00",
+     "question": "**Question:** Design a rate limiter for a public API.",
+     "answer": "I would use a token bucket per API key stored in Redis."},
+    {"id": 3, "type": "Mock Interview", "timestamp": "2026-01-03 10:00:00",
+     "transcript": "Interviewer: How do you scale a database? Candidate: read replicas and sharding."},
+]
+
+
+@pytest.fixture
+def index():
+    index = SemanticIndex(HashingEmbedder())
+    index.bootstrap("me", RECORDS)
+    return index
+
+
+def test_hashing_embedder_is_normalised_and_deterministic():
+    embedder = HashingEmbedder(dim=64)
+    vectors = embedder.embed(["Design a rate limiter", "design a RATE limiter!", ""])
+    assert vectors.shape == (3, 64) and vectors.dtype == np.float32
+    assert np.linalg.norm(vectors[0]) == pytest.approx(1.0)
+    assert np.allclose(vectors[0], vectors[1])
+    assert not vectors[2].any()
+    assert np.allclose(HashingEmbedder(dim=64).embed(["Design a rate limiter"])[0], vectors[0])
+
+
+def test_hashing_embedder_ranks_related_text_higher():
+    a, b, c = HashingEmbedder().embed(["design a rate limiter for an api",
+                                       "how would you design an api rate limiter",
+                                       "tell me about a conflict with your manager"])
+    assert a @ b > a @ c
+
+
+@pytest.mark.skipif(importlib.util.find_spec("sentence_transformers") is not None,
+                    reason="the fallback only applies without sentence-transformers")
+def test_create_embedder_falls_back_to_hashing(monkeypatch):
+    monkeypatch.delenv("EMBEDDING_MODEL", raising=False)
+    assert create_embedder().name == "hashing"
+    with pytest.warns(UserWarning, match="sentence-transformers"):
+        assert isinstance(create_embedder("all-MiniLM-L6-v2"), HashingEmbedder)
+
+
+def test_vector_index_grows_and_returns_top_k_best_first():
+    embedder = HashingEmbedder(dim=32)
+    index = VectorIndex(32, capacity=2)
+    texts = ["alpha beta", "gamma delta", "alpha gamma", "epsilon zeta", "alpha beta gamma"]
+    index.add(embedder.embed(texts), [{"text": t} for t in texts])
+    assert len(index) == 5
+    hits = index.search(embedder.embed(["alpha beta"])[0], k=3)
+    assert [item["text"] for _, item in hits][0] == "alpha beta"
+    assert [score for score, _ in hits] == sorted((score for score, _ in hits), reverse=True)
+    assert len(index.search(embedder.embed(["alpha"])[0], k=50)) == 5
+    assert VectorIndex(32).search(embedder.embed(["alpha"])[0]) == []
+
+
+def test_record_items_use_the_question_text_and_fall_back_to_the_transcript():
+    items = record_items(RECORDS[0]) + record_items(RECORDS[2])
+    assert [(item["record_id"], item["kind"]) for item in items] == [(1, "question"), (1, "answer"), (3, "answer")]
+    assert items[0]["text"] == "Tell me about a time you disagreed with your manager."
+    assert record_items({"id": 4, "answer": "x" * 5000}, max_chars=100)[0]["text"] == "x" * 100
+
+
+def test_search_returns_one_hit_per_record(index):
+    hits = index.search("me", "rate limiter token bucket for an API", k=5)
+    assert hits[0][1]["record_id"] == 2
+    assert len({item["record_id"] for _, item in hits}) == len(hits) == 3
+
+
+def test_similar_questions_only_match_questions(index):
+    hits = index.similar_questions("me", "How do you scale a database?", k=3)
+    assert all(item["kind"] == "question" for _, item in hits)
+    assert 3 not in {item["record_id"] for _, item in hits}
+
+
+def test_is_duplicate(index):
+    assert index.is_duplicate("me", "**Question:** Design a rate limiter for a public API!")
+    assert not index.is_duplicate("me", "Explain the bias-variance trade-off.")
+    assert not index.is_duplicate("someone-else", "Design a rate limiter for a public API.")
+
+
+def test_add_record_only_indexes_loaded_users(index):
+    record = {"id": 9, "question": "What is eventual consistency?", "answer": "Replicas converge over time."}
+    index.add_record("me", record)
+    assert index.similar_questions("me", "What is eventual consistency?", k=1)[0][1]["record_id"] == 9
+    index.add_record("not-loaded", record)
+    assert not index.is_loaded("not-loaded")
+
+
+def test_users_are_isolated_and_the_coldest_is_dropped():
+    index = SemanticIndex(HashingEmbedder(), max_users=2)
+    index.bootstrap("a", RECORDS[:1])
+    index.bootstrap("b", RECORDS[1:2])
+    index.search("a", "manager")  # touch a, so b is the coldest
+    index.bootstrap("c", [])
+    assert index.is_loaded("a") and index.is_loaded("c") and not index.is_loaded("b")
+    assert index.search("c", "manager") == []
+    assert index.stats() == {"embedder": "hashing", "users": 2, "items": 2}
+
+
+def test_forget_drops_the_user(index):
+    index.forget("me")
+    assert not index.is_loaded("me")
+    assert index.search("me", "rate limiter") == []
+    index.forget("never-loaded")
@@ -0,0 +1,64 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.speculation import SpeculativeTurn, answer_similarity
+
+ANSWER = ("I led the migration of our billing service to a new queue, planned the cutover with the payments "
+          "team and cut failed charges by thirty percent in the first quarter.")
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(2)
+    yield executor
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def finished(spec):
+    deadline = time.monotonic() + 5
+    while not spec.future.done():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_similarity():
+    assert answer_similarity(ANSWER, ANSWER) == 1.0
+    assert answer_similarity("", ANSWER) == 0.0
+    assert answer_similarity(ANSWER, "Something else entirely.") < 0.2
+
+
+def test_finished_draft_is_reused(executor):
+    spec = SpeculativeTurn(executor=executor)
+    assert spec.maybe_start(ANSWER, 2, lambda partial: {"text": "Why that queue?"})
+    finished(spec)
+    assert spec.take(ANSWER + " Thanks.", 2) == {"text": "Why that queue?"}
+    assert spec.stats["reused"] == 1
+
+
+def test_draft_in_flight_is_not_awaited(executor):
+    spec, release = SpeculativeTurn(executor=executor), threading.Event()
+    spec.maybe_start(ANSWER, 2, lambda partial: release.wait(5) and "late draft")
+    started = time.monotonic()
+    assert spec.take(ANSWER, 2) is None
+    assert time.monotonic() - started < 1 and spec.stats["late"] == 1
+    release.set()
+
+
+def test_draft_for_another_turn_is_ignored(executor):
+    spec = SpeculativeTurn(executor=executor)
+    spec.maybe_start(ANSWER, 2, lambda partial: "draft")
+    finished(spec)
+    assert spec.take(ANSWER, 4) is None and spec.stats["missed"] == 1
+
+
+def test_changed_answer_needs_validation(executor):
+    spec = SpeculativeTurn(executor=executor, reuse_above=0.99, validate_above=0.5)
+    edited = ANSWER.replace("thirty", "forty")
+    for approve, expected in ((True, "draft"), (False, None)):
+        spec.maybe_start(ANSWER, 2, lambda partial: "draft")
+        finished(spec)
+        assert spec.take(edited, 2, validate=lambda answer, draft: approve) == expected
+    assert (spec.stats["validated"], spec.stats["rejected"]) == (1, 1)
@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+
+from core.star_coach import StarCoach, component_key, local_checks, ready, word_shares
+
+PARTS = {
+    "situation": "Our checkout service timed out during every seasonal sale.",
+    "task": "I had to get p99 latency under 300 ms before Black Friday.",
+    "action": "I profiled the service, batched the database calls and added a read-through cache.",
+    "result": "p99 latency dropped from 2.4 s to 180 ms and conversion rose by 12%.",
+}
+
+
+class FakeLLM:
+    """Records complete_json calls; components listed in fail raise instead"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def complete_json(self, messages, site, schema=None, **kwargs):
+        component = site.split(".")[1]
+        with self._lock:
+            self.calls.append(component)
+        if component in self.fail:
+            raise RuntimeError(f"{component} failed")
+        assert schema is not None and component.upper() in messages[-1]["content"]
+        return {"score": 7, "feedback": f"{component} ok"}
+
+
+def test_component_key_ignores_whitespace_but_not_the_question():
+    key = component_key("action", "I  built\nit", "Q1")
+    assert key == component_key("action", " I built it ", "Q1")
+    assert key != component_key("action", "I built it", "Q2")
+    assert key != component_key("result", "I built it", "Q1")
+
+
+def test_ready_needs_enough_text():
+    assert ready({"situation": "Too short", "task": PARTS["task"], "result": None}) == ["task"]
+
+
+def test_word_shares():
+    shares = word_shares({"situation": "one two", "action": "one two three four five six", "task": "   "})
+    assert shares["situation"] == (2, 0.25) and shares["action"] == (6, 0.75)
+    assert shares["task"] == (0, 0.0) and shares["result"] == (0, 0.0)
+    assert word_shares({})["result"] == (0, 0.0)
+
+
+def test_local_checks_flag_balance_metrics_we_and_filler():
+    parts = {
+        "situation": " ".join(["context"] * 40),
+        "task": "I basically had to fix it.",
+        "action": "We built it and we shipped it, I reviewed it.",
+        "result": "The team was happy.",
+    }
+    hints = local_checks(parts)
+    assert any(h.startswith("Too long") for h in hints["situation"])
+    assert any(h.startswith("Too short") for h in hints["action"])
+    assert "No numbers - quantify the outcome" in hints["result"]
+    assert '"We" outnumbers "I" (2 vs 1)' in hints["action"]
+    assert "1 filler/hedge word(s)" in hints["task"]
+
+
+def test_local_checks_skip_balance_for_short_answers():
+    hints = local_checks({"situation": "A short setup.", "result": "Saved 30% of costs."})
+    assert hints == {"situation": [], "task": [], "action": [], "result": []}
+
+
+def test_evaluate_scores_each_part_once():
+    llm = FakeLLM()
+    coach = StarCoach(llm)
+    scored, rescored, errors = coach.evaluate(PARTS, "Tell me about an outage")
+    assert sorted(llm.calls) == sorted(PARTS) and sorted(rescored) == sorted(PARTS) and errors == {}
+    assert scored["action"] == {"score": 7, "feedback": "action ok"}
+
+    again, rescored, _ = coach.evaluate({**PARTS, "action": PARTS["action"].replace(" ", "  ")},
+                                        "Tell me about an outage")
+    assert again == scored and rescored == [] and len(llm.calls) == 4
+    assert coach.stats() == {"entries": 4, "hits": 4, "misses": 4}
+
+
+def test_editing_one_part_rescores_only_that_part():
+    llm = FakeLLM()
+    coach = StarCoach(llm)
+    coach.evaluate(PARTS)
+    edited = {**PARTS, "result": "p99 latency dropped to 180 ms, conversion rose 12% and on-call pages halved."}
+    assert coach.pending(edited) == ["result"]
+    scored, rescored, _ = coach.evaluate(edited)
+    assert rescored == ["result"] and llm.calls[4:] == ["result"] and len(scored) == 4
+
+
+def test_parts_too_short_to_score_are_left_out():
+    llm = FakeLLM()
+    scored, rescored, _ = StarCoach(llm).evaluate({**PARTS, "task": "Fix it."})
+    assert "task" not in llm.calls and "task" not in scored and "task" not in rescored
+
+
+def test_failed_parts_are_reported_and_retried():
+    llm = FakeLLM(fail={"result"})
+    coach = StarCoach(llm)
+    scored, rescored, errors = coach.evaluate(PARTS)
+    assert "result" not in scored and "result" not in rescored
+    assert isinstance(errors["result"], RuntimeError)
+    assert coach.pending(PARTS) == ["result"]
+
+    llm.fail.clear()
+    scored, rescored, errors = coach.evaluate(PARTS)
+    assert rescored == ["result"] and errors == {} and len(scored) == 4
+
+
+def test_cache_is_bounded():
+    coach = StarCoach(FakeLLM(), max_entries=2)
+    coach.evaluate(PARTS)
+    assert coach.stats()["entries"] == 2
+    assert len(coach.pending(PARTS)) == 2
+
+
+@pytest.mark.parametrize("question", ["", "Tell me about an outage"])
+def test_cached_lookup_matches_the_question(question):
+    coach = StarCoach(FakeLLM())
+    coach.evaluate(PARTS, question)
+    assert coach.cached("action", PARTS["action"], question) is not None
+    assert coach.cached("action", PARTS["action"], question + "?") is None
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from core import state as state_module
+from core.state import MemoryState, SessionStore, SQLiteState, create_state
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(state_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryState()
+    return SQLiteState(str(tmp_path / "state.sqlite3"))
+
+
+def test_get_set_delete(backend):
+    assert backend.get("a") is None
+    backend.set("a", {"x": [1, 2]})
+    assert backend.get("a") == {"x": [1, 2]}
+    backend.delete("a")
+    assert backend.get("a") is None
+
+
+def test_values_expire(backend, clock):
+    backend.set("a", 1, ttl=10)
+    backend.set("b", 2)
+    clock.now += 11
+    assert backend.get("a") is None
+    assert backend.get("b") == 2
+
+
+def test_incr(backend):
+    assert backend.incr("n") == 1
+    assert backend.incr("n", 4) == 5
+    assert backend.get("n") == 5
+
+
+def test_keys_by_prefix(backend, clock):
+    backend.set("session:a", 1)
+    backend.set("session:b", 2, ttl=5)
+    backend.set("response:c", 3)
+    assert sorted(backend.keys("session:")) == ["session:a", "session:b"]
+    clock.now += 6
+    assert backend.keys("session:") == ["session:a"]
+
+
+def test_keys_prefix_is_literal(backend):
+    backend.set("a_b", 1)
+    backend.set("axb", 2)
+    assert backend.keys("a_") == ["a_b"]
+
+
+def test_bucket_refills_over_time(backend, clock):
+    assert backend.bucket("rpm", 10, 1.0, -10) == 0
+    assert backend.bucket("rpm", 10, 1.0, -2) == -2
+    clock.now += 5
+    assert backend.bucket("rpm", 10, 1.0, 0) == pytest.approx(3)
+    clock.now += 100
+    assert backend.bucket("rpm", 10, 1.0, 0) == 10
+
+
+def test_bucket_updates_are_atomic(backend):
+    def drain():
+        for _ in range(50):
+            backend.bucket("tpm", 1000, 0.0001, -1)
+
+    threads = [threading.Thread(target=drain) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert backend.bucket("tpm", 1000, 0.0001, 0) == pytest.approx(800, abs=1)
+
+
+def test_sqlite_state_is_shared_by_connections(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    first, second = SQLiteState(path), SQLiteState(path)
+    first.set("a", "value")
+    first.bucket("rpm", 10, 0.0001, -4)
+    assert second.get("a") == "value"
+    assert second.bucket("rpm", 10, 0.0001, -1) == pytest.approx(5, abs=0.01)
+
+
+def test_session_store_round_trip_and_digest(backend):
+    store = SessionStore(backend)
+    session = {"total_questions": 3, "mock_messages": [{"role": "interviewer", "content": "Hi"}],
+               "analytics": object(), "history": [{"id": 1, "title": "private"}], "history_user": "key:abc"}
+    digest = store.save("sid", session)
+    assert store.load("sid") == {"total_questions": 3, "mock_messages": session["mock_messages"]}
+
+    backend.delete("session:sid")
+    assert store.save("sid", session, digest) == digest
+    assert store.load("sid") is None
+    store.save("sid", {**session, "total_questions": 4}, digest)
+    assert store.load("sid")["total_questions"] == 4
+
+
+def test_create_state(monkeypatch, tmp_path):
+    monkeypatch.setenv("STATE_DB_PATH", str(tmp_path / "state.sqlite3"))
+    monkeypatch.delenv("STATE_BACKEND", raising=False)
+    assert create_state("") is None
+    assert isinstance(create_state("memory"), MemoryState)
+    assert isinstance(create_state("SQLite"), SQLiteState)
+    with pytest.raises(ValueError):
+        create_state("etcd")
@@ -0,0 +1,83 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from core.backends import OpenAICompatibleBackend, StubBackend
+from core.llm import LLMClient
+from core.stub_server import serve
+from core.structured import ANSWER_SCORE_SCHEMA
+
+
+class FailingBackend(StubBackend):
+    """Streams a couple of words, then fails after the 200 headers are sent"""
+
+    def stream(self, model, messages, temperature=0.7, max_tokens=500, **kwargs):
+        yield "partial"
+        raise RuntimeError("backend went away")
+
+
+@pytest.fixture
+def post(request):
+    backend = request.param
+    server = serve(port=0, backend=backend)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def post(payload):
+        connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+        connection.request("POST", "/v1/chat/completions", json.dumps(payload),
+                           {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, response.read().decode("utf-8")
+
+    post.base_url = "http://%s:%d/v1" % server.server_address
+    yield post
+    server.shutdown()
+    server.server_close()
+
+
+def events(body):
+    return [line[len("data: "):] for line in body.split("\n\n") if line.startswith("data: ")]
+
+
+FAST = StubBackend(first_token_ms=0, tokens_per_second=100000)
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 20}
+
+
+@pytest.mark.parametrize("post", [FAST], indirect=True)
+def test_stream_ends_with_done(post):
+    status, body = post({**REQUEST, "stream": True})
+    data = events(body)
+    assert status == 200 and data[-1] == "[DONE]"
+    assert json.loads(data[-2])["choices"][0]["finish_reason"] == "stop"
+
+
+@pytest.mark.parametrize("post", [FailingBackend(first_token_ms=0)], indirect=True)
+def test_stream_failure_after_headers_sends_an_error_event(post):
+    status, body = post({**REQUEST, "stream": True})
+    data = events(body)
+    assert status == 200 and "[DONE]" not in data
+    assert json.loads(data[1])["choices"][0]["delta"] == {"content": "partial"}
+    assert json.loads(data[-1])["error"]["message"] == "backend went away"
+
+
+@pytest.mark.parametrize("post", [StubBackend(first_token_ms=0, failure_rate=1.0)], indirect=True)
+def test_plain_failure_is_a_500(post):
+    status, body = post(REQUEST)
+    assert status == 500 and "injected failure" in json.loads(body)["error"]["message"]
+
+
+@pytest.mark.parametrize("post", [FAST], indirect=True)
+def test_json_schema_request_gets_json(post):
+    response_format = {"type": "json_schema", "json_schema": {"name": "score", "schema": ANSWER_SCORE_SCHEMA}}
+    status, body = post({**REQUEST, "max_tokens": 400, "response_format": response_format})
+    content = json.loads(json.loads(body)["choices"][0]["message"]["content"])
+    assert status == 200 and content["score"] == 72
+
+
+@pytest.mark.parametrize("post", [FAST], indirect=True)
+def test_complete_json_over_http(post):
+    llm = LLMClient(OpenAICompatibleBackend(base_url=post.base_url, default_model="m"))
+    data = llm.complete_json([{"role": "user", "content": "Score this answer"}], ANSWER_SCORE_SCHEMA, max_tokens=400)
+    assert data["score"] == 72 and data["strengths"]
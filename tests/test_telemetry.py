@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from core.telemetry import Tracer
+
+
+class Rerun(BaseException):
+    """Stands in for Streamlit's st.rerun()/st.stop() control-flow exceptions"""
+
+
+def test_span_records_success_and_errors():
+    tracer = Tracer()
+    with tracer.span("ok", site="site"):
+        pass
+    with pytest.raises(RuntimeError):
+        with tracer.span("fail", site="site"):
+            raise RuntimeError("boom")
+    assert [record["error"] for record in tracer.recent] == [None, "RuntimeError: boom"]
+    assert tracer.percentiles()[0]["count"] == 2
+
+
+def test_span_finishes_on_base_exception():
+    tracer = Tracer()
+    with pytest.raises(Rerun):
+        with tracer.span("rerun", kind="rerun", site="fragment.tab"):
+            raise Rerun()
+    assert len(tracer.recent) == 1 and tracer.recent[0]["error"] is None
+
+
+def test_prometheus_textfile_is_throttled(tmp_path):
+    path = tmp_path / "metrics.prom"
+    tracer = Tracer(prom_path=str(path), prom_interval=60)
+    tracer.write_prometheus()
+    assert path.exists()
+    with tracer.span("later", site="site"):
+        pass
+    tracer.write_prometheus()
+    assert 'site="site"' not in path.read_text()
+    tracer.write_prometheus(force=True)
+    assert 'site="site"' in path.read_text()
+
+
+def test_concurrent_prometheus_writers_never_raise(tmp_path):
+    tracer = Tracer(prom_path=str(tmp_path / "metrics.prom"), prom_interval=0)
+    errors = []
+
+    def write():
+        try:
+            for _ in range(50):
+                tracer.write_prometheus()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors and [p.name for p in tmp_path.iterdir()] == ["metrics.prom"]
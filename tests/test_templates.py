@@ -0,0 +1,49 @@
+from core.prompts import TEMPLATES
+from core.structured import COMPANY_PACK_SCHEMA, schema_min_tokens
+from core.templates import OutputBudget, TemplateRegistry
+
+
+def messages(text=""):
+    return [{"role": "user", "content": text}]
+
+
+def observe(budget, site, lengths):
+    for tokens in lengths:
+        budget.observe({"kind": "llm", "site": site, "completion_tokens": tokens})
+
+
+def test_budget_follows_observed_lengths():
+    registry = TemplateRegistry(OutputBudget(min_samples=5))
+    registry.register("site", messages, 800)
+    assert registry.max_tokens("site") == 800
+    observe(registry.budget, "site", [100] * 10)
+    assert registry.max_tokens("site") == 128
+
+
+def test_json_budget_never_drops_below_the_schema_minimum():
+    registry = TemplateRegistry(OutputBudget(min_samples=5))
+    registry.register("pack", messages, 700, schema=COMPANY_PACK_SCHEMA)
+    observe(registry.budget, "pack", [40] * 10)
+    assert registry.max_tokens("pack") >= schema_min_tokens(COMPANY_PACK_SCHEMA)
+    assert registry.max_tokens("pack") <= 700
+
+
+def test_schema_minimum_is_capped_by_the_ceiling():
+    registry = TemplateRegistry()
+    template = registry.register("small", messages, 50, schema=COMPANY_PACK_SCHEMA)
+    assert template.min_tokens == 50
+
+
+def test_call_carries_schema_and_cache_flag():
+    call = TEMPLATES.call("knowledge_pack.role", "Backend Engineer")
+    assert call["schema"] and call["use_cache"] is False and call["site"] == "knowledge_pack.role"
+    assert "use_cache" not in TEMPLATES.call("mock.summarize", "", [])
+
+
+def test_mock_turn_sites():
+    from core.prompts import mock_turn_call
+
+    asked = [{"role": "interviewer", "content": "Q?"}, {"role": "candidate", "content": "A."}]
+    assert mock_turn_call("persona", asked)["site"] == "mock.turn"
+    closing = mock_turn_call("persona", asked * 4)
+    assert closing["site"] == "mock.conclude" and closing["max_tokens"] <= 150